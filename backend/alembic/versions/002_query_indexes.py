@@ -0,0 +1,67 @@
+"""Add composite and partial indexes for the hot query shapes
+
+Revision ID: 002_query_indexes
+Revises: 001_initial_schema
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "002_query_indexes"
+down_revision: Union[str, None] = "001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEDULED = sa.text("status = 'scheduled'")
+
+
+def upgrade() -> None:
+    # Ride search and the CLI's available-rides listing:
+    # WHERE status = ? AND departure_time >= ? ORDER BY departure_time, ride_id
+    op.create_index(
+        "ix_rides_status_departure",
+        "rides",
+        ["status", "departure_time", "ride_id"],
+    )
+    # Same shape restricted to live rides; far smaller once rides complete.
+    # Dialects without partial indexes ignore the WHERE and build a full index.
+    op.create_index(
+        "ix_rides_scheduled_departure",
+        "rides",
+        ["departure_time", "ride_id"],
+        postgresql_where=SCHEDULED,
+        sqlite_where=SCHEDULED,
+    )
+    # /rides/mine and the CLI's rides-by-driver: WHERE driver_id = ? ORDER BY departure_time DESC
+    op.create_index(
+        "ix_rides_driver_departure",
+        "rides",
+        ["driver_id", "departure_time", "ride_id"],
+    )
+    # /bookings/mine and the CLI's bookings-by-passenger:
+    # WHERE passenger_id = ? ORDER BY booking_time DESC
+    op.create_index(
+        "ix_bookings_passenger_time",
+        "bookings",
+        ["passenger_id", "booking_time", "booking_id"],
+    )
+    # /vehicles/mine: WHERE owner_id = ? ORDER BY vehicle_id
+    op.create_index(
+        "ix_vehicles_owner",
+        "vehicles",
+        ["owner_id", "vehicle_id"],
+    )
+    # Lookups by bookings.ride_id are already served by the leading column of
+    # unique_ride_passenger (ride_id, passenger_id), so no extra index is added.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_owner", table_name="vehicles")
+    op.drop_index("ix_bookings_passenger_time", table_name="bookings")
+    op.drop_index("ix_rides_driver_departure", table_name="rides")
+    op.drop_index("ix_rides_scheduled_departure", table_name="rides")
+    op.drop_index("ix_rides_status_departure", table_name="rides")
@@ -0,0 +1,89 @@
+"""Add text-search indexes for ride origin/destination
+
+SQLite gets an FTS5 trigram index over rides kept in sync by triggers;
+PostgreSQL gets pg_trgm GIN indexes on the scheduled rides. Both serve the
+substring matching that search used to do with leading-wildcard ILIKE.
+
+Revision ID: 003_location_search
+Revises: 002_query_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_location_search"
+down_revision: Union[str, None] = "002_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE rides_fts USING fts5(
+        origin_location, destination_location,
+        content='rides', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER rides_fts_insert AFTER INSERT ON rides BEGIN
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_delete AFTER DELETE ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_update AFTER UPDATE OF origin_location, destination_location
+    ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+    "INSERT INTO rides_fts(rides_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS rides_fts_update",
+    "DROP TRIGGER IF EXISTS rides_fts_delete",
+    "DROP TRIGGER IF EXISTS rides_fts_insert",
+    "DROP TABLE IF EXISTS rides_fts",
+]
+
+POSTGRESQL_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX ix_rides_origin_trgm ON rides
+    USING gin (origin_location gin_trgm_ops) WHERE status = 'scheduled'
+    """,
+    """
+    CREATE INDEX ix_rides_destination_trgm ON rides
+    USING gin (destination_location gin_trgm_ops) WHERE status = 'scheduled'
+    """,
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_rides_destination_trgm",
+    "DROP INDEX IF EXISTS ix_rides_origin_trgm",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRESQL_DOWNGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
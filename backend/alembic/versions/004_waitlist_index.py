@@ -0,0 +1,35 @@
+"""Index the booking waitlist
+
+Revision ID: 004_waitlist_index
+Revises: 003_location_search
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "004_waitlist_index"
+down_revision: Union[str, None] = "003_location_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("status = 'pending'")
+
+
+def upgrade() -> None:
+    # Waitlist promotion takes the oldest pending bookings of a ride:
+    # WHERE ride_id = ? AND status = 'pending' ORDER BY booking_time, booking_id
+    op.create_index(
+        "ix_bookings_ride_pending",
+        "bookings",
+        ["ride_id", "booking_time", "booking_id"],
+        postgresql_where=PENDING,
+        sqlite_where=PENDING,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_ride_pending", table_name="bookings")
@@ -0,0 +1,44 @@
+"""Add seat holds for two-phase booking
+
+Revision ID: 005_seat_holds
+Revises: 004_waitlist_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "005_seat_holds"
+down_revision: Union[str, None] = "004_waitlist_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "seat_holds",
+        sa.Column("hold_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("ride_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("passenger_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.func.current_timestamp(),
+        ),
+        sa.Column("expires_at", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["ride_id"], ["rides.ride_id"], name="fk_seat_holds_ride"),
+        sa.ForeignKeyConstraint(["passenger_id"], ["users.user_id"], name="fk_seat_holds_passenger"),
+        sa.UniqueConstraint("ride_id", "passenger_id", name="unique_hold_ride_passenger"),
+    )
+    # The sweeper: WHERE expires_at <= now ORDER BY expires_at
+    op.create_index("ix_seat_holds_expires", "seat_holds", ["expires_at", "hold_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_seat_holds_expires", table_name="seat_holds")
+    op.drop_table("seat_holds")
@@ -0,0 +1,77 @@
+"""Add history tables for archived rides and bookings
+
+Revision ID: 006_history_tables
+Revises: 005_seat_holds
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006_history_tables"
+down_revision: Union[str, None] = "005_seat_holds"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _archived_at() -> sa.Column:
+    return sa.Column(
+        "archived_at",
+        postgresql.TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=sa.func.current_timestamp(),
+    )
+
+
+def upgrade() -> None:
+    # Same columns as rides/bookings, without foreign keys, so app.archive can
+    # move rows with INSERT ... SELECT and archived rows never block anything
+    op.create_table(
+        "rides_history",
+        sa.Column("ride_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("driver_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("vehicle_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("origin_location", sa.Text(), nullable=False),
+        sa.Column("destination_location", sa.Text(), nullable=False),
+        sa.Column("departure_time", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("arrival_time", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("seats_available", sa.Integer(), nullable=False),
+        sa.Column("price_per_seat", sa.Numeric(6, 2), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        _archived_at(),
+    )
+    # /rides/mine?include_history=true
+    op.create_index(
+        "ix_rides_history_driver_departure",
+        "rides_history",
+        ["driver_id", "departure_time", "ride_id"],
+    )
+
+    op.create_table(
+        "bookings_history",
+        sa.Column("booking_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("ride_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("passenger_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("booking_time", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        _archived_at(),
+    )
+    # /bookings/mine?include_history=true, and its join to rides_history
+    op.create_index(
+        "ix_bookings_history_passenger_time",
+        "bookings_history",
+        ["passenger_id", "booking_time", "booking_id"],
+    )
+    op.create_index("ix_bookings_history_ride", "bookings_history", ["ride_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_history_ride", table_name="bookings_history")
+    op.drop_index("ix_bookings_history_passenger_time", table_name="bookings_history")
+    op.drop_table("bookings_history")
+    op.drop_index("ix_rides_history_driver_departure", table_name="rides_history")
+    op.drop_table("rides_history")
@@ -0,0 +1,45 @@
+"""Add optional ride coordinates for nearby search
+
+Revision ID: 007_ride_coordinates
+Revises: 006_history_tables
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "007_ride_coordinates"
+down_revision: Union[str, None] = "006_history_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("origin_lat", "origin_lon", "destination_lat", "destination_lon")
+
+
+def upgrade() -> None:
+    for table in ("rides", "rides_history"):
+        for name in COLUMNS:
+            op.add_column(table, sa.Column(name, sa.Float(), nullable=True))
+
+    # The SQL path of /rides/nearby scans a latitude range of live rides and
+    # filters longitude from the same index
+    for side in ("origin", "destination"):
+        live = sa.text(f"status = 'scheduled' AND {side}_lat IS NOT NULL")
+        op.create_index(
+            f"ix_rides_scheduled_{side}_coords",
+            "rides",
+            [f"{side}_lat", f"{side}_lon"],
+            postgresql_where=live,
+            sqlite_where=live,
+        )
+
+
+def downgrade() -> None:
+    for side in ("origin", "destination"):
+        op.drop_index(f"ix_rides_scheduled_{side}_coords", table_name="rides")
+    for table in ("rides", "rides_history"):
+        for name in COLUMNS:
+            op.drop_column(table, name)
@@ -0,0 +1,34 @@
+"""Index live rides by arrival time for time-window search
+
+Revision ID: 008_arrival_index
+Revises: 007_ride_coordinates
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "008_arrival_index"
+down_revision: Union[str, None] = "007_ride_coordinates"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # arrive_after/arrive_before on /rides/search; departure bounds already
+    # use ix_rides_scheduled_departure
+    live = sa.text("status = 'scheduled' AND arrival_time IS NOT NULL")
+    op.create_index(
+        "ix_rides_scheduled_arrival",
+        "rides",
+        ["arrival_time", "ride_id"],
+        postgresql_where=live,
+        sqlite_where=live,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rides_scheduled_arrival", table_name="rides")
@@ -0,0 +1,124 @@
+"""Add canonical locations referenced by rides
+
+Revision ID: 009_locations
+Revises: 008_arrival_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "009_locations"
+down_revision: Union[str, None] = "008_arrival_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SIDES = ("origin", "destination")
+
+# The FTS triggers of 003_location_search, which a rebuild of rides drops
+SQLITE_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER rides_fts_insert AFTER INSERT ON rides BEGIN
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_delete AFTER DELETE ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_update AFTER UPDATE OF origin_location, destination_location
+    ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+]
+
+
+def _key(text: str) -> str:
+    # Same as app.locations.location_key
+    return " ".join(text.split()).casefold()
+
+
+def _restore_fts(bind) -> None:
+    """After batch mode rebuilt rides on SQLite: its triggers are gone and its rowids renumbered."""
+    if bind.dialect.name != "sqlite":
+        return
+    for statement in SQLITE_FTS_TRIGGERS:
+        op.execute(statement)
+    op.execute("INSERT INTO rides_fts(rides_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    locations = op.create_table(
+        "locations",
+        sa.Column("location_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("key", sa.Text(), nullable=False, unique=True),
+    )
+    bind = op.get_bind()
+    for side in SIDES:
+        op.add_column("rides_history", sa.Column(f"{side}_location_id", sa.Integer(), nullable=True))
+    # SQLite cannot add a constraint to an existing table, so batch mode
+    # rebuilds rides there; elsewhere these are plain ALTER TABLEs
+    with op.batch_alter_table("rides") as batch:
+        for side in SIDES:
+            batch.add_column(sa.Column(f"{side}_location_id", sa.Integer(), nullable=True))
+            batch.create_foreign_key(
+                f"fk_rides_{side}_location", "locations", [f"{side}_location_id"], ["location_id"],
+            )
+    _restore_fts(bind)
+
+    # Backfill: one location per distinct key, named after its first spelling
+    # in sorted order, then point every ride at it. Distinct names are few
+    # compared with rides, so this is one UPDATE per name and side.
+    names = set()
+    for table in ("rides", "rides_history"):
+        for side in SIDES:
+            names.update(bind.execute(sa.text(f"SELECT DISTINCT {side}_location FROM {table}")).scalars())
+    places = {}
+    for name in sorted(names):
+        places.setdefault(_key(name), " ".join(name.split()))
+    if places:
+        op.bulk_insert(locations, [{"name": name, "key": key} for key, name in places.items()])
+    ids = dict(bind.execute(sa.text("SELECT key, location_id FROM locations")).all())
+    updates = [{"location_id": ids[_key(name)], "name": name} for name in names]
+    for table in ("rides", "rides_history"):
+        for side in SIDES:
+            if updates:
+                bind.execute(
+                    sa.text(f"UPDATE {table} SET {side}_location_id = :location_id WHERE {side}_location = :name"),
+                    updates,
+                )
+
+    # Integer equality on the place, then departure order, over live rides
+    for side in SIDES:
+        op.create_index(
+            f"ix_rides_scheduled_{side}_location",
+            "rides",
+            [f"{side}_location_id", "departure_time", "ride_id"],
+            postgresql_where=sa.text("status = 'scheduled'"),
+            sqlite_where=sa.text("status = 'scheduled'"),
+        )
+
+
+def downgrade() -> None:
+    for side in SIDES:
+        op.drop_index(f"ix_rides_scheduled_{side}_location", table_name="rides")
+    with op.batch_alter_table("rides") as batch:
+        for side in SIDES:
+            batch.drop_constraint(f"fk_rides_{side}_location", type_="foreignkey")
+            batch.drop_column(f"{side}_location_id")
+    _restore_fts(op.get_bind())
+    for side in SIDES:
+        op.drop_column("rides_history", f"{side}_location_id")
+    op.drop_table("locations")
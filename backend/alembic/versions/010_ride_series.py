@@ -0,0 +1,39 @@
+"""Add series_id to rides for recurring ride series
+
+Revision ID: 010_ride_series
+Revises: 009_locations
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "010_ride_series"
+down_revision: Union[str, None] = "009_locations"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("rides", "rides_history"):
+        op.add_column(table, sa.Column("series_id", postgresql.UUID(as_uuid=True), nullable=True))
+
+    # Series-level updates and cancellations select a series' upcoming rides
+    in_series = sa.text("series_id IS NOT NULL")
+    op.create_index(
+        "ix_rides_series",
+        "rides",
+        ["series_id", "departure_time"],
+        postgresql_where=in_series,
+        sqlite_where=in_series,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rides_series", table_name="rides")
+    for table in ("rides", "rides_history"):
+        op.drop_column(table, "series_id")
@@ -0,0 +1,150 @@
+"""
+Archival of old rides and bookings into rides_history / bookings_history.
+
+Completed and cancelled rides that departed more than ARCHIVE_RETENTION_DAYS
+ago move to rides_history together with all their bookings, so the live
+tables and their indexes only carry recent rows. archive_old() moves
+ARCHIVE_BATCH rides per transaction, each chunk being a handful of
+INSERT ... SELECT / DELETE statements keyed on the chunk's ride IDs, so locks
+are held for one chunk at a time. The lifespan runs it every
+ARCHIVE_SECONDS, and it can also run on its own:
+
+    cd backend
+    python -m app.archive                      # one pass
+    python -m app.archive --retention-days 365 --batch 5000
+    python -m app.archive --loop               # keep running as a worker
+
+The /mine endpoints read the history tables with include_history=true.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+
+from app.config import settings
+from app.db import get_db
+from app.models import Booking, BookingHistory, Ride, RideHistory, SeatHold
+from app.response_cache import response_cache
+
+logger = logging.getLogger("app.archive")
+
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+# Totals since startup, for /metrics/archive
+stats = {"runs": 0, "rides": 0, "bookings": 0, "last_run": None}
+
+
+def _copy(source, target, archived_at: datetime, *where):
+    """INSERT INTO target SELECT <source columns>, archived_at FROM source WHERE ..."""
+    names = [column.key for column in source.__table__.columns]
+    return insert(target).from_select(
+        [*names, "archived_at"],
+        select(
+            *(getattr(source, name) for name in names),
+            literal(archived_at, TIMESTAMP(timezone=True)),
+        ).where(*where),
+    )
+
+
+async def archive_old(cutoff: datetime | None = None, batch: int | None = None) -> dict:
+    """Archive every finished ride that departed before `cutoff`, `batch` rides per transaction."""
+    now = datetime.now(timezone.utc)
+    cutoff = cutoff or now - timedelta(days=settings.ARCHIVE_RETENTION_DAYS)
+    batch = batch or settings.ARCHIVE_BATCH
+    rides, bookings, timings = 0, 0, []
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        while True:
+            start = time.perf_counter()
+            # SKIP LOCKED lets workers archive side by side; SQLite ignores it
+            ride_ids = (await db.scalars(
+                select(Ride.ride_id)
+                .where(Ride.status.in_(ARCHIVED_STATUSES), Ride.departure_time < cutoff)
+                .limit(batch)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if ride_ids:
+                moved = await db.execute(_copy(Booking, BookingHistory, now, Booking.ride_id.in_(ride_ids)))
+                bookings += moved.rowcount
+                await db.execute(delete(Booking).where(Booking.ride_id.in_(ride_ids)))
+                # Holds on a departed ride expired long ago; the sweeper just has not run
+                await db.execute(delete(SeatHold).where(SeatHold.ride_id.in_(ride_ids)))
+                await db.execute(_copy(Ride, RideHistory, now, Ride.ride_id.in_(ride_ids)))
+                await db.execute(delete(Ride).where(Ride.ride_id.in_(ride_ids)))
+            await db.commit()
+            for ride_id in ride_ids:
+                response_cache.invalidate_ride(ride_id)
+            rides += len(ride_ids)
+            timings.append((time.perf_counter() - start) * 1000)
+            if len(ride_ids) < batch:
+                break
+
+    result = {
+        "rides": rides,
+        "bookings": bookings,
+        "cutoff": cutoff,
+        "batches": len(timings),
+        "batch_ms_avg": round(sum(timings) / len(timings), 2),
+        "batch_ms_max": round(max(timings), 2),
+        "seconds": round(sum(timings) / 1000, 3),
+    }
+    stats["runs"] += 1
+    stats["rides"] += rides
+    stats["bookings"] += bookings
+    stats["last_run"] = result
+    return result
+
+
+async def archiver():
+    """Background loop: archive old rides every ARCHIVE_SECONDS."""
+    while True:
+        await asyncio.sleep(settings.ARCHIVE_SECONDS)
+        try:
+            result = await archive_old()
+            if result["rides"]:
+                logger.info(
+                    "archived %(rides)d rides and %(bookings)d bookings in %(batches)d batches "
+                    "(avg %(batch_ms_avg)s ms, max %(batch_ms_max)s ms)",
+                    result,
+                )
+        except Exception:
+            logger.exception("archive run failed")
+
+
+async def _main(loop: bool, retention_days: float | None, batch: int | None):
+    from app.db import async_engine, async_writer_engine
+
+    try:
+        if loop:
+            await archiver()
+        else:
+            cutoff = None
+            if retention_days is not None:
+                cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            result = await archive_old(cutoff, batch)
+            rate = result["rides"] / result["seconds"] if result["seconds"] else 0
+            print(
+                f"archived {result['rides']} rides and {result['bookings']} bookings departed before "
+                f"{result['cutoff']:%Y-%m-%d} in {result['batches']} batches, {result['seconds']}s "
+                f"({rate:.0f} rides/s); batch avg {result['batch_ms_avg']} ms, max {result['batch_ms_max']} ms"
+            )
+    finally:
+        for async_pool in (async_engine, async_writer_engine):
+            if async_pool is not None:
+                await async_pool.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old rides and bookings to the history tables")
+    parser.add_argument("--loop", action="store_true", help="keep running every ARCHIVE_SECONDS")
+    parser.add_argument("--retention-days", type=float, default=None, help="default ARCHIVE_RETENTION_DAYS")
+    parser.add_argument("--batch", type=int, default=None, help="rides per transaction, default ARCHIVE_BATCH")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.loop, args.retention_days, args.batch))
@@ -0,0 +1,114 @@
+"""
+In-process cache of authenticated principals.
+
+get_current_user would otherwise run a users lookup on every API call. Entries
+are keyed by user_id and live until the TTL elapses or the token that loaded
+them expires, whichever comes first. Writes to users evict the entry; other
+worker processes only see such writes once their own entry times out.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import User
+
+
+class PrincipalCache:
+    """Bounded LRU of detached User snapshots with per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: UUID) -> User | None:
+        """Return the cached principal for user_id, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: User, token_exp: float | None = None):
+        """Cache a snapshot of `user`, never past the expiry of its token."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        snapshot = _snapshot(user)
+        with self._lock:
+            self._entries[snapshot.user_id] = (expires_at, snapshot)
+            self._entries.move_to_end(snapshot.user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: UUID):
+        """Drop the entry for user_id, if any."""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def _snapshot(user: User) -> User:
+    """Copy the column values of `user` into a transient, session-free User."""
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    return User(**values)
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_written_user(mapper, connection, target: User):
+    principal_cache.invalidate(target.user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _evict_on_bulk_user_write(orm_execute_state):
+    # Bulk UPDATE/DELETE statements skip the mapper events; we cannot tell which
+    # rows they touch, so drop everything
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            principal_cache.clear()
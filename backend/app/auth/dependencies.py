@@ -2,8 +2,10 @@ from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.cache import principal_cache
 from app.auth.jwt_utils import decode_access_token
 from app.db import get_db
 from app.models import User
@@ -11,13 +13,15 @@ from app.models import User
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Dependency that extracts and validates the JWT token from the Authorization header.
     Returns the current user or raises HTTP 401.
+    Users are served from the principal cache when possible, so most requests
+    skip the users lookup entirely.
     """
     token = credentials.credentials
 
@@ -46,7 +50,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.user_id == user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,4 +62,18 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    principal_cache.put(user, token_exp=payload.get("exp"))
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency for operator-only endpoints such as /metrics: the current
+    user, who must have the admin role, or HTTP 403.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
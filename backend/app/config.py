@@ -3,9 +3,72 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./carpool.db"
+    # Serve the API through an asyncio driver (aiosqlite/asyncpg); False uses
+    # the blocking driver from DATABASE_URL in the threadpool
+    DB_ASYNC: bool = True
+    # Connection pool sizing; keep DB_POOL_SIZE + DB_MAX_OVERFLOW at or below
+    # THREADPOOL_SIZE when running with DB_ASYNC off
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    THREADPOOL_SIZE: int = 40
+    # SQLite production profile: WAL and connection pragmas, plus (async path
+    # only) a single writer connection so reads never queue behind writes
+    SQLITE_TUNING: bool = True
+    SQLITE_SINGLE_WRITER: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    DASHBOARD_SECTION_LIMIT: int = 10
+    SQL_METRICS: bool = True
+    SQL_REPEAT_WARN_THRESHOLD: int = 5
+    AUTH_CACHE_SIZE: int = 10_000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+    # In-memory model of bookable rides used by /rides/search
+    READ_MODEL: bool = True
+    READ_MODEL_SWEEP_SECONDS: float = 30
+    READ_MODEL_RESYNC_SECONDS: float = 300
+    # /rides/nearby: grid cell size of the read model's spatial index, and the largest radius
+    GEO_CELL_DEGREES: float = 0.02
+    NEARBY_RADIUS_MAX_KM: float = 100
+    # Canonical locations: autocomplete suggestions per request (and per trie node),
+    # and how often to load places created by other worker processes, re-reading the
+    # last LOCATIONS_REFRESH_OVERLAP IDs (sequence values can commit out of order)
+    LOCATION_AUTOCOMPLETE_MAX: int = 10
+    LOCATIONS_REFRESH_SECONDS: float = 30
+    LOCATIONS_REFRESH_OVERLAP: int = 1000
+    # /rides/search time windows: the largest flex_minutes tolerance
+    TIME_WINDOW_FLEX_MAX_MINUTES: int = 24 * 60
+    # /rides/series: the most rides one recurrence rule may create
+    RIDE_SERIES_MAX_OCCURRENCES: int = 366
+    # Live ride updates streamed by /rides/events
+    RIDE_EVENTS_QUEUE_SIZE: int = 64
+    RIDE_EVENTS_COALESCE_SECONDS: float = 0.25
+    RIDE_EVENTS_HEARTBEAT_SECONDS: float = 15
+    RIDE_EVENTS_MAX_RIDE_IDS: int = 100
+    # POST/DELETE /bookings/batch: the most rides or bookings in one request
+    BOOKING_BATCH_MAX: int = 50
+    # Two-phase booking: how long a held seat is kept, and the expired-hold sweeper
+    SEAT_HOLD_TTL_SECONDS: float = 120
+    SEAT_HOLD_SWEEP_SECONDS: float = 5
+    SEAT_HOLD_SWEEP_BATCH: int = 1000
+    # Completing finished rides (app/lifecycle.py); 0 seconds turns the lifespan job off
+    RIDE_LIFECYCLE_SECONDS: float = 300
+    RIDE_LIFECYCLE_BATCH: int = 1000
+    RIDE_COMPLETION_GRACE_SECONDS: float = 3600
+    # Moving old finished rides to the history tables (app/archive.py); 0 seconds turns the lifespan job off
+    ARCHIVE_RETENTION_DAYS: float = 180
+    ARCHIVE_SECONDS: float = 3600
+    ARCHIVE_BATCH: int = 1000
 
     model_config = {"env_file": ".env"}
 
@@ -1,21 +1,245 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.config import settings
+from app.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, instrument
+
+# Async drivers used when DB_ASYNC is on, keyed by the sync URL's backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+IS_SQLITE = make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+# In-memory SQLite keeps its own single-connection pool and takes no sizing
+IS_MEMORY_SQLITE = IS_SQLITE and make_url(settings.DATABASE_URL).database in (None, "", ":memory:")
+# With the SQLite profile every write transaction runs alone: on the async path
+# through a one-connection writer pool, on the sync path behind an asyncio lock.
+# Either way writers queue without holding a thread and never trip over the
+# database lock, while WAL lets reads proceed next to them.
+SINGLE_WRITER = IS_SQLITE and settings.SQLITE_TUNING and settings.SQLITE_SINGLE_WRITER
+
+Base = declarative_base()
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Production pragmas for every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _tune(sync_engine: Engine) -> Engine:
+    if IS_SQLITE and settings.SQLITE_TUNING:
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    return sync_engine
+
+
+def _pool_options(poolclass, pool_size: int, max_overflow: int) -> dict:
+    """create_engine pool arguments from Settings."""
+    if IS_MEMORY_SQLITE:
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
+
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync DATABASE_URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+class WriterRoutingSession(Session):
+    """
+    Session that sends flushes and INSERT/UPDATE/DELETE statements to a
+    dedicated writer engine and everything else to the regular (reader) pool.
+    Once a transaction has written, its later statements stay on the writer,
+    so they see its own uncommitted changes. Without a writer it behaves
+    exactly like Session.
+    """
+
+    def __init__(self, *args, writer: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer is not None and (self.wrote or self._flushing or isinstance(clause, UpdateBase)):
+            self.wrote = True
+            return self.writer
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(WriterRoutingSession, "after_transaction_end")
+def _reset_writer_routing(session, transaction):
+    """Route the next transaction's reads to the reader pool again."""
+    if transaction.parent is None:
+        session.wrote = False
+
+
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
 engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    settings.DATABASE_URL,
+    connect_args=connect_args,
+    pool_logging_name="sync",
+    **_pool_options(InstrumentedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
 )
+instrument(_tune(engine), "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+async_engine = None
+async_writer_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    # An explicit queue pool also replaces aiosqlite's default NullPool, so
+    # connections (and their pragmas) are kept
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_logging_name="async",
+        **_pool_options(
+            InstrumentedAsyncAdaptedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+        ),
+    )
+    instrument(_tune(async_engine.sync_engine), "async")
+    if SINGLE_WRITER:
+        async_writer_engine = create_async_engine(
+            async_database_url(settings.DATABASE_URL),
+            pool_logging_name="async_writer",
+            **_pool_options(InstrumentedAsyncAdaptedQueuePool, 1, 0),
+        )
+        instrument(_tune(async_writer_engine.sync_engine), "async_writer")
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=WriterRoutingSession,
+        writer=async_writer_engine.sync_engine if async_writer_engine is not None else None,
+    )
+
+
+class SyncSessionAdapter:
+    """
+    Wraps a blocking Session in the AsyncSession call signatures, running each
+    database call in the threadpool. Lets the async routers run on the sync
+    engine when DB_ASYNC is off.
+
+    With a write_lock, the first write statement or dirty flush waits for the
+    lock (on the event loop, not in a thread) and holds it until the
+    transaction ends.
+    """
+
+    def __init__(self, session: Session, write_lock: asyncio.Lock | None = None):
+        self.sync_session = session
+        self._write_lock = write_lock
+        self._writing = False
+
+    async def _claim_writer(self, statement=None):
+        if self._write_lock is None or self._writing:
+            return
+        session = self.sync_session
+        if isinstance(statement, UpdateBase) or (
+            statement is None and (session.new or session.dirty or session.deleted)
+        ):
+            await self._write_lock.acquire()
+            self._writing = True
+
+    def _release_writer(self):
+        if self._writing:
+            self._writing = False
+            self._write_lock.release()
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        await self._claim_writer(statement)
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        await self._claim_writer(statement)
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        await self._claim_writer(statement)
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        await self._claim_writer()
+        await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def commit(self):
+        await self._claim_writer()
+        try:
+            await run_in_threadpool(self.sync_session.commit)
+        finally:
+            self._release_writer()
+
+    async def rollback(self):
+        try:
+            await run_in_threadpool(self.sync_session.rollback)
+        finally:
+            self._release_writer()
+
+    async def close(self):
+        try:
+            await run_in_threadpool(self.sync_session.close)
+        finally:
+            self._release_writer()
+
+
+# Sync sessions are admitted only while a pooled connection is free, so
+# threadpool workers never sit blocked in pool checkout (or in SQLite's busy
+# handler) while the session that could release them waits for a thread.
+# A negative DB_MAX_OVERFLOW means an unbounded pool.
+_sync_session_slots = (
+    asyncio.Semaphore(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    if not IS_MEMORY_SQLITE and settings.DB_MAX_OVERFLOW >= 0
+    else None
+)
+_sync_write_lock = asyncio.Lock() if SINGLE_WRITER and not settings.DB_ASYNC else None
+
 
+async def get_db():
+    """Dependency for getting DB sessions (AsyncSession, or the sync adapter)."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
 
-def get_db():
-    """Dependency for getting DB sessions."""
-    db = SessionLocal()
+    if _sync_session_slots is not None:
+        await _sync_session_slots.acquire()
+    db = SyncSessionAdapter(SessionLocal(expire_on_commit=False), write_lock=_sync_write_lock)
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+        if _sync_session_slots is not None:
+            _sync_session_slots.release()
@@ -0,0 +1,195 @@
+"""
+Uniform-grid spatial index for ride coordinates.
+
+GeoGrid buckets points into cells of GEO_CELL_DEGREES on a side. A radius
+query visits only the cells overlapping the circle, nearest first so that a
+k-nearest search can stop early, and refines their points: each cell keeps
+its latitudes, longitudes (in radians) and the cosines of the latitudes in
+parallel array('d') columns, so the refinement is one tight pass over
+contiguous floats per cell (a latitude band check, then the haversine test
+with everything about the query point hoisted out of the loop) rather than a
+walk over ride objects.
+
+Used by the read model for /rides/nearby; the SQL fallback prunes with a
+bounding box on the coordinate indexes and refines with haversine_km.
+"""
+
+import math
+from array import array
+from typing import Hashable, Iterator
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lon, max_lon) enclosing the circle. When it covers
+    a pole or crosses the antimeridian the longitude range is all of -180..180.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90 or max_lat >= 90 or cos_lat <= 0:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    if lon - dlon < -180 or lon + dlon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+class _Cell:
+    __slots__ = ("keys", "values", "phis", "lambdas", "cosines")
+
+    def __init__(self):
+        self.keys: list = []
+        self.values: list = []
+        self.phis = array("d")
+        self.lambdas = array("d")
+        self.cosines = array("d")
+
+    def append(self, key: Hashable, value, lat: float, lon: float):
+        phi = math.radians(lat)
+        self.keys.append(key)
+        self.values.append(value)
+        self.phis.append(phi)
+        self.lambdas.append(math.radians(lon))
+        self.cosines.append(math.cos(phi))
+
+    def pop(self, index: int) -> Hashable | None:
+        """Remove the point at `index`, moving the last one into its place; returns the moved key."""
+        moved = None
+        last = len(self.keys) - 1
+        columns = (self.keys, self.values, self.phis, self.lambdas, self.cosines)
+        if index != last:
+            moved = self.keys[last]
+            for column in columns:
+                column[index] = column[last]
+        for column in columns:
+            column.pop()
+        return moved
+
+
+class GeoGrid:
+    """
+    Points bucketed into a uniform lat/lon grid. Each point has a hashable
+    key, used to move or remove it, and a value handed back by queries.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.cells: dict[tuple[int, int], _Cell] = {}
+        # key -> (cell, position in the cell's columns)
+        self.where: dict[Hashable, tuple[tuple[int, int], int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.where)
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, key: Hashable, lat: float, lon: float, value=None):
+        """Insert or move the point `key`; queries return `value` (default: the key)."""
+        self.discard(key)
+        cell_key = self._cell_of(lat, lon)
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            cell = self.cells[cell_key] = _Cell()
+        self.where[key] = (cell_key, len(cell.keys))
+        cell.append(key, key if value is None else value, lat, lon)
+
+    def discard(self, key: Hashable):
+        found = self.where.pop(key, None)
+        if found is None:
+            return
+        cell_key, index = found
+        cell = self.cells[cell_key]
+        # The columns stay dense: the cell's last point moves into the hole
+        moved = cell.pop(index)
+        if moved is not None:
+            self.where[moved] = (cell_key, index)
+        if not cell.keys:
+            del self.cells[cell_key]
+
+    def _covering(self, lat: float, lon: float, radius_km: float) -> list[tuple[tuple[int, int], _Cell]]:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        y0, x0 = self._cell_of(min_lat, min_lon)
+        y1, x1 = self._cell_of(max_lat, max_lon)
+        cells = self.cells
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(cells):
+            # A huge circle over a sparse grid: cheaper to check every cell
+            return [
+                (cell_key, cell) for cell_key, cell in cells.items()
+                if y0 <= cell_key[0] <= y1 and x0 <= cell_key[1] <= x1
+            ]
+        return [
+            ((y, x), cells[y, x])
+            for y in range(y0, y1 + 1)
+            for x in range(x0, x1 + 1)
+            if (y, x) in cells
+        ]
+
+    def estimate(self, lat: float, lon: float, radius_km: float) -> int:
+        """Number of points in the cells a query would visit."""
+        return sum(len(cell.keys) for _, cell in self._covering(lat, lon, radius_km))
+
+    def scan(self, lat: float, lon: float, radius_km: float) -> Iterator[tuple[float, list[tuple[object, float]]]]:
+        """
+        The cells that can hold points within `radius_km` of (lat, lon),
+        nearest first, as (bound, matches): no point in the cell is closer
+        than `bound` km, and `matches` are the (value, distance_km) of its
+        points within the radius. Callers after the k nearest stop once the
+        bound exceeds their k-th best distance.
+        """
+        phi, lam = math.radians(lat), math.radians(lon)
+        cos_phi = math.cos(phi)
+        angle = min(math.pi, radius_km / EARTH_RADIUS_KM)
+        # Compare the haversine term `a` with the radius's own instead of distances
+        limit = math.sin(angle / 2) ** 2
+        sin, cos, asin, sqrt = math.sin, math.cos, math.asin, math.sqrt
+        size = math.radians(self.cell_degrees)
+        diameter = 2 * EARTH_RADIUS_KM
+
+        # Lower bound of `a` over each cell: the smallest latitude and longitude
+        # gaps to the cell, with the smaller cosine of its two edges
+        bounded = []
+        for (y, x), cell in self._covering(lat, lon, radius_km):
+            south, west = y * size, x * size
+            dphi = max(0.0, south - phi, phi - (south + size))
+            dlambda = max(0.0, west - lam, lam - (west + size))
+            dlambda = min(dlambda, abs(2 * math.pi - dlambda))
+            cos_edge = min(cos(south), cos(south + size))
+            a = sin(dphi / 2) ** 2 + cos_phi * max(0.0, cos_edge) * sin(dlambda / 2) ** 2
+            if a <= limit:
+                bounded.append((a, y, x, cell))
+        bounded.sort(key=lambda item: item[0])
+
+        for bound, _, _, cell in bounded:
+            matches = []
+            for value, point_phi, point_lambda, cos_point in zip(
+                cell.values, cell.phis, cell.lambdas, cell.cosines
+            ):
+                dphi = point_phi - phi
+                if dphi > angle or dphi < -angle:
+                    continue
+                half_dphi = sin(dphi / 2)
+                half_dlambda = sin((point_lambda - lam) / 2)
+                a = half_dphi * half_dphi + cos_phi * cos_point * half_dlambda * half_dlambda
+                if a <= limit:
+                    matches.append((value, diameter * asin(sqrt(a))))
+            yield diameter * asin(sqrt(min(1.0, bound))), matches
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Iterator[tuple[object, float]]:
+        """(value, distance_km) of every point within `radius_km` of (lat, lon)."""
+        for _, matches in self.scan(lat, lon, radius_km):
+            yield from matches
@@ -0,0 +1,136 @@
+"""
+Time-limited seat holds: the first phase of two-phase booking.
+
+POST /rides/{ride_id}/hold takes a seat off seats_available with the same
+short conditional UPDATE as book_ride and records a SeatHold that expires
+after SEAT_HOLD_TTL_SECONDS. Confirming the hold turns it into a booking
+without touching the rides row at all, so the slow part of a checkout never
+queues on a hot ride. For every ride,
+
+    seats_available = seats offered - confirmed bookings - unreleased holds
+
+Holds are released by their owner or, once expired, by sweep_expired(), which
+the lifespan runs every SEAT_HOLD_SWEEP_SECONDS. Both go through release():
+one bulk DELETE, one UPDATE per batch handing the seats back, and waitlist
+promotion for rides with pending bookings. Cancelling a ride drops its holds
+with discard() in the same transaction, so they cannot be confirmed.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import Row, case, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import get_db
+from app.models import Booking, Ride, SeatHold
+from app.read_model import bookable_rides
+from app.response_cache import response_cache
+from app.ride_events import ride_events
+from app.serialization import ride_rows
+from app.waitlist import RIDE_COLUMNS, promote
+
+logger = logging.getLogger("app.holds")
+
+
+async def release(db: AsyncSession, *where) -> list[tuple[Row, int, list[UUID]]]:
+    """
+    Delete the holds matching `where` and give their seats back, in the
+    caller's transaction. Returns (ride, holds released, bookings promoted)
+    per ride; pass it to after_commit() once committed.
+    """
+    ride_ids = (await db.scalars(delete(SeatHold).where(*where).returning(SeatHold.ride_id))).all()
+    if not ride_ids:
+        return []
+    counts = Counter(ride_ids)
+    # Lock the rides in a fixed order so sweepers in other workers cannot deadlock
+    await db.execute(
+        select(Ride.ride_id).where(Ride.ride_id.in_(counts)).order_by(Ride.ride_id).with_for_update()
+    )
+    rides = (await db.execute(
+        update(Ride)
+        .where(Ride.ride_id.in_(counts))
+        .values(seats_available=Ride.seats_available + case(counts, value=Ride.ride_id))
+        .returning(*RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+    waiting = set((await db.scalars(
+        select(Booking.ride_id).where(Booking.ride_id.in_(counts), Booking.status == "pending").distinct()
+    )).all())
+
+    released = []
+    for ride in rides:
+        promoted = []
+        if ride.ride_id in waiting:
+            ride, promoted = await promote(db, ride)
+        released.append((ride, counts[ride.ride_id], promoted))
+    return released
+
+
+async def discard(db: AsyncSession, *where) -> Counter:
+    """
+    Delete the holds matching `where`, on rides being cancelled, in the
+    caller's transaction. Returns the holds deleted per ride for the caller
+    to add back to seats_available in its own UPDATE of the rides; unlike
+    release() nothing is promoted from the waitlist.
+    """
+    return Counter((await db.scalars(delete(SeatHold).where(*where).returning(SeatHold.ride_id))).all())
+
+
+def after_commit(released: list[tuple[Row, int, list[UUID]]]):
+    """Apply committed releases to the caches and push them to subscribers."""
+    for ride, count, promoted in released:
+        response_cache.invalidate_ride(ride.ride_id)
+        bookable_rides.adjust_seats(ride.ride_id, count - len(promoted))
+        ride_events.publish(ride_rows.to_dict(ride))
+
+
+async def sweep_expired(now: datetime | None = None, batch: int | None = None) -> dict:
+    """Release every hold that expired by `now`, `batch` holds per transaction."""
+    now = now or datetime.now(timezone.utc)
+    batch = batch or settings.SEAT_HOLD_SWEEP_BATCH
+    released, timings = 0, []
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        while True:
+            start = time.perf_counter()
+            # SKIP LOCKED lets workers sweep side by side; SQLite ignores it
+            expired = (
+                select(SeatHold.hold_id)
+                .where(SeatHold.expires_at <= now)
+                .order_by(SeatHold.expires_at, SeatHold.hold_id)
+                .limit(batch)
+                .with_for_update(skip_locked=True)
+            )
+            rides = await release(db, SeatHold.hold_id.in_(expired))
+            await db.commit()
+            after_commit(rides)
+            count = sum(count for _, count, _ in rides)
+            released += count
+            timings.append(time.perf_counter() - start)
+            if count < batch:
+                break
+    return {
+        "released": released,
+        "batches": len(timings),
+        "batch_ms_max": round(max(timings) * 1000, 2),
+        "seconds": round(sum(timings), 3),
+    }
+
+
+async def sweeper():
+    """Background loop: release expired holds every SEAT_HOLD_SWEEP_SECONDS."""
+    while True:
+        await asyncio.sleep(settings.SEAT_HOLD_SWEEP_SECONDS)
+        try:
+            result = await sweep_expired()
+            if result["released"]:
+                logger.info("released %(released)d expired seat holds in %(batches)d batches", result)
+        except Exception:
+            logger.exception("seat hold sweep failed")
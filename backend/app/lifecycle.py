@@ -0,0 +1,154 @@
+"""
+Ride lifecycle job: marks rides that have finished as 'completed'.
+
+Nothing else moves a ride out of 'scheduled' unless its driver PATCHes it, so
+without this job every scheduled-ride query and the partial index
+ix_rides_scheduled_departure keep carrying rides that left long ago. A ride is
+finished once its arrival_time has passed or, with no arrival_time recorded,
+RIDE_COMPLETION_GRACE_SECONDS after it departed.
+
+complete_departed() works in chunks of RIDE_LIFECYCLE_BATCH rides, one
+transaction each: a set-based UPDATE of the rides (oldest first, via the
+partial index) plus cancelling the waitlisted bookings those rides can no
+longer promote. The lifespan runs it every RIDE_LIFECYCLE_SECONDS, and it
+can also run on its own:
+
+    cd backend
+    python -m app.lifecycle            # one pass
+    python -m app.lifecycle --loop     # keep running, e.g. as a separate worker
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select, update
+
+from app.config import settings
+from app.db import get_db
+from app.models import Ride
+from app.read_model import bookable_rides
+from app.response_cache import response_cache
+from app.ride_events import ride_events
+from app.serialization import ride_rows
+from app.waitlist import RIDE_COLUMNS, cancel_waitlist
+
+logger = logging.getLogger("app.lifecycle")
+
+# Totals since startup, for /metrics/lifecycle
+stats = {"runs": 0, "completed": 0, "waitlist_cancelled": 0, "last_run": None}
+
+
+def finished(now: datetime):
+    """Filter for scheduled rides that are over at `now`."""
+    return and_(
+        Ride.status == "scheduled",
+        # Leading range on the partial index; arrival is never before departure
+        Ride.departure_time < now,
+        or_(
+            Ride.arrival_time < now,
+            and_(
+                Ride.arrival_time.is_(None),
+                Ride.departure_time < now - timedelta(seconds=settings.RIDE_COMPLETION_GRACE_SECONDS),
+            ),
+        ),
+    )
+
+
+async def complete_departed(now: datetime | None = None, batch: int | None = None) -> dict:
+    """Complete every finished ride, `batch` rides per transaction; returns counts and timings."""
+    now = now or datetime.now(timezone.utc)
+    batch = batch or settings.RIDE_LIFECYCLE_BATCH
+    completed, cancelled, timings = 0, 0, []
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        while True:
+            start = time.perf_counter()
+            # SKIP LOCKED lets several workers run the job; SQLite ignores it
+            chunk = (
+                select(Ride.ride_id)
+                .where(finished(now))
+                .order_by(Ride.departure_time, Ride.ride_id)
+                .limit(batch)
+                .with_for_update(skip_locked=True)
+            )
+            rides = (await db.execute(
+                update(Ride)
+                .where(Ride.ride_id.in_(chunk))
+                .values(status="completed")
+                .returning(*RIDE_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).all()
+            if rides:
+                cancelled += await cancel_waitlist(db, [ride.ride_id for ride in rides])
+            await db.commit()
+            for ride in rides:
+                response_cache.invalidate_ride(ride.ride_id)
+                bookable_rides.remove(ride.ride_id)
+                ride_events.publish(ride_rows.to_dict(ride))
+            completed += len(rides)
+            timings.append((time.perf_counter() - start) * 1000)
+            if len(rides) < batch:
+                break
+
+    result = {
+        "completed": completed,
+        "waitlist_cancelled": cancelled,
+        "batches": len(timings),
+        "batch_ms_avg": round(sum(timings) / len(timings), 2),
+        "batch_ms_max": round(max(timings), 2),
+        "seconds": round(sum(timings) / 1000, 3),
+        "finished_at": datetime.now(timezone.utc),
+    }
+    stats["runs"] += 1
+    stats["completed"] += completed
+    stats["waitlist_cancelled"] += cancelled
+    stats["last_run"] = result
+    return result
+
+
+async def lifecycle():
+    """Background loop: complete finished rides every RIDE_LIFECYCLE_SECONDS."""
+    while True:
+        try:
+            result = await complete_departed()
+            if result["completed"]:
+                logger.info(
+                    "completed %(completed)d rides in %(batches)d batches "
+                    "(avg %(batch_ms_avg)s ms, max %(batch_ms_max)s ms)",
+                    result,
+                )
+        except Exception:
+            logger.exception("ride lifecycle job failed")
+        await asyncio.sleep(settings.RIDE_LIFECYCLE_SECONDS)
+
+
+async def _main(loop: bool, batch: int | None):
+    from app.db import async_engine, async_writer_engine
+
+    try:
+        if loop:
+            await lifecycle()
+        else:
+            result = await complete_departed(batch=batch)
+            print(
+                f"completed {result['completed']} rides ({result['waitlist_cancelled']} waitlisted "
+                f"bookings cancelled) in {result['batches']} batches, {result['seconds']}s; "
+                f"batch avg {result['batch_ms_avg']} ms, max {result['batch_ms_max']} ms"
+            )
+    finally:
+        for async_pool in (async_engine, async_writer_engine):
+            if async_pool is not None:
+                await async_pool.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mark finished rides as completed")
+    parser.add_argument("--loop", action="store_true", help="keep running every RIDE_LIFECYCLE_SECONDS")
+    parser.add_argument("--batch", type=int, default=None, help="rides per transaction")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.loop, args.batch))
@@ -0,0 +1,315 @@
+"""
+Canonical locations and the autocomplete trie.
+
+Every ride references its origin and destination in the `locations` table
+(alembic revision 009_locations). Names are matched on location_key():
+casefolded with whitespace collapsed, so "Case Quad" and "case  quad " are
+one place with one integer ID, and searching by that ID is an integer
+equality on an index instead of a text match.
+
+LocationIndex mirrors the table in memory: a key -> ID map, so resolving a
+known name needs no query, and a prefix trie for /locations/autocomplete.
+The trie is keyed at every word start of a name, so "quad" finds
+"Case Quad", and each node keeps its best LOCATION_AUTOCOMPLETE_MAX entries
+ranked by how many rides use the place. A lookup is a walk down the prefix,
+independent of how many places there are. New places are added to the trie
+as rides create them, and refresher() loads the ones other worker
+processes created. IDs only grow, so it reads the rows past the highest ID
+seen plus the last LOCATIONS_REFRESH_OVERLAP IDs below it: on PostgreSQL a
+lower sequence value can commit after a higher one.
+
+Rows inserted in bulk without IDs can be backfilled with
+`python -m app.locations` from `backend`.
+"""
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import logging
+import threading
+
+from sqlalchemy import func, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import settings
+from app.db import engine, get_db
+from app.models import Location, Ride
+
+logger = logging.getLogger("app.locations")
+
+# Both dialects support INSERT ... ON CONFLICT
+_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+
+
+def location_name(text: str) -> str:
+    """Display form of a place name: whitespace trimmed and collapsed."""
+    return " ".join(text.split())
+
+
+def location_key(text: str) -> str:
+    """Lookup form of a place name: the display form, casefolded."""
+    return location_name(text).casefold()
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        # (-rides, key, location_id) of the best places below this node, sorted
+        self.top: list[tuple[int, str, int]] = []
+
+
+class LocationTrie:
+    """Word-prefix trie over location keys with a bounded ranking per node."""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.root = _Node()
+        self.nodes = 1
+
+    def _path_nodes(self, key: str) -> list[_Node]:
+        """Every node on the paths of the key's word-start suffixes, once each, creating them."""
+        seen: dict[int, _Node] = {}
+        starts = [0] + [i + 1 for i, char in enumerate(key) if char == " "]
+        for start in starts:
+            node = self.root
+            for char in key[start:]:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = _Node()
+                    self.nodes += 1
+                node = child
+                seen[id(node)] = node
+        return list(seen.values())
+
+    def rank(self, location_id: int, key: str, rides: int, previous: int | None = None):
+        """
+        Insert a place with `rides` uses, or re-rank it from `previous` uses.
+        Counts only grow, so a place trimmed from a node's ranking can only
+        come back through a later call like this one.
+        """
+        entry = (-rides, key, location_id)
+        old = None if previous is None else (-previous, key, location_id)
+        for node in self._path_nodes(key):
+            top = node.top
+            if old is not None:
+                index = bisect.bisect_left(top, old)
+                if index < len(top) and top[index] == old:
+                    del top[index]
+            if len(top) < self.width or entry < top[-1]:
+                bisect.insort(top, entry)
+                del top[self.width:]
+
+    def complete(self, prefix: str, limit: int) -> list[tuple[int, str, int]]:
+        """Best (-rides, key, location_id) entries with a word starting with `prefix`."""
+        node = self.root
+        for char in location_key(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+
+class LocationIndex:
+    """In-memory copy of the locations table with ride counts; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.ready = False
+        self.lookups = 0
+        self.misses = 0
+        self.completions = 0
+        self.refreshes = 0
+
+    def _reset(self):
+        self.ids: dict[str, int] = {}
+        self.names: dict[int, str] = {}
+        self.rides: dict[int, int] = {}
+        self.last_id = 0
+        self.trie = LocationTrie(settings.LOCATION_AUTOCOMPLETE_MAX)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _add(self, location_id: int, name: str, rides: int = 0):
+        # Caller holds the lock
+        key = location_key(name)
+        if key in self.ids:
+            return
+        self.ids[key] = location_id
+        self.names[location_id] = name
+        self.rides[location_id] = rides
+        self.last_id = max(self.last_id, location_id)
+        self.trie.rank(location_id, key, rides)
+
+    def record(self, *location_ids: int | None):
+        """Count a committed ride's places towards their autocomplete rank."""
+        with self._lock:
+            for location_id in location_ids:
+                if location_id not in self.rides:
+                    continue
+                previous = self.rides[location_id]
+                self.rides[location_id] = previous + 1
+                key = location_key(self.names[location_id])
+                self.trie.rank(location_id, key, previous + 1, previous)
+
+    def complete(self, prefix: str, limit: int) -> list[dict]:
+        with self._lock:
+            self.completions += 1
+            return [
+                {"location_id": location_id, "name": self.names[location_id], "rides": -rides}
+                for rides, _, location_id in self.trie.complete(prefix, limit)
+            ]
+
+    async def resolve(self, db, *names: str) -> list[int]:
+        """
+        IDs of the places `names` refer to, creating the missing ones in the
+        caller's transaction. Pass the new places to learn() after committing.
+        """
+        keys = [location_key(name) for name in names]
+        with self._lock:
+            self.lookups += len(keys)
+            ids = {key: self.ids[key] for key in keys if key in self.ids}
+        missing = {key: location_name(name) for key, name in zip(keys, names) if key not in ids}
+        if missing:
+            with self._lock:
+                self.misses += len(missing)
+            # Upsert rather than SELECT then INSERT: the unique key keeps one row
+            # when requests race, the no-op update makes RETURNING report rows
+            # that already existed, and the statement goes to the writer so it
+            # sees places created earlier in this transaction
+            stmt = _insert(Location).values([{"name": name, "key": key} for key, name in missing.items()])
+            ids.update((await db.execute(
+                stmt.on_conflict_do_update(index_elements=["key"], set_={"key": stmt.excluded.key})
+                .returning(Location.key, Location.location_id)
+            )).all())
+        return [ids[key] for key in keys]
+
+    def learn(self, ids: list[int], names: list[str]):
+        """Add the places of a committed resolve() that are new to the index."""
+        with self._lock:
+            for location_id, name in zip(ids, names):
+                self._add(location_id, location_name(name))
+
+    async def reload(self):
+        """Rebuild from the database, ranking places by the rides that use them."""
+        uses = union_all(
+            select(Ride.origin_location_id.label("location_id")),
+            select(Ride.destination_location_id.label("location_id")),
+        ).subquery()
+        counts = (
+            select(uses.c.location_id, func.count().label("rides"))
+            .where(uses.c.location_id.is_not(None))
+            .group_by(uses.c.location_id)
+            .subquery()
+        )
+        rows = await _rows(
+            select(Location.location_id, Location.name, func.coalesce(counts.c.rides, 0))
+            .outerjoin(counts, counts.c.location_id == Location.location_id)
+            .order_by(Location.location_id)
+        )
+        with self._lock:
+            self._reset()
+            for location_id, name, rides in rows:
+                self._add(location_id, name, rides)
+            self.ready = True
+            self.refreshes += 1
+
+    async def refresh(self):
+        """Load places created since the last load, e.g. by other worker processes."""
+        # The overlap catches IDs that committed after a higher one; known places are skipped
+        rows = await _rows(
+            select(Location.location_id, Location.name)
+            .where(Location.location_id > self.last_id - settings.LOCATIONS_REFRESH_OVERLAP)
+            .order_by(Location.location_id)
+        )
+        with self._lock:
+            for location_id, name in rows:
+                self._add(location_id, name)
+            self.refreshes += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "locations": len(self.ids),
+                "trie_nodes": self.trie.nodes,
+                "lookups": self.lookups,
+                "misses": self.misses,
+                "completions": self.completions,
+                "refreshes": self.refreshes,
+            }
+
+
+async def _rows(stmt) -> list:
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        return (await db.execute(stmt)).all()
+
+
+async def backfill(batch: int = 1000) -> int:
+    """
+    Point rides whose location IDs are null at their places, creating the
+    places; for rows loaded in bulk without IDs. Returns the number of ride
+    columns set.
+    """
+    updated = 0
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        for text_column, id_column in (
+            (Ride.origin_location, Ride.origin_location_id),
+            (Ride.destination_location, Ride.destination_location_id),
+        ):
+            names = (await db.scalars(select(text_column).where(id_column.is_(None)).distinct())).all()
+            for start in range(0, len(names), batch):
+                chunk = names[start:start + batch]
+                ids = await location_index.resolve(db, *chunk)
+                for name, location_id in zip(chunk, ids):
+                    result = await db.execute(
+                        update(Ride)
+                        .where(text_column == name, id_column.is_(None))
+                        .values({id_column.key: location_id})
+                        .execution_options(synchronize_session=False)
+                    )
+                    updated += result.rowcount
+                await db.commit()
+                location_index.learn(ids, chunk)
+    return updated
+
+
+async def refresher():
+    """Background loop picking up places created by other processes."""
+    while True:
+        await asyncio.sleep(settings.LOCATIONS_REFRESH_SECONDS)
+        try:
+            await location_index.refresh()
+        except Exception:
+            logger.exception("location refresh failed")
+
+
+location_index = LocationIndex()
+
+
+async def _main(batch: int):
+    from app.db import async_engine, async_writer_engine
+
+    try:
+        await location_index.reload()
+        updated = await backfill(batch)
+        await location_index.reload()
+        print(f"set {updated} ride location IDs; {len(location_index)} locations")
+    finally:
+        for async_pool in (async_engine, async_writer_engine):
+            if async_pool is not None:
+                await async_pool.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill ride location IDs from their location text")
+    parser.add_argument("--batch", type=int, default=1000, help="distinct names per transaction")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.batch))
@@ -1,9 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from app.archive import archiver
+from app.config import settings
+from app.db import async_engine, async_writer_engine, engine
+from app.holds import sweeper
+from app.lifecycle import lifecycle
+from app.locations import location_index, refresher
+from app.pagination import NEXT_CURSOR_HEADER
+from app.query_metrics import QueryMetricsMiddleware
+from app.read_model import bookable_rides, maintain
+from app.ride_events import ride_events
+from app.routers import auth, bookings, dashboard, locations, metrics, rides, vehicles
+from app.search import search_backend
+
 
-from app.routers import auth, bookings, rides, vehicles
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # Detect the text-search index up front so requests never block on it
+    await run_in_threadpool(search_backend)
+    await location_index.reload()
+    tasks = [asyncio.create_task(sweeper()), asyncio.create_task(refresher())]
+    if settings.RIDE_LIFECYCLE_SECONDS > 0:
+        tasks.append(asyncio.create_task(lifecycle()))
+    if settings.ARCHIVE_SECONDS > 0:
+        tasks.append(asyncio.create_task(archiver()))
+    if settings.READ_MODEL:
+        await bookable_rides.reload()
+        tasks.append(asyncio.create_task(maintain()))
+    yield
+    ride_events.close()
+    for task in tasks:
+        task.cancel()
+    for async_pool in (async_engine, async_writer_engine):
+        if async_pool is not None:
+            await async_pool.dispose()
+    engine.dispose()
 
-app = FastAPI(title="Campus Carpool API", version="1.0.0")
+
+app = FastAPI(title="Campus Carpool API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -12,12 +53,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+if settings.SQL_METRICS:
+    app.add_middleware(QueryMetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(vehicles.router)
 app.include_router(rides.router)
+app.include_router(locations.router)
 app.include_router(bookings.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
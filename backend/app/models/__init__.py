@@ -1,6 +1,9 @@
 from app.models.user import User
+from app.models.location import Location
 from app.models.vehicle import Vehicle
 from app.models.ride import Ride
 from app.models.booking import Booking
+from app.models.seat_hold import SeatHold
+from app.models.history import BookingHistory, RideHistory
 
-__all__ = ["User", "Vehicle", "Ride", "Booking"]
+__all__ = ["User", "Location", "Vehicle", "Ride", "Booking", "SeatHold", "RideHistory", "BookingHistory"]
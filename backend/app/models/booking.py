@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Text, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Text, ForeignKey, CheckConstraint, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
 from sqlalchemy.orm import relationship
 
@@ -27,6 +27,16 @@ class Booking(Base):
             name="check_booking_status",
         ),
         UniqueConstraint("ride_id", "passenger_id", name="unique_ride_passenger"),
+        Index("ix_bookings_passenger_time", "passenger_id", "booking_time", "booking_id"),
+        # Waitlist in FIFO order; mirrors alembic revision 004_waitlist_index
+        Index(
+            "ix_bookings_ride_pending",
+            "ride_id",
+            "booking_time",
+            "booking_id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
     )
 
     # Relationships
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Float, Index, Integer, Numeric, Text
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+
+from app.db import Base
+
+
+def _archived_at():
+    return Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class RideHistory(Base):
+    """A finished ride moved out of `rides` by app.archive; same columns plus archived_at."""
+
+    __tablename__ = "rides_history"
+
+    ride_id = Column(UUID(as_uuid=True), primary_key=True)
+    driver_id = Column(UUID(as_uuid=True), nullable=False)
+    vehicle_id = Column(UUID(as_uuid=True), nullable=False)
+    origin_location = Column(Text, nullable=False)
+    destination_location = Column(Text, nullable=False)
+    origin_location_id = Column(Integer, nullable=True)
+    destination_location_id = Column(Integer, nullable=True)
+    departure_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    arrival_time = Column(TIMESTAMP(timezone=True), nullable=True)
+    seats_available = Column(Integer, nullable=False)
+    price_per_seat = Column(Numeric(6, 2), nullable=False)
+    status = Column(Text, nullable=False)
+    origin_lat = Column(Float, nullable=True)
+    origin_lon = Column(Float, nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lon = Column(Float, nullable=True)
+    series_id = Column(UUID(as_uuid=True), nullable=True)
+    archived_at = _archived_at()
+
+    __table_args__ = (
+        # Mirrors alembic revision 006_history_tables
+        Index("ix_rides_history_driver_departure", "driver_id", "departure_time", "ride_id"),
+    )
+
+
+class BookingHistory(Base):
+    """A booking archived together with its ride; see RideHistory."""
+
+    __tablename__ = "bookings_history"
+
+    booking_id = Column(UUID(as_uuid=True), primary_key=True)
+    ride_id = Column(UUID(as_uuid=True), nullable=False)
+    passenger_id = Column(UUID(as_uuid=True), nullable=False)
+    booking_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    status = Column(Text, nullable=False)
+    archived_at = _archived_at()
+
+    __table_args__ = (
+        Index("ix_bookings_history_passenger_time", "passenger_id", "booking_time", "booking_id"),
+        Index("ix_bookings_history_ride", "ride_id"),
+    )
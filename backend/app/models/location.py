@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Text
+
+from app.db import Base
+
+
+class Location(Base):
+    """A canonical place name; rides reference it, see app.locations."""
+
+    __tablename__ = "locations"
+
+    location_id = Column(Integer, primary_key=True, autoincrement=True)
+    # Display form: the first spelling seen, with whitespace collapsed
+    name = Column(Text, nullable=False)
+    # Lookup form (app.locations.location_key); unique, so one row per place
+    key = Column(Text, nullable=False, unique=True)
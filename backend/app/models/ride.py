@@ -1,6 +1,18 @@
 import uuid
 
-from sqlalchemy import Column, Text, Integer, Numeric, ForeignKey, CheckConstraint
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    Text,
+    event,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
 from sqlalchemy.orm import relationship
 
@@ -15,11 +27,21 @@ class Ride(Base):
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.vehicle_id"), nullable=False)
     origin_location = Column(Text, nullable=False)
     destination_location = Column(Text, nullable=False)
+    # Canonical places for the text above; null only for rows not yet backfilled
+    origin_location_id = Column(Integer, ForeignKey("locations.location_id"), nullable=True)
+    destination_location_id = Column(Integer, ForeignKey("locations.location_id"), nullable=True)
     departure_time = Column(TIMESTAMP(timezone=True), nullable=False)
     arrival_time = Column(TIMESTAMP(timezone=True), nullable=True)
     seats_available = Column(Integer, nullable=False)
     price_per_seat = Column(Numeric(6, 2), nullable=False, default=0)
     status = Column(Text, nullable=False, default="scheduled")
+    # Optional coordinates for /rides/nearby, in degrees (WGS 84)
+    origin_lat = Column(Float, nullable=True)
+    origin_lon = Column(Float, nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lon = Column(Float, nullable=True)
+    # Shared by the occurrences of a recurring ride created through /rides/series
+    series_id = Column(UUID(as_uuid=True), nullable=True)
 
     __table_args__ = (
         CheckConstraint("seats_available >= 0", name="check_seats_available_non_negative"),
@@ -27,9 +49,108 @@ class Ride(Base):
             "status IN ('scheduled', 'completed', 'cancelled')",
             name="check_ride_status",
         ),
+        # Indexes mirror alembic revision 002_query_indexes
+        Index("ix_rides_status_departure", "status", "departure_time", "ride_id"),
+        Index(
+            "ix_rides_scheduled_departure",
+            "departure_time",
+            "ride_id",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+        Index("ix_rides_driver_departure", "driver_id", "departure_time", "ride_id"),
+        # Search by canonical place; mirrors alembic revision 009_locations
+        Index(
+            "ix_rides_scheduled_origin_location",
+            "origin_location_id",
+            "departure_time",
+            "ride_id",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+        Index(
+            "ix_rides_scheduled_destination_location",
+            "destination_location_id",
+            "departure_time",
+            "ride_id",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+        # Series-level updates; mirrors alembic revision 010_ride_series
+        Index(
+            "ix_rides_series",
+            "series_id",
+            "departure_time",
+            postgresql_where=text("series_id IS NOT NULL"),
+            sqlite_where=text("series_id IS NOT NULL"),
+        ),
+        # Arrival-time windows over live rides; mirrors alembic revision 008_arrival_index
+        Index(
+            "ix_rides_scheduled_arrival",
+            "arrival_time",
+            "ride_id",
+            postgresql_where=text("status = 'scheduled' AND arrival_time IS NOT NULL"),
+            sqlite_where=text("status = 'scheduled' AND arrival_time IS NOT NULL"),
+        ),
+        # Bounding-box scans of live rides; mirrors alembic revision 007_ride_coordinates
+        Index(
+            "ix_rides_scheduled_origin_coords",
+            "origin_lat",
+            "origin_lon",
+            postgresql_where=text("status = 'scheduled' AND origin_lat IS NOT NULL"),
+            sqlite_where=text("status = 'scheduled' AND origin_lat IS NOT NULL"),
+        ),
+        Index(
+            "ix_rides_scheduled_destination_coords",
+            "destination_lat",
+            "destination_lon",
+            postgresql_where=text("status = 'scheduled' AND destination_lat IS NOT NULL"),
+            sqlite_where=text("status = 'scheduled' AND destination_lat IS NOT NULL"),
+        ),
     )
 
     # Relationships
     driver = relationship("User", back_populates="rides")
     vehicle = relationship("Vehicle", back_populates="rides")
     bookings = relationship("Booking", back_populates="ride", cascade="all, delete-orphan")
+
+
+# FTS5 trigram index for location search, mirroring alembic revision
+# 003_location_search so SQLite databases built with create_all get it too
+RIDES_FTS_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE rides_fts USING fts5(
+        origin_location, destination_location,
+        content='rides', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER rides_fts_insert AFTER INSERT ON rides BEGIN
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_delete AFTER DELETE ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+    END
+    """,
+    """
+    CREATE TRIGGER rides_fts_update AFTER UPDATE OF origin_location, destination_location
+    ON rides BEGIN
+        INSERT INTO rides_fts(rides_fts, rowid, origin_location, destination_location)
+        VALUES ('delete', old.rowid, old.origin_location, old.destination_location);
+        INSERT INTO rides_fts(rowid, origin_location, destination_location)
+        VALUES (new.rowid, new.origin_location, new.destination_location);
+    END
+    """,
+]
+
+for _statement in RIDES_FTS_SQLITE_DDL:
+    event.listen(Ride.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Ride.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS rides_fts").execute_if(dialect="sqlite"),
+)
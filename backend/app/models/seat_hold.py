@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+from sqlalchemy.orm import relationship
+
+from app.db import Base
+
+
+class SeatHold(Base):
+    """A seat reserved for a passenger until expires_at; see app.holds."""
+
+    __tablename__ = "seat_holds"
+
+    hold_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    ride_id = Column(UUID(as_uuid=True), ForeignKey("rides.ride_id"), nullable=False)
+    passenger_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("ride_id", "passenger_id", name="unique_hold_ride_passenger"),
+        # Mirrors alembic revision 005_seat_holds
+        Index("ix_seat_holds_expires", "expires_at", "hold_id"),
+    )
+
+    # Relationships
+    ride = relationship("Ride")
+    passenger = relationship("User")
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -22,6 +22,7 @@ class Vehicle(Base):
 
     __table_args__ = (
         CheckConstraint("seats_total > 0", name="check_seats_total_positive"),
+        Index("ix_vehicles_owner", "owner_id", "vehicle_id"),
     )
 
     # Relationships
@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are cut on the same columns the query is ordered by, so fetching page N
+costs the same as fetching page 1 no matter how large the table grows. The
+cursor handed to clients is an opaque base64 token of the last row's keys.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Dependency collecting the `cursor` and `limit` query parameters."""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(values: tuple) -> str:
+    """Encode the key values of the last row on a page into an opaque token."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> tuple:
+    """Decode a cursor token back into typed key values for `columns`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is UUID:
+                values.append(UUID(value))
+            else:
+                values.append(python_type(value))
+        return tuple(values)
+    except (ValueError, TypeError, binascii.Error, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def _keyset(stmt: Select, columns: list, keys: tuple | None, limit: int, descending: bool) -> Select:
+    """`stmt` cut after `keys`, ordered by `columns`, with room to detect a next page."""
+    if keys is not None:
+        if descending:
+            stmt = stmt.where(tuple_(*columns) < tuple_(*keys))
+        else:
+            stmt = stmt.where(tuple_(*columns) > tuple_(*keys))
+    order = [c.desc() for c in columns] if descending else list(columns)
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    columns: list,
+    page: PageParams,
+    descending: bool = False,
+    rows: bool = False,
+    union: list[tuple[Select, list]] = (),
+) -> tuple[list, str | None]:
+    """
+    Run `stmt` with keyset pagination, ordered by `columns`.
+    The last column must be unique (the primary key) so the order is total.
+    Returns ORM objects, or Core rows when `rows` is set (for column selects),
+    and the cursor for the next page, or None on the last page.
+
+    `union` merges in more (select, columns) pairs with the same result
+    columns, e.g. from history tables; needs `rows`. Each one is cut and
+    limited on its own index before the merge.
+    """
+    keys = decode_cursor(page.cursor, columns) if page.cursor else None
+    if union:
+        parts = [
+            select(_keyset(part, part_columns, keys, page.limit, descending).subquery())
+            for part, part_columns in [(stmt, columns), *union]
+        ]
+        merged = union_all(*parts).subquery()
+        columns = [merged.c[c.key] for c in columns]
+        stmt, keys = select(merged), None
+
+    result = await db.execute(_keyset(stmt, columns, keys, page.limit, descending))
+    items = result.all() if rows else result.scalars().all()
+
+    if len(items) <= page.limit:
+        return items, None
+    items = items[: page.limit]
+    last = items[-1]
+    return items, encode_cursor(tuple(getattr(last, c.key) for c in columns))
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    columns: list,
+    page: PageParams,
+    response: Response,
+    descending: bool = False,
+    rows: bool = False,
+    union: list[tuple[Select, list]] = (),
+) -> list:
+    """fetch_page, setting the X-Next-Cursor header when more rows remain."""
+    items, next_cursor = await fetch_page(db, stmt, columns, page, descending, rows, union)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
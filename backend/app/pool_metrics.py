@@ -0,0 +1,160 @@
+"""
+Connection pool instrumentation.
+
+Counts come from SQLAlchemy pool events (connect, checkout, checkin, close,
+invalidate). Pool events fire only once a connection has been handed out, so
+checkout wait time is measured by the Instrumented* pool classes, which time
+the pool's internal get. Stats are keyed by the engine's pool_logging_name,
+which the pool keeps as logging_name and carries over when dispose() recreates it.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Checkouts slower than this are counted as waits for a free connection
+SLOW_CHECKOUT_SECONDS = 0.01
+
+
+class PoolStats:
+    """Running counters for one pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_in_use = 0
+        self.connections_opened = 0
+        self.overflow_opened = 0
+        self.connections_closed = 0
+        self.lifetime_total = 0.0
+        self.lifetime_max = 0.0
+        self.invalidations = 0
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+
+    def observe_in_use(self, in_use: int):
+        with self._lock:
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def observe_open(self, overflow: bool):
+        with self._lock:
+            self.connections_opened += 1
+            if overflow:
+                self.overflow_opened += 1
+
+    def observe_close(self, lifetime: float | None):
+        with self._lock:
+            self.connections_closed += 1
+            if lifetime is not None:
+                self.lifetime_total += lifetime
+                self.lifetime_max = max(self.lifetime_max, lifetime)
+
+    def observe_invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> dict:
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "checkout_wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": self.wait_max * 1000,
+                "peak_in_use": self.peak_in_use,
+                "connections_opened": self.connections_opened,
+                "overflow_opened": self.overflow_opened,
+                "connections_closed": self.connections_closed,
+                "connection_lifetime_avg_s": (
+                    self.lifetime_total / self.connections_closed if self.connections_closed else 0.0
+                ),
+                "connection_lifetime_max_s": self.lifetime_max,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                # QueuePool.overflow() is negative while the pool is below size
+                overflow=max(pool.overflow(), 0),
+            )
+        return data
+
+
+_stats: dict[str, PoolStats] = {}
+_engines: dict[str, Engine] = {}
+
+
+def _stats_for(pool: Pool) -> PoolStats | None:
+    return _stats.get(getattr(pool, "logging_name", None))
+
+
+class _TimedCheckout:
+    """Mixin timing how long a checkout waits inside the pool."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = _stats_for(self)
+            if stats is not None:
+                stats.observe_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument(sync_engine: Engine, name: str) -> Engine:
+    """Attach pool event listeners to an engine created with pool_logging_name=name."""
+    stats = _stats.setdefault(name, PoolStats(name))
+    _engines[name] = sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["opened_at"] = time.monotonic()
+        pool = sync_engine.pool
+        stats.observe_open(overflow=isinstance(pool, QueuePool) and pool.overflow() > 0)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            stats.observe_in_use(pool.checkedout())
+        if not isinstance(pool, (InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool)):
+            stats.observe_wait(0.0)
+
+    @event.listens_for(sync_engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        opened_at = connection_record.info.pop("opened_at", None)
+        stats.observe_close(time.monotonic() - opened_at if opened_at is not None else None)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.observe_invalidate()
+
+    return sync_engine
+
+
+def pool_metrics() -> dict:
+    """Snapshot of every instrumented pool, keyed by name."""
+    return {name: _stats[name].snapshot(engine.pool) for name, engine in _engines.items()}
@@ -0,0 +1,128 @@
+"""
+Per-request SQL statement counting and timing.
+
+SQLAlchemy cursor events on every Engine add each statement's count and
+duration to the stats of the request that issued it, found through a context
+variable set by QueryMetricsMiddleware. The middleware reports the totals in
+a Server-Timing header and one structured log line per request. It logs a
+warning when the same statement shape runs more than SQL_REPEAT_WARN_THRESHOLD
+times in one request, which is usually an N+1 pattern.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.query_metrics")
+
+
+class RequestQueryStats:
+    """Statement count, DB time and per-shape counts for one request."""
+
+    __slots__ = ("queries", "db_seconds", "shapes")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+    stats.queries += 1
+    # Statements are already parameterized, so the text is the shape
+    stats.shapes[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware that collects RequestQueryStats for each HTTP request."""
+
+    def __init__(self, app, repeat_threshold: int = settings.SQL_REPEAT_WARN_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._report(scope, status_code, stats, time.perf_counter() - started)
+
+    def _report(self, scope, status_code: int, stats: RequestQueryStats, elapsed: float):
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        route = scope.get("route")
+        path = getattr(route, "path", scope.get("path"))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": "request_sql",
+                "method": scope.get("method"),
+                "path": path,
+                "status": status_code,
+                "queries": stats.queries,
+                "db_ms": round(stats.db_seconds * 1000, 2),
+                "total_ms": round(elapsed * 1000, 2),
+            }))
+        repeated = {
+            shape: count for shape, count in stats.shapes.items() if count > self.repeat_threshold
+        }
+        for shape, count in repeated.items():
+            logger.warning(json.dumps({
+                "event": "repeated_statement",
+                "method": scope.get("method"),
+                "path": path,
+                "count": count,
+                "statement": " ".join(shape.split())[:300],
+            }))
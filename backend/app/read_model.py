@@ -0,0 +1,550 @@
+"""
+Process-local read model of bookable rides.
+
+Searches only ever return rides with status 'scheduled' that have not departed,
+a small set compared with the rides table. BookableRides keeps that set in
+memory as compact RideRecord objects with a list of (departure, ride_id) keys
+sorted by departure, maps from normalized origin/destination text and from
+canonical location IDs to ride IDs and per-day buckets, so search_rides can
+answer without touching SQL. Rides with coordinates are also in two GeoGrids
+(origin and destination) for /rides/nearby.
+
+Time windows (app.time_window) are answered from the same departure-sorted
+keys plus (arrival, ride_id) keys sorted by arrival: each bound is a bisect.
+The snapshot also tracks the longest ride duration it has held, so an
+arrival bound narrows the departure range too (a ride arriving after t
+departed after t - longest) and overlap queries stay sublinear.
+
+The ride and booking routers apply their writes after committing: upsert for
+created/updated rides, remove for cancelled ones and seat deltas for bookings.
+Deltas commute, so concurrent bookings never lose an update. maintain() runs
+in the background: it drops departed rides every READ_MODEL_SWEEP_SECONDS and
+reloads from the database every READ_MODEL_RESYNC_SECONDS, which also picks up
+writes made by other worker processes. diff() compares the model with SQL.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import heapq
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db import get_db
+from app.geo import GeoGrid, bounding_box, haversine_km
+from app.models import Ride
+from app.response_cache import normalize_location
+from app.time_window import TimeWindow
+
+logger = logging.getLogger("app.read_model")
+
+# Columns served by RideRead, copied from the ORM row as loaded so responses
+# are identical to the SQL path
+RIDE_FIELDS = (
+    "ride_id", "driver_id", "vehicle_id", "origin_location", "destination_location",
+    "departure_time", "arrival_time", "price_per_seat", "seats_available", "status",
+    "origin_location_id", "destination_location_id", "origin_lat", "origin_lon", "destination_lat", "destination_lon",
+    "series_id",
+)
+
+
+def _utc(value: datetime) -> datetime:
+    """Comparable UTC form of a timestamp; naive values (SQLite) are already UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class RideRecord:
+    """A bookable ride: the RideRead fields plus precomputed search keys."""
+
+    __slots__ = RIDE_FIELDS + ("origin_key", "destination_key", "sort_key", "arrival_key")
+
+    def __init__(self, ride):
+        for name in RIDE_FIELDS:
+            setattr(self, name, getattr(ride, name))
+        self.origin_key = normalize_location(self.origin_location) or ""
+        self.destination_key = normalize_location(self.destination_location) or ""
+        self.sort_key = (_utc(self.departure_time), self.ride_id)
+        self.arrival_key = None if self.arrival_time is None else (_utc(self.arrival_time), self.ride_id)
+
+    @property
+    def day(self) -> date:
+        return self.sort_key[0].date()
+
+
+# Sorts after every (t, ride_id) key with the same t
+_LAST_ID = UUID(int=(1 << 128) - 1)
+
+
+def _after(keys: list, lower: tuple):
+    """Iterate the sorted `keys` that sort after `lower`, without copying."""
+    return (keys[i] for i in range(bisect.bisect_right(keys, lower), len(keys)))
+
+
+def _span(keys: list, lower: datetime | None, upper: datetime | None) -> tuple[int, int]:
+    """Index range of the sorted (time, ride_id) `keys` with lower <= time <= upper."""
+    start = 0 if lower is None else bisect.bisect_left(keys, (lower,))
+    end = len(keys) if upper is None else bisect.bisect_right(keys, (upper, _LAST_ID))
+    return start, max(start, end)
+
+
+def _width(keys: list, lower: datetime | None, upper: datetime | None) -> int:
+    start, end = _span(keys, lower, upper)
+    return end - start
+
+
+def _by_arrival_first(arriving: int, departing: int, limit: int | None) -> bool:
+    """
+    Whether to sort the `arriving` rides of an arrival range into departure
+    order rather than filter the `departing` rides of the departure range.
+    A departure scan stops after `limit` matches, about limit * departing /
+    arriving rides in; without a limit both read their whole range.
+    """
+    if limit is None:
+        return arriving < departing
+    return arriving * arriving < limit * departing
+
+
+class _Snapshot:
+    """The indexed record set; callers synchronize access."""
+
+    def __init__(self, rides=()):
+        self.records: dict[UUID, RideRecord] = {}
+        # Each index value is a list of sort keys kept in departure order
+        self.order: list[tuple[datetime, UUID]] = []
+        self.by_origin: dict[str, list] = {}
+        self.by_destination: dict[str, list] = {}
+        self.by_origin_id: dict[int | None, list] = {}
+        self.by_destination_id: dict[int | None, list] = {}
+        self.by_day: dict[date, list] = {}
+        self.by_arrival: list[tuple[datetime, UUID]] = []
+        # Longest arrival - departure seen; only grows until the next rebuild
+        self.longest = timedelta(0)
+        self.origins = GeoGrid(settings.GEO_CELL_DEGREES)
+        self.destinations = GeoGrid(settings.GEO_CELL_DEGREES)
+        for record in sorted((RideRecord(ride) for ride in rides), key=lambda r: r.sort_key):
+            self.records[record.ride_id] = record
+            for keys in self._lists(record):
+                keys.append(record.sort_key)
+            self._locate(record)
+            self._time(record)
+        self.by_arrival.sort()
+
+    def _locate(self, record: RideRecord):
+        if record.origin_lat is not None and record.origin_lon is not None:
+            self.origins.add(record.ride_id, record.origin_lat, record.origin_lon, record)
+        if record.destination_lat is not None and record.destination_lon is not None:
+            self.destinations.add(record.ride_id, record.destination_lat, record.destination_lon, record)
+
+    def _time(self, record: RideRecord, insort: bool = False):
+        if record.arrival_key is None:
+            return
+        if insort:
+            bisect.insort(self.by_arrival, record.arrival_key)
+        else:
+            self.by_arrival.append(record.arrival_key)
+        self.longest = max(self.longest, record.arrival_key[0] - record.sort_key[0])
+
+    def _lists(self, record: RideRecord) -> list[list]:
+        return [
+            self.order,
+            self.by_origin.setdefault(record.origin_key, []),
+            self.by_destination.setdefault(record.destination_key, []),
+            self.by_origin_id.setdefault(record.origin_location_id, []),
+            self.by_destination_id.setdefault(record.destination_location_id, []),
+            self.by_day.setdefault(record.day, []),
+        ]
+
+    def add(self, record: RideRecord):
+        self.discard(record.ride_id)
+        self.records[record.ride_id] = record
+        for keys in self._lists(record):
+            bisect.insort(keys, record.sort_key)
+        self._locate(record)
+        self._time(record, insort=True)
+
+    def discard(self, ride_id: UUID) -> RideRecord | None:
+        record = self.records.pop(ride_id, None)
+        if record is None:
+            return None
+        for keys in self._lists(record):
+            index = bisect.bisect_left(keys, record.sort_key)
+            if index < len(keys) and keys[index] == record.sort_key:
+                del keys[index]
+        if record.arrival_key is not None:
+            index = bisect.bisect_left(self.by_arrival, record.arrival_key)
+            if index < len(self.by_arrival) and self.by_arrival[index] == record.arrival_key:
+                del self.by_arrival[index]
+        for mapping, key in (
+            (self.by_origin, record.origin_key),
+            (self.by_destination, record.destination_key),
+            (self.by_origin_id, record.origin_location_id),
+            (self.by_destination_id, record.destination_location_id),
+            (self.by_day, record.day),
+        ):
+            if not mapping[key]:
+                del mapping[key]
+        self.origins.discard(ride_id)
+        self.destinations.discard(ride_id)
+        return record
+
+    def stream(self, mapping: dict[str, list], term: str, lower: tuple):
+        """Sort keys after `lower` of every location containing `term`, in order."""
+        # Few distinct locations, many rides: scan the location names, not the rides
+        return heapq.merge(*(
+            _after(keys, lower)
+            for location, keys in mapping.items()
+            if term in location
+        ))
+
+
+class BookableRides:
+    """Thread-safe wrapper around the current snapshot, with counters."""
+
+    def __init__(self):
+        self._snapshot = _Snapshot()
+        self._lock = threading.Lock()
+        self._touched: set[UUID] | None = None
+        self.ready = False
+        self.loaded_at: datetime | None = None
+        self.searches = 0
+        self.nearby_searches = 0
+        self.window_searches = 0
+        self.upserts = 0
+        self.removals = 0
+        self.expired = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._snapshot.records)
+
+    def upsert(self, ride, keep_seats: bool = False):
+        """
+        Insert or replace `ride` (an ORM Ride or record), dropping it if it is
+        no longer scheduled. keep_seats preserves the model's own seat count,
+        for writes that cannot change seats and must not race booking deltas.
+        """
+        with self._lock:
+            self._touch(ride.ride_id)
+            if ride.status != "scheduled":
+                if self._snapshot.discard(ride.ride_id) is not None:
+                    self.removals += 1
+                return
+            record = RideRecord(ride)
+            existing = self._snapshot.records.get(ride.ride_id)
+            if keep_seats and existing is not None:
+                record.seats_available = existing.seats_available
+            self._snapshot.add(record)
+            self.upserts += 1
+
+    def remove(self, ride_id: UUID):
+        with self._lock:
+            self._touch(ride_id)
+            if self._snapshot.discard(ride_id) is not None:
+                self.removals += 1
+
+    def adjust_seats(self, ride_id: UUID, delta: int):
+        """Apply a committed booking (-1) or cancellation (+1) to a ride."""
+        with self._lock:
+            self._touch(ride_id)
+            record = self._snapshot.records.get(ride_id)
+            if record is not None:
+                record.seats_available += delta
+
+    def expire(self, now: datetime | None = None) -> int:
+        """Drop rides that have departed; returns how many were dropped."""
+        now = _utc(now or datetime.now(timezone.utc))
+        with self._lock:
+            order = self._snapshot.order
+            departed = [ride_id for _, ride_id in order[: bisect.bisect_left(order, (now,))]]
+            for ride_id in departed:
+                self._snapshot.discard(ride_id)
+            self.expired += len(departed)
+        return len(departed)
+
+    def search(
+        self,
+        origin: str | None,
+        destination: str | None,
+        day: date | None,
+        after: tuple[datetime, UUID] | None,
+        limit: int,
+        now: datetime | None = None,
+        window: TimeWindow | None = None,
+        place_ids: tuple[int | None, int | None] = (None, None),
+    ) -> list[RideRecord]:
+        """
+        Up to `limit` bookable rides matching the filters, in (departure, ride_id)
+        order, starting after the `after` key. Location terms match as
+        case-insensitive substrings, like filter_locations; place_ids are
+        (origin, destination) location IDs that must match exactly. A flexible
+        `window` instead returns the `limit` rides nearest to it, ignoring `after`.
+        """
+        flexible = window is not None and window.flexible
+        lower = (_utc(now or datetime.now(timezone.utc)),)
+        if after is not None and not flexible:
+            lower = max(lower, (_utc(after[0]), after[1]))
+        origin, destination = normalize_location(origin), normalize_location(destination)
+        origin_id, destination_id = place_ids
+
+        with self._lock:
+            self.searches += 1
+            snapshot = self._snapshot
+            upper = arrivals = None
+            if window is not None and window.active:
+                self.window_searches += 1
+                depart_after, depart_before, arrive_after, arrive_before = window.bounds
+                # A ride departs no later than it arrives and at most `longest` before
+                floors = [depart_after, arrive_after and arrive_after - snapshot.longest]
+                ceilings = [depart_before, arrive_before]
+                floor = max((t for t in floors if t is not None), default=None)
+                upper = min((t for t in ceilings if t is not None), default=None)
+                if floor is not None:
+                    lower = max(lower, (floor,))
+                if arrive_after is not None or arrive_before is not None:
+                    arrivals = _span(snapshot.by_arrival, arrive_after, arrive_before)
+
+            # Walk the most selective index in departure order, filtering by the rest;
+            # (now,) sorts before every (now, ride_id), so departure == now is kept
+            if origin_id is not None or destination_id is not None:
+                # One integer-keyed list, already in departure order
+                if origin_id is not None:
+                    keys = snapshot.by_origin_id.get(origin_id, [])
+                else:
+                    keys = snapshot.by_destination_id.get(destination_id, [])
+                stream = _after(keys, lower)
+            elif day is not None:
+                stream = _after(snapshot.by_day.get(day, []), lower)
+            elif origin:
+                stream = snapshot.stream(snapshot.by_origin, origin, lower)
+            elif destination:
+                stream = snapshot.stream(snapshot.by_destination, destination, lower)
+            elif arrivals is not None and _by_arrival_first(
+                arrivals[1] - arrivals[0], _width(snapshot.order, lower[0], upper), None if flexible else limit
+            ):
+                stream = _after(sorted(
+                    snapshot.records[ride_id].sort_key
+                    for _, ride_id in snapshot.by_arrival[arrivals[0]:arrivals[1]]
+                ), lower)
+            else:
+                stream = _after(snapshot.order, lower)
+
+            results = []
+            for departure, ride_id in stream:
+                if upper is not None and departure > upper:
+                    break
+                record = snapshot.records[ride_id]
+                if origin_id is not None and record.origin_location_id != origin_id:
+                    continue
+                if destination_id is not None and record.destination_location_id != destination_id:
+                    continue
+                if day is not None and record.day != day:
+                    continue
+                if origin and origin not in record.origin_key:
+                    continue
+                if destination and destination not in record.destination_key:
+                    continue
+                if window is not None and window.active:
+                    arrival = record.arrival_key and record.arrival_key[0]
+                    if not window.admits(departure, arrival):
+                        continue
+                results.append(record)
+                if len(results) == limit and not flexible:
+                    break
+
+        if flexible:
+            def closeness(record):
+                arrival = record.arrival_key and record.arrival_key[0]
+                return window.distance(record.sort_key[0], arrival), record.sort_key
+
+            results = heapq.nsmallest(limit, results, key=closeness)
+        return results
+
+    def nearby(
+        self,
+        origin: tuple[float, float, float] | None,
+        destination: tuple[float, float, float] | None,
+        limit: int,
+        now: datetime | None = None,
+    ) -> list[tuple[RideRecord, float | None, float | None]]:
+        """
+        Up to `limit` bookable rides whose origin and/or destination lie within
+        the given (lat, lon, radius_km) circles, as (record, origin distance,
+        destination distance), closest first by the sum of the distances.
+        """
+        now = _utc(now or datetime.now(timezone.utc))
+        with self._lock:
+            self.nearby_searches += 1
+            snapshot = self._snapshot
+            # Prune with the grid of whichever side has fewer candidates and
+            # check the other side only on the rides that survive
+            sides = [
+                (grid.estimate(*circle), grid, circle, index)
+                for grid, circle, index in (
+                    (snapshot.origins, origin, 0),
+                    (snapshot.destinations, destination, 1),
+                )
+                if circle is not None
+            ]
+            _, grid, circle, index = min(sides, key=lambda side: side[0])
+            other = destination if index == 0 else origin
+            if other is not None:
+                min_lat, max_lat, min_lon, max_lon = bounding_box(*other)
+
+            # Cells come nearest first and a ride's score is at least its
+            # distance on this side, so stop once a cell's bound is beyond the
+            # limit-th best score so far (`worst` holds the negated best scores)
+            matches = []
+            worst: list[float] = []
+            for bound, cell_matches in grid.scan(*circle):
+                if len(worst) == limit and bound > -worst[0]:
+                    break
+                for record, distance in cell_matches:
+                    if record.sort_key[0] < now:
+                        continue
+                    other_distance = None
+                    if other is not None:
+                        lat, lon = (
+                            (record.destination_lat, record.destination_lon) if index == 0
+                            else (record.origin_lat, record.origin_lon)
+                        )
+                        if lat is None or not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                            continue
+                        other_distance = haversine_km(other[0], other[1], lat, lon)
+                        if other_distance > other[2]:
+                            continue
+                    score = distance + (other_distance or 0)
+                    if len(worst) < limit:
+                        heapq.heappush(worst, -score)
+                    elif score < -worst[0]:
+                        heapq.heapreplace(worst, -score)
+                    elif score > -worst[0]:
+                        continue
+                    if index == 0:
+                        matches.append((score, record, distance, other_distance))
+                    else:
+                        matches.append((score, record, other_distance, distance))
+
+        best = heapq.nsmallest(limit, matches, key=lambda match: (match[0], match[1].sort_key))
+        return [match[1:] for match in best]
+
+    async def reload(self):
+        """Rebuild from the database and swap the new snapshot in."""
+        with self._lock:
+            self._touched = set()
+        rides = await _load(select(Ride).where(
+            Ride.status == "scheduled",
+            Ride.departure_time >= datetime.now(timezone.utc),
+        ))
+        snapshot = await run_in_threadpool(_Snapshot, rides)
+        with self._lock:
+            touched, self._touched = self._touched, None
+            self._snapshot = snapshot
+            self.ready = True
+            self.loaded_at = datetime.now(timezone.utc)
+            self.reloads += 1
+        if touched:
+            # Writes that landed while loading may predate the snapshot; re-read them
+            fresh = {ride.ride_id: ride for ride in await _load(select(Ride).where(Ride.ride_id.in_(touched)))}
+            for ride_id in touched:
+                if ride_id in fresh:
+                    self.upsert(fresh[ride_id])
+                else:
+                    self.remove(ride_id)
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "rides": len(self._snapshot.records),
+                "loaded_at": self.loaded_at,
+                "searches": self.searches,
+                "nearby_searches": self.nearby_searches,
+                "window_searches": self.window_searches,
+                "longest_ride": self._snapshot.longest.total_seconds(),
+                "with_origin_coordinates": len(self._snapshot.origins),
+                "upserts": self.upserts,
+                "removals": self.removals,
+                "expired": self.expired,
+                "reloads": self.reloads,
+            }
+
+    def records(self) -> list[RideRecord]:
+        with self._lock:
+            return list(self._snapshot.records.values())
+
+    def _touch(self, ride_id: UUID):
+        # Caller holds the lock
+        if self._touched is not None:
+            self._touched.add(ride_id)
+
+
+async def _load(stmt) -> list:
+    """Run `stmt` on a session from get_db, so it works for either DB_ASYNC mode."""
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        return (await db.scalars(stmt)).all()
+
+
+async def diff(db, sample: int = 20) -> dict:
+    """
+    Compare the read model with the rides SQL considers bookable right now.
+    Returns counts and up to `sample` ride IDs per kind of discrepancy.
+    """
+    now = datetime.now(timezone.utc)
+    expected = {
+        ride.ride_id: ride
+        for ride in (await db.scalars(
+            select(Ride).where(Ride.status == "scheduled", Ride.departure_time >= now)
+        )).all()
+    }
+    actual = {record.ride_id: record for record in bookable_rides.records() if record.sort_key[0] >= now}
+    missing = [ride_id for ride_id in expected if ride_id not in actual]
+    extra = [ride_id for ride_id in actual if ride_id not in expected]
+    mismatched = {
+        ride_id: [
+            name for name in RIDE_FIELDS
+            if _comparable(getattr(expected[ride_id], name)) != _comparable(getattr(record, name))
+        ]
+        for ride_id, record in actual.items()
+        if ride_id in expected
+    }
+    mismatched = {ride_id: fields for ride_id, fields in mismatched.items() if fields}
+    return {
+        "consistent": not (missing or extra or mismatched),
+        "checked": len(expected),
+        "missing": {"count": len(missing), "sample": missing[:sample]},
+        "extra": {"count": len(extra), "sample": extra[:sample]},
+        "mismatched": {"count": len(mismatched), "sample": dict(list(mismatched.items())[:sample])},
+    }
+
+
+def _comparable(value):
+    return _utc(value) if isinstance(value, datetime) else value
+
+
+async def maintain():
+    """Background loop: expire departed rides, periodically reload from SQL."""
+    sweeps_per_resync = max(1, round(settings.READ_MODEL_RESYNC_SECONDS / settings.READ_MODEL_SWEEP_SECONDS))
+    sweep = 0
+    while True:
+        await asyncio.sleep(settings.READ_MODEL_SWEEP_SECONDS)
+        sweep += 1
+        try:
+            if sweep % sweeps_per_resync == 0:
+                await bookable_rides.reload()
+            else:
+                bookable_rides.expire()
+        except Exception:
+            logger.exception("read model maintenance failed")
+
+
+bookable_rides = BookableRides()
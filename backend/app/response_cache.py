@@ -0,0 +1,209 @@
+"""
+In-process cache of serialized ride responses.
+
+/rides/search and GET /rides/{ride_id} are read far more often than rides or
+bookings change. Entries hold the final JSON body plus its ETag, so a hit skips
+both the query and serialization, and a matching If-None-Match skips the body.
+
+Entries are indexed by the ride IDs they contain and, for searches, by the
+departure day they filter on. Handlers that write a ride call invalidate_ride
+(its fields changed) and, when a ride may enter or leave result sets,
+invalidate_departures (drops searches for that day and undated searches).
+Any invalidation bumps a version; a response computed before the bump is
+served but not stored, so a slow reader cannot cache a pre-write result.
+Like the principal cache this is per process; other workers rely on the TTL.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def to_response(self, request: Request) -> Response:
+        """Build the response, answering 304 when the client already has this body."""
+        headers = {"ETag": self.etag, **self.headers}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self.etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def departure_day(value: datetime) -> date:
+    """UTC calendar day of a departure time; naive values (SQLite) are already UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+class _Entry:
+    __slots__ = ("expires_at", "response", "ride_ids", "day")
+
+    def __init__(self, expires_at: float, response: CachedResponse, ride_ids: frozenset, day):
+        self.expires_at = expires_at
+        self.response = response
+        self.ride_ids = ride_ids
+        self.day = day
+
+
+class ResponseCache:
+    """Bounded LRU of CachedResponse with per-entry expiry and ride/day indexes."""
+
+    _SEARCHES = "searches"
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._by_ride: dict[UUID, set[tuple]] = {}
+        self._by_day: dict[date | None, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        """Return the cached response for key, or None on a miss."""
+        if self.maxsize <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.response
+
+    def put(
+        self,
+        key: tuple,
+        body: bytes,
+        version: int,
+        ride_ids=(),
+        search_day: date | None | str = _SEARCHES,
+        headers: dict[str, str] | None = None,
+    ) -> CachedResponse:
+        """
+        Cache `body` under key and return it as a CachedResponse.
+        `version` is the value of self.version read before querying; if anything
+        was invalidated since, the response is returned but not stored.
+        Pass search_day (a date, or None for undated searches) for search
+        results; leave it out for single-ride entries.
+        """
+        response = CachedResponse(body, make_etag(body), {k: v for k, v in (headers or {}).items() if v})
+        if self.maxsize <= 0:
+            return response
+        ride_ids = frozenset(ride_ids)
+        with self._lock:
+            if version != self.version:
+                self.stale_puts += 1
+                return response
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(time.time() + self.ttl_seconds, response, ride_ids, search_day)
+            for ride_id in ride_ids:
+                self._by_ride.setdefault(ride_id, set()).add(key)
+            if search_day is not self._SEARCHES:
+                self._by_day.setdefault(search_day, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return response
+
+    def invalidate_ride(self, ride_id: UUID):
+        """Drop every entry that contains ride_id."""
+        with self._lock:
+            self.version += 1
+            for key in self._by_ride.get(ride_id, set()).copy():
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_departures(self, *departures: datetime):
+        """Drop searches a ride departing at any of `departures` could now match."""
+        with self._lock:
+            self.version += 1
+            for day in {None, *(departure_day(d) for d in departures if d is not None)}:
+                for key in self._by_day.get(day, set()).copy():
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.version += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_ride.clear()
+            self._by_day.clear()
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
+
+    def _remove(self, key: tuple):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for ride_id in entry.ride_ids:
+            keys = self._by_ride.get(ride_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_ride[ride_id]
+        if entry.day is not self._SEARCHES:
+            keys = self._by_day.get(entry.day)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_day[entry.day]
+
+
+def normalize_location(value: str | None) -> str | None:
+    """
+    Cache-key form of a location filter, matching how filter_locations treats
+    it: stripped, and lowercased when ASCII (SQLite only folds ASCII case).
+    """
+    value = (value or "").strip()
+    if value.isascii():
+        value = value.lower()
+    return value or None
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
@@ -0,0 +1,233 @@
+"""
+In-process pub/sub of ride changes for GET /rides/events.
+
+Clients that would otherwise poll /rides/{ride_id} or rerun a search subscribe
+to ride IDs and/or search filters instead. The ride and booking routers publish
+the ride's RideRead fields after each committed write, and the hub hands the
+update to every matching Subscription.
+
+Each subscription holds at most one pending update per ride: a newer update
+replaces the queued one, so a burst of bookings reaches the client as a single
+event with the latest seat count. The pending set is bounded by
+RIDE_EVENTS_QUEUE_SIZE rides; a subscriber that falls that far behind is sent
+a "resync" event instead and should re-fetch. An idle subscription is just a
+coroutine parked on an asyncio.Event, so a worker can hold thousands.
+
+Everything runs on the event loop (the routers are async in both DB_ASYNC
+modes) and, like the response cache, only sees writes made by this process.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import date, timezone
+from uuid import UUID
+
+from app.config import settings
+from app.response_cache import normalize_location
+from app.serialization import dumps
+
+
+def _keys(ride: dict) -> tuple[str, str, date]:
+    """Normalized origin, destination and departure day, as filters compare them."""
+    departure = ride["departure_time"]
+    # Naive timestamps (SQLite) are UTC
+    if departure.tzinfo is not None:
+        departure = departure.astimezone(timezone.utc)
+    return (
+        normalize_location(ride["origin_location"]) or "",
+        normalize_location(ride["destination_location"]) or "",
+        departure.date(),
+    )
+
+
+class Subscription:
+    """One subscriber's interests and its coalescing queue of pending updates."""
+
+    __slots__ = (
+        "ride_ids", "origin", "destination", "day", "maxsize",
+        "_pending", "_wakeup", "overflowed", "closed", "delivered", "coalesced",
+    )
+
+    def __init__(
+        self,
+        ride_ids=(),
+        origin: str | None = None,
+        destination: str | None = None,
+        day: date | None = None,
+        maxsize: int = 64,
+    ):
+        self.ride_ids = frozenset(ride_ids)
+        self.origin = normalize_location(origin)
+        self.destination = normalize_location(destination)
+        self.day = day
+        self.maxsize = maxsize
+        self._pending: OrderedDict[UUID, dict] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self.overflowed = False
+        self.closed = False
+        self.delivered = 0
+        self.coalesced = 0
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.origin or self.destination or self.day)
+
+    def matches(self, keys: tuple[str, str, date]) -> bool:
+        """Whether a ride with these search keys (see _keys) fits the filters."""
+        origin, destination, day = keys
+        if self.origin and self.origin not in origin:
+            return False
+        if self.destination and self.destination not in destination:
+            return False
+        return self.day is None or self.day == day
+
+    def offer(self, ride: dict):
+        """Queue `ride`, replacing any update for the same ride still pending."""
+        ride_id = ride["ride_id"]
+        if ride_id in self._pending:
+            self._pending[ride_id] = ride
+            self.coalesced += 1
+        elif len(self._pending) >= self.maxsize:
+            # Too far behind to be worth catching up one ride at a time
+            self._pending.clear()
+            self.overflowed = True
+        elif not self.overflowed:
+            self._pending[ride_id] = ride
+        self._wakeup.set()
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for something to send; False on timeout."""
+        if self._pending or self.overflowed or self.closed:
+            return True
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def drain(self) -> tuple[list[dict], bool]:
+        """Take the pending updates and whether the subscriber must resync."""
+        rides, overflowed = list(self._pending.values()), self.overflowed
+        self._pending.clear()
+        self.overflowed = False
+        self._wakeup.clear()
+        self.delivered += len(rides)
+        return rides, overflowed
+
+
+class RideEventHub:
+    """Routes published rides to subscriptions by ride ID and search filter."""
+
+    def __init__(self):
+        self._by_ride: dict[UUID, set[Subscription]] = {}
+        # Filter subscriptions by the day they filter on (None: any day)
+        self._filtered: dict[date | None, set[Subscription]] = {}
+        self.subscriptions = 0
+        self.published = 0
+        self.fanned_out = 0
+        self.overflows = 0
+
+    def subscribe(
+        self,
+        ride_ids=(),
+        origin: str | None = None,
+        destination: str | None = None,
+        day: date | None = None,
+    ) -> Subscription:
+        subscription = Subscription(ride_ids, origin, destination, day, maxsize=settings.RIDE_EVENTS_QUEUE_SIZE)
+        for ride_id in subscription.ride_ids:
+            self._by_ride.setdefault(ride_id, set()).add(subscription)
+        if subscription.filtered:
+            self._filtered.setdefault(subscription.day, set()).add(subscription)
+        self.subscriptions += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for ride_id in subscription.ride_ids:
+            subscribers = self._by_ride.get(ride_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_ride[ride_id]
+        if subscription.filtered:
+            subscribers = self._filtered[subscription.day]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._filtered[subscription.day]
+        self.subscriptions -= 1
+
+    def publish(self, ride: dict, previous: dict | None = None):
+        """
+        Fan out a ride's RideRead fields after a committed write. Pass the
+        searched fields as they were before an update as `previous`, so
+        subscribers whose filters the ride just left hear about it too.
+        """
+        self.published += 1
+        targets = set(self._by_ride.get(ride["ride_id"], ()))
+        searched = {_keys(ride)}
+        if previous is not None:
+            searched.add(_keys({**ride, **previous}))
+        for keys in searched:
+            for day in (keys[2], None):
+                for subscription in self._filtered.get(day, ()):
+                    if subscription.matches(keys):
+                        targets.add(subscription)
+        for subscription in targets:
+            overflowed = subscription.overflowed
+            subscription.offer(ride)
+            if subscription.overflowed and not overflowed:
+                self.overflows += 1
+        self.fanned_out += len(targets)
+
+    async def stream(
+        self,
+        ride_ids=(),
+        origin: str | None = None,
+        destination: str | None = None,
+        day: date | None = None,
+    ):
+        """
+        Server-sent events for a new subscription: a "ride" event per update,
+        "resync" after an overflow and a comment line as a heartbeat.
+        """
+        subscription = self.subscribe(ride_ids, origin, destination, day)
+        try:
+            yield b": subscribed\n\n"
+            while not subscription.closed:
+                if not await subscription.wait(settings.RIDE_EVENTS_HEARTBEAT_SECONDS):
+                    yield b": keepalive\n\n"
+                    continue
+                # Let a burst of writes collapse into one event per ride
+                await asyncio.sleep(settings.RIDE_EVENTS_COALESCE_SECONDS)
+                rides, resync = subscription.drain()
+                if resync:
+                    yield b"event: resync\ndata: {}\n\n"
+                for ride in rides:
+                    yield b"event: ride\ndata: " + dumps(ride) + b"\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def close(self):
+        """End every open stream, e.g. on shutdown."""
+        for index in (self._by_ride, self._filtered):
+            for subscribers in index.values():
+                for subscription in subscribers:
+                    subscription.close()
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        return {
+            "subscriptions": self.subscriptions,
+            "watched_rides": len(self._by_ride),
+            "filtered_subscriptions": sum(len(subscribers) for subscribers in self._filtered.values()),
+            "published": self.published,
+            "fanned_out": self.fanned_out,
+            "overflows": self.overflows,
+        }
+
+
+ride_events = RideEventHub()
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_user
 from app.auth.hashing import hash_password, verify_password
@@ -13,36 +15,39 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    # INSERT ... RETURNING hands back the stored row, so no SELECT before or after;
+    # the unique index on email rejects duplicates
+    try:
+        new_user = await db.scalar(
+            insert(User)
+            .values(
+                name=user_data.name,
+                email=user_data.email,
+                hashed_password=hash_password(user_data.password),
+                phone=user_data.phone,
+                role="student",
+            )
+            .returning(User)
+        )
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if "email" not in str(exc.orig):
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    # Create new user
-    new_user = User(
-        name=user_data.name,
-        email=user_data.email,
-        hashed_password=hash_password(user_data.password),
-        phone=user_data.phone,
-        role="student",
-    )
-
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
     return new_user
 
 
 @router.post("/login", response_model=TokenWithUser)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login and receive an access token."""
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
 
     if not user or not verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
@@ -61,6 +66,6 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserRead)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """Get the current authenticated user's info."""
     return current_user
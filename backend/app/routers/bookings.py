@@ -1,153 +1,661 @@
-from datetime import datetime, timezone
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import holds
 from app.auth.dependencies import get_current_user
+from app.config import settings
 from app.db import get_db
-from app.models import Booking, Ride, User
-from app.schemas.booking import BookingRead, BookingWithRide
+from app.models import Booking, BookingHistory, Ride, RideHistory, SeatHold, User
+from app.pagination import PageParams, paginate
+from app.read_model import bookable_rides
+from app.response_cache import response_cache
+from app.ride_events import ride_events
+from app.schemas.booking import (
+    BookingBatchCancel,
+    BookingBatchCreate,
+    BookingBatchItem,
+    BookingBatchRead,
+    BookingRead,
+    BookingWithRide,
+)
+from app.schemas.seat_hold import SeatHoldRead
+from app.serialization import booking_rows, json_list_response, ride_rows
+from app.waitlist import RIDE_COLUMNS, claim_seat, claim_seats, lock_full_ride, promote
 
 router = APIRouter(tags=["bookings"])
 
+# Claim/queue rounds before giving up when seats keep freeing and filling
+_BOOKING_ATTEMPTS = 3
+# Cancel retries when the booking changes status under us (waitlist promotion)
+_CANCEL_ATTEMPTS = 3
+_BOOKING_COLUMNS = [getattr(Booking, name) for name in BookingRead.model_fields]
+# Batch items left alone because another item failed in all_or_nothing mode
+_NOT_APPLIED = (status.HTTP_424_FAILED_DEPENDENCY, "Not applied because another item in the batch failed")
 
-@router.post("/rides/{ride_id}/book", response_model=BookingRead, status_code=status.HTTP_201_CREATED)
-def book_ride(
+
+@router.post(
+    "/rides/{ride_id}/book",
+    response_model=BookingRead,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": BookingRead, "description": "Ride full; added to the waitlist"}},
+)
+async def book_ride(
     ride_id: UUID,
-    db: Session = Depends(get_db),
+    response: Response,
+    waitlist: bool = Query(True, description="Join the waitlist if the ride is full instead of failing"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Book a ride as a passenger.
     Business rules enforced:
     - Cannot book your own ride
-    - Cannot book the same ride twice
+    - Cannot book the same ride twice, nor a ride you hold a seat on
     - Ride must be in the future
     - Ride must be scheduled (not cancelled/completed)
-    - seats_available must be > 0
+    - seats_available must be > 0, otherwise the booking joins the ride's
+      waitlist as 'pending' (202) and is confirmed automatically, first come
+      first served, when a seat frees up; waitlist=false returns 409 instead
+
+    The seat is claimed with a single conditional UPDATE so concurrent bookings
+    can never oversell a ride; the booking INSERT commits in the same transaction.
+    The UPDATE returns the ride so the new seat count can be published.
     """
-    ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
-    if not ride:
+    now = datetime.now(timezone.utc)
+    # Read before any rollback can expire the instance
+    user_id = current_user.user_id
+
+    # A hold already took a seat for this passenger; booking too would take a second
+    if await db.scalar(
+        select(SeatHold.hold_id).where(SeatHold.ride_id == ride_id, SeatHold.passenger_id == user_id)
+    ):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ride not found",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You hold a seat on this ride; confirm the hold instead",
         )
 
-    # Rule 1: Cannot book your own ride
-    if ride.driver_id == current_user.user_id:
+    # Claim a seat atomically: only succeeds if every rule on the ride row holds.
+    # If the ride is full, lock it and queue; a seat freed in between is retried.
+    booking_status = None
+    for _ in range(_BOOKING_ATTEMPTS):
+        ride = await claim_seat(db, ride_id, user_id, now)
+        if ride is not None:
+            booking_status = "confirmed"
+            break
+        if not waitlist:
+            break
+        ride = await lock_full_ride(db, ride_id, user_id, now)
+        if ride is not None:
+            booking_status = "pending"
+            break
+    if booking_status is None:
+        await db.rollback()
+        await _raise_unbookable(db, ride_id, user_id, now)
+
+    try:
+        new_booking = await db.scalar(
+            insert(Booking)
+            .values(ride_id=ride_id, passenger_id=user_id, status=booking_status)
+            .returning(Booking)
+        )
+        await db.commit()
+    except IntegrityError:
+        # unique_ride_passenger rejected a second booking; the seat claim rolls back too
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You cannot book your own ride",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already booked this ride",
         )
+    if booking_status == "pending":
+        response.status_code = status.HTTP_202_ACCEPTED
+        return new_booking
 
-    # Rule 2: Cannot book if ride is cancelled or completed
-    if ride.status != "scheduled":
+    response_cache.invalidate_ride(ride_id)
+    bookable_rides.adjust_seats(ride_id, -1)
+    ride_events.publish(ride_rows.to_dict(ride))
+
+    return new_booking
+
+
+@router.post("/rides/{ride_id}/hold", response_model=SeatHoldRead, status_code=status.HTTP_201_CREATED)
+async def hold_seat(
+    ride_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Reserve a seat for SEAT_HOLD_TTL_SECONDS, the first phase of two-phase
+    booking; confirm it with POST /holds/{hold_id}/confirm. Same rules as
+    booking, but a full ride is a 409 rather than a waitlist entry.
+    Unconfirmed holds are released in bulk by the background sweeper.
+    """
+    now = datetime.now(timezone.utc)
+    user_id = current_user.user_id
+
+    # Checked up front so a doomed hold never locks the ride row
+    if await db.scalar(
+        select(Booking.booking_id).where(Booking.ride_id == ride_id, Booking.passenger_id == user_id)
+    ):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot book a ride that is {ride.status}",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already booked this ride",
         )
 
-    # Rule 3: Cannot book a ride in the past
-    if ride.departure_time < datetime.now(timezone.utc):
+    ride = await claim_seat(db, ride_id, user_id, now)
+    if ride is None:
+        await db.rollback()
+        await _raise_unbookable(db, ride_id, user_id, now)
+
+    try:
+        hold = await db.scalar(
+            insert(SeatHold)
+            .values(
+                ride_id=ride_id,
+                passenger_id=user_id,
+                expires_at=now + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS),
+            )
+            .returning(SeatHold)
+        )
+        await db.commit()
+    except IntegrityError:
+        # unique_hold_ride_passenger: one hold per passenger and ride
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot book a ride that has already departed",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You already hold a seat on this ride",
         )
+    response_cache.invalidate_ride(ride_id)
+    bookable_rides.adjust_seats(ride_id, -1)
+    ride_events.publish(ride_rows.to_dict(ride))
+
+    return hold
+
 
-    # Rule 4: Cannot book if already booked (and not cancelled)
-    existing_booking = (
-        db.query(Booking)
-        .filter(
-            Booking.ride_id == ride_id,
-            Booking.passenger_id == current_user.user_id,
-            Booking.status != "cancelled",
+@router.post("/holds/{hold_id}/confirm", response_model=BookingRead, status_code=status.HTTP_201_CREATED)
+async def confirm_hold(
+    hold_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Turn an unexpired hold into a confirmed booking. The seat was already
+    taken off the ride by the hold, so this never updates the rides row.
+    A hold on a ride that departed since is released instead (400).
+    """
+    now = datetime.now(timezone.utc)
+    user_id = current_user.user_id
+
+    # Deleting the hold is the claim: of this and the sweeper, only one succeeds.
+    # It only matches while the ride is still open for booking.
+    ride_id = await db.scalar(
+        delete(SeatHold)
+        .where(
+            SeatHold.hold_id == hold_id,
+            SeatHold.passenger_id == user_id,
+            SeatHold.expires_at > now,
+            SeatHold.ride_id.in_(select(Ride.ride_id).where(Ride.status == "scheduled", Ride.departure_time > now)),
         )
-        .first()
+        .returning(SeatHold.ride_id)
     )
-    if existing_booking:
+    if ride_id is None:
+        await db.rollback()
+        await _raise_unusable_hold(db, hold_id, user_id, now)
+
+    try:
+        new_booking = await db.scalar(
+            insert(Booking)
+            .values(ride_id=ride_id, passenger_id=user_id, status="confirmed")
+            .returning(Booking)
+        )
+        await db.commit()
+    except IntegrityError:
+        # A direct booking raced the hold; the hold stays until it is released or expires
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail="You have already booked this ride",
         )
 
-    # Rule 5: Check seats available
+    return new_booking
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_hold(
+    hold_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Give a held seat back before the hold expires."""
+    released = await holds.release(db, SeatHold.hold_id == hold_id, SeatHold.passenger_id == current_user.user_id)
+    if not released:
+        await db.rollback()
+        await _raise_unusable_hold(db, hold_id, current_user.user_id)
+    await db.commit()
+    holds.after_commit(released)
+
+    return None
+
+
+async def _raise_unusable_hold(db: AsyncSession, hold_id: UUID, user_id: UUID, now: datetime | None = None):
+    """Work out why a hold could not be confirmed (pass `now`) or released."""
+    hold = await db.scalar(select(SeatHold).where(SeatHold.hold_id == hold_id))
+    if not hold:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found",
+        )
+    if hold.passenger_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only use your own holds",
+        )
+    if now is not None:
+        closed = _closed_rule(await db.scalar(select(Ride).where(Ride.ride_id == hold.ride_id)), now)
+        if closed is not None:
+            # The hold can never be confirmed; give its seat back now rather than at expiry
+            released = await holds.release(db, SeatHold.hold_id == hold_id)
+            await db.commit()
+            holds.after_commit(released)
+            raise HTTPException(status_code=closed[0], detail=closed[1])
+    raise HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Hold has expired",
+    )
+
+
+def _closed_rule(ride, now: datetime) -> tuple[int, str] | None:
+    """Rules 2 and 3 of _broken_rule: the ride is no longer open for booking."""
+    # Rule 2: Cannot book if ride is cancelled or completed
+    if ride.status != "scheduled":
+        return status.HTTP_400_BAD_REQUEST, f"Cannot book a ride that is {ride.status}"
+
+    # Rule 3: Cannot book a ride in the past (SQLite hands back naive UTC datetimes)
+    departure_time = ride.departure_time
+    if departure_time.tzinfo is None:
+        departure_time = departure_time.replace(tzinfo=timezone.utc)
+    if departure_time <= now:
+        return status.HTTP_400_BAD_REQUEST, "Cannot book a ride that has already departed"
+    return None
+
+
+def _broken_rule(
+    ride, user_id: UUID, now: datetime, booked: bool = False, held: bool = False,
+) -> tuple[int, str] | None:
+    """
+    The first booking rule `ride` (a Ride or row; None when missing) breaks,
+    as (status code, detail), or None. `booked` and `held` say the user
+    already has a booking or a seat hold on it. The seat count is as of the
+    read.
+    """
+    if ride is None:
+        return status.HTTP_404_NOT_FOUND, "Ride not found"
+
+    # Rule 1: Cannot book your own ride
+    if ride.driver_id == user_id:
+        return status.HTTP_400_BAD_REQUEST, "You cannot book your own ride"
+
+    closed = _closed_rule(ride, now)
+    if closed is not None:
+        return closed
+
+    # Rule 4: Cannot book the same ride twice, or on top of a held seat
+    if booked:
+        return status.HTTP_409_CONFLICT, "You have already booked this ride"
+    if held:
+        return status.HTTP_409_CONFLICT, "You hold a seat on this ride; confirm the hold instead"
+
+    # Rule 5: No seats left
     if ride.seats_available <= 0:
+        return status.HTTP_409_CONFLICT, "No seats available for this ride"
+    return None
+
+
+async def _raise_unbookable(db: AsyncSession, ride_id: UUID, user_id: UUID, now: datetime):
+    """Work out which booking rule failed after the seat claim matched no row."""
+    ride = await db.scalar(select(Ride).where(Ride.ride_id == ride_id))
+    # With no rule broken on a re-read, a concurrent booking took the last seat
+    status_code, detail = _broken_rule(ride, user_id, now) or (
+        status.HTTP_409_CONFLICT, "No seats available for this ride"
+    )
+    raise HTTPException(status_code=status_code, detail=detail)
+
+
+def _check_batch_size(items: list):
+    if len(items) > settings.BOOKING_BATCH_MAX:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No seats available for this ride",
+            detail=f"At most {settings.BOOKING_BATCH_MAX} items per batch",
         )
 
-    # Create booking
-    new_booking = Booking(
-        ride_id=ride_id,
-        passenger_id=current_user.user_id,
-        status="confirmed",
-    )
 
-    # Decrement seats_available
-    ride.seats_available -= 1
+def _batch_results(
+    batch, key: str, ids: list[UUID], failures: dict[int, tuple[int, str]], applied: dict[int, BookingBatchItem],
+) -> BookingBatchRead:
+    """
+    One result per item of the batch, in request order. In all_or_nothing
+    mode a failure means nothing was applied.
+    """
+    if failures and batch.mode == "all_or_nothing":
+        applied = {}
+    results = []
+    for index, item_id in enumerate(ids):
+        if index in applied:
+            results.append(applied[index])
+            continue
+        status_code, detail = failures.get(index, _NOT_APPLIED)
+        results.append(BookingBatchItem(**{key: item_id}, status_code=status_code, detail=detail))
+    return BookingBatchRead(mode=batch.mode, applied=len(applied), results=results)
 
-    db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
 
-    return new_booking
+@router.post("/bookings/batch", response_model=BookingBatchRead)
+async def book_rides_batch(
+    batch: BookingBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Book several rides at once, e.g. both legs of a round trip or a week of
+    commutes. The book_ride rules are checked for all rides with three
+    queries (the rides, then the passenger's bookings and seat holds on
+    them); seats are claimed with one conditional UPDATE and the bookings
+    inserted with one INSERT, in one transaction. A full ride fails with 409 rather than
+    joining the waitlist. all_or_nothing books every ride or none;
+    best_effort books those that pass. Each result carries the status code
+    POST /rides/{ride_id}/book would have returned.
+    """
+    _check_batch_size(batch.ride_ids)
+    now = datetime.now(timezone.utc)
+    user_id = current_user.user_id
+
+    rides = {
+        ride.ride_id: ride
+        for ride in (await db.execute(
+            select(Ride.ride_id, Ride.driver_id, Ride.status, Ride.departure_time, Ride.seats_available)
+            .where(Ride.ride_id.in_(batch.ride_ids))
+        )).all()
+    }
+    # Any earlier booking, even a cancelled one, blocks booking again (unique_ride_passenger)
+    booked = set((await db.scalars(
+        select(Booking.ride_id).where(Booking.passenger_id == user_id, Booking.ride_id.in_(batch.ride_ids))
+    )).all())
+    held = set((await db.scalars(
+        select(SeatHold.ride_id).where(SeatHold.passenger_id == user_id, SeatHold.ride_id.in_(batch.ride_ids))
+    )).all())
+    failures: dict[int, tuple[int, str]] = {}
+    wanted: dict[UUID, int] = {}
+    for index, ride_id in enumerate(batch.ride_ids):
+        failure = _broken_rule(rides.get(ride_id), user_id, now, ride_id in booked, ride_id in held)
+        if failure is None and ride_id in wanted:
+            failure = status.HTTP_400_BAD_REQUEST, "Ride is listed more than once"
+        if failure is not None:
+            failures[index] = failure
+        else:
+            wanted[ride_id] = index
+    if failures and batch.mode == "all_or_nothing":
+        wanted = {}
+
+    claimed, bookings = [], []
+    if wanted:
+        # Seats can run out between the read and the claim; those rides fail here
+        claimed = await claim_seats(db, list(wanted), user_id, now)
+        lost = set(wanted).difference(ride.ride_id for ride in claimed)
+        for ride_id in lost:
+            failures[wanted[ride_id]] = status.HTTP_409_CONFLICT, "No seats available for this ride"
+        if lost and batch.mode == "all_or_nothing":
+            claimed = []
+    if claimed:
+        try:
+            bookings = (await db.execute(
+                insert(Booking)
+                .values([
+                    {
+                        "booking_id": uuid.uuid4(),
+                        "ride_id": ride.ride_id,
+                        "passenger_id": user_id,
+                        "booking_time": now,
+                        "status": "confirmed",
+                    }
+                    for ride in claimed
+                ])
+                .returning(*_BOOKING_COLUMNS)
+            )).all()
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request booked one of these rides; the seat claims roll back too
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="You booked one of these rides concurrently, please retry",
+            )
+    else:
+        await db.rollback()
+
+    for ride in claimed:
+        response_cache.invalidate_ride(ride.ride_id)
+        bookable_rides.adjust_seats(ride.ride_id, -1)
+        ride_events.publish(ride_rows.to_dict(ride))
+
+    applied = {
+        wanted[booking.ride_id]: BookingBatchItem(
+            ride_id=booking.ride_id,
+            booking_id=booking.booking_id,
+            status_code=status.HTTP_201_CREATED,
+            booking=BookingRead.model_validate(booking),
+        )
+        for booking in bookings
+    }
+    return _batch_results(batch, "ride_id", batch.ride_ids, failures, applied)
 
 
 @router.get("/bookings/mine", response_model=list[BookingWithRide])
-def get_my_bookings(
-    db: Session = Depends(get_db),
+async def get_my_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    include_history: bool = Query(False, description="Also list bookings moved to bookings_history"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List all bookings where current user is the passenger, with ride details."""
-    bookings = (
-        db.query(Booking)
-        .options(joinedload(Booking.ride))
-        .filter(Booking.passenger_id == current_user.user_id)
-        .order_by(Booking.booking_time.desc())
-        .all()
+    """List bookings where current user is the passenger, with ride details."""
+    stmt = (
+        select(*booking_rows.columns(Booking, ride=Ride))
+        .outerjoin(Booking.ride)
+        .where(Booking.passenger_id == current_user.user_id)
     )
-    return bookings
+    union = []
+    if include_history:
+        # Bookings are archived together with their ride
+        union.append((
+            select(*booking_rows.columns(BookingHistory, ride=RideHistory))
+            .outerjoin(RideHistory, RideHistory.ride_id == BookingHistory.ride_id)
+            .where(BookingHistory.passenger_id == current_user.user_id),
+            [BookingHistory.booking_time, BookingHistory.booking_id],
+        ))
+    bookings = await paginate(
+        db, stmt, [Booking.booking_time, Booking.booking_id], page, response,
+        descending=True, rows=True, union=union,
+    )
+    return json_list_response(booking_rows, bookings, response)
+
+
+@router.delete("/bookings/batch", response_model=BookingBatchRead)
+async def cancel_bookings_batch(
+    batch: BookingBatchCancel,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cancel several bookings at once. The cancel_booking rules are checked
+    for all of them with one SELECT. Then, in one transaction, the bookings
+    are cancelled with set-based UPDATEs, the seats they held go back to
+    their rides in one UPDATE, and only rides that have a waitlist promote
+    from it. all_or_nothing cancels every booking or none; best_effort
+    cancels those that pass. Each result carries the status code
+    DELETE /bookings/{booking_id} would have returned.
+    """
+    _check_batch_size(batch.booking_ids)
+    user_id = current_user.user_id
+
+    bookings = {
+        booking.booking_id: booking
+        for booking in (await db.execute(
+            select(Booking.booking_id, Booking.passenger_id, Booking.status)
+            .where(Booking.booking_id.in_(batch.booking_ids))
+        )).all()
+    }
+    failures: dict[int, tuple[int, str]] = {}
+    wanted: dict[UUID, int] = {}
+    for index, booking_id in enumerate(batch.booking_ids):
+        booking = bookings.get(booking_id)
+        if booking is None:
+            failures[index] = status.HTTP_404_NOT_FOUND, "Booking not found"
+        elif booking.passenger_id != user_id:
+            failures[index] = status.HTTP_403_FORBIDDEN, "You can only cancel your own bookings"
+        elif booking.status == "cancelled":
+            failures[index] = status.HTTP_400_BAD_REQUEST, "Booking is already cancelled"
+        elif booking_id in wanted:
+            failures[index] = status.HTTP_400_BAD_REQUEST, "Booking is listed more than once"
+        else:
+            wanted[booking_id] = index
+    if failures and batch.mode == "all_or_nothing":
+        wanted = {}
+
+    # booking_id -> (ride_id, status it had)
+    cancelled: dict[UUID, tuple[UUID, str]] = {}
+    if wanted:
+        # One UPDATE per previous status, so only confirmed cancellations free a
+        # seat. Pending goes first: a booking promoted in between is then still
+        # caught, as confirmed.
+        for previous in ("pending", "confirmed"):
+            for booking in (await db.execute(
+                update(Booking)
+                .where(
+                    Booking.booking_id.in_(wanted),
+                    Booking.passenger_id == user_id,
+                    Booking.status == previous,
+                )
+                .values(status="cancelled")
+                .returning(Booking.booking_id, Booking.ride_id)
+                .execution_options(synchronize_session=False)
+            )).all():
+                cancelled[booking.booking_id] = (booking.ride_id, previous)
+        lost = set(wanted).difference(cancelled)
+        for booking_id in lost:
+            failures[wanted[booking_id]] = status.HTTP_409_CONFLICT, "Booking was modified concurrently, please retry"
+        if lost and batch.mode == "all_or_nothing":
+            cancelled = {}
+
+    freed = Counter(ride_id for ride_id, previous in cancelled.values() if previous == "confirmed")
+    rides, promoted = [], Counter()
+    if freed:
+        rides = (await db.execute(
+            update(Ride)
+            .where(Ride.ride_id.in_(freed))
+            .values(seats_available=Ride.seats_available + case(freed, value=Ride.ride_id))
+            .returning(*RIDE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).all()
+        waiting = set((await db.scalars(
+            select(Booking.ride_id).where(Booking.ride_id.in_(freed), Booking.status == "pending").distinct()
+        )).all())
+        for position, ride in enumerate(rides):
+            if ride.ride_id in waiting:
+                rides[position], confirmed = await promote(db, ride)
+                promoted[ride.ride_id] = len(confirmed)
+    if cancelled:
+        await db.commit()
+    else:
+        await db.rollback()
+
+    for ride_id in {ride_id for ride_id, _ in cancelled.values()}:
+        response_cache.invalidate_ride(ride_id)
+    for ride in rides:
+        bookable_rides.adjust_seats(ride.ride_id, freed[ride.ride_id] - promoted[ride.ride_id])
+        ride_events.publish(ride_rows.to_dict(ride))
+
+    applied = {
+        wanted[booking_id]: BookingBatchItem(
+            ride_id=ride_id, booking_id=booking_id, status_code=status.HTTP_204_NO_CONTENT,
+        )
+        for booking_id, (ride_id, _) in cancelled.items()
+    }
+    return _batch_results(batch, "booking_id", batch.booking_ids, failures, applied)
 
 
 @router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def cancel_booking(
+async def cancel_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Cancel a booking.
     Only the passenger who made the booking can cancel it.
-    If the booking was confirmed, increment the ride's seats_available.
+    If the booking was confirmed, increment the ride's seats_available and
+    hand the seat to the oldest waitlisted booking, in the same transaction.
     """
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found",
-        )
+    # A waitlisted booking can be promoted between the read and the update;
+    # re-read and retry so the passenger does not have to
+    for _ in range(_CANCEL_ATTEMPTS):
+        booking = await db.scalar(select(Booking).where(Booking.booking_id == booking_id))
+        if not booking:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Booking not found",
+            )
 
-    if booking.passenger_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only cancel your own bookings",
-        )
+        if booking.passenger_id != current_user.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only cancel your own bookings",
+            )
+
+        if booking.status == "cancelled":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Booking is already cancelled",
+            )
 
-    if booking.status == "cancelled":
+        # Flip the status only if nobody else changed it since we read it, so a
+        # double cancel can never hand the seat back twice
+        cancelled = await db.execute(
+            update(Booking)
+            .where(Booking.booking_id == booking_id, Booking.status == booking.status)
+            .values(status="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        if cancelled.rowcount:
+            break
+        await db.rollback()
+    else:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Booking is already cancelled",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking was modified concurrently, please retry",
         )
 
-    # If booking was confirmed, restore the seat
+    # If booking was confirmed, restore the seat and promote from the waitlist
+    ride, promoted = None, []
     if booking.status == "confirmed":
-        ride = db.query(Ride).filter(Ride.ride_id == booking.ride_id).first()
-        if ride:
-            ride.seats_available += 1
+        ride = (await db.execute(
+            update(Ride)
+            .where(Ride.ride_id == booking.ride_id)
+            .values(seats_available=Ride.seats_available + 1)
+            .returning(*RIDE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        ride, promoted = await promote(db, ride)
 
-    booking.status = "cancelled"
-    db.commit()
+    await db.commit()
+    response_cache.invalidate_ride(booking.ride_id)
+    if booking.status == "confirmed":
+        bookable_rides.adjust_seats(booking.ride_id, 1 - len(promoted))
+    if ride is not None:
+        ride_events.publish(ride_rows.to_dict(ride))
 
     return None
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.config import settings
+from app.db import get_db
+from app.models import Booking, Ride, User, Vehicle
+from app.pagination import PageParams, fetch_page
+from app.schemas.dashboard import Dashboard
+from app.schemas.user import UserRead
+from app.serialization import booking_rows, dumps, ride_rows, vehicle_rows
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _section_limit(name: str):
+    return Query(
+        settings.DASHBOARD_SECTION_LIMIT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description=f"Maximum {name} to return",
+    )
+
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(
+    rides_limit: int = _section_limit("rides"),
+    bookings_limit: int = _section_limit("bookings"),
+    vehicles_limit: int = _section_limit("vehicles"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The current user plus their latest rides, bookings and vehicles in one call.
+    Sections are ordered like the /mine endpoints; pass a section's next cursor
+    to that endpoint to load more.
+    """
+    user_id = current_user.user_id
+
+    rides, rides_cursor = await fetch_page(
+        db,
+        select(*ride_rows.columns(Ride)).where(Ride.driver_id == user_id),
+        [Ride.departure_time, Ride.ride_id],
+        PageParams(cursor=None, limit=rides_limit),
+        descending=True,
+        rows=True,
+    )
+    bookings, bookings_cursor = await fetch_page(
+        db,
+        select(*booking_rows.columns(Booking, ride=Ride))
+        .outerjoin(Booking.ride)
+        .where(Booking.passenger_id == user_id),
+        [Booking.booking_time, Booking.booking_id],
+        PageParams(cursor=None, limit=bookings_limit),
+        descending=True,
+        rows=True,
+    )
+    vehicles, vehicles_cursor = await fetch_page(
+        db,
+        select(*vehicle_rows.columns(Vehicle)).where(Vehicle.owner_id == user_id),
+        [Vehicle.vehicle_id],
+        PageParams(cursor=None, limit=vehicles_limit),
+        rows=True,
+    )
+
+    content = {
+        "user": UserRead.model_validate(current_user).model_dump(mode="json"),
+        "rides": ride_rows.items(rides),
+        "rides_next_cursor": rides_cursor,
+        "bookings": booking_rows.items(bookings),
+        "bookings_next_cursor": bookings_cursor,
+        "vehicles": vehicle_rows.items(vehicles),
+        "vehicles_next_cursor": vehicles_cursor,
+    }
+    return Response(content=dumps(content), media_type="application/json")
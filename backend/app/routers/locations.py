@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.auth.dependencies import get_current_user
+from app.config import settings
+from app.locations import location_index
+from app.models import User
+from app.schemas.location import LocationSuggestion
+from app.serialization import dumps
+
+router = APIRouter(prefix="/locations", tags=["locations"])
+
+
+@router.get("/autocomplete", response_model=list[LocationSuggestion])
+async def autocomplete_locations(
+    q: str = Query(..., min_length=1, description="Start of any word of the place name"),
+    limit: int = Query(settings.LOCATION_AUTOCOMPLETE_MAX, ge=1, le=settings.LOCATION_AUTOCOMPLETE_MAX),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Places with a word starting with `q` (case-insensitive), most used first.
+    Pass a location_id to /rides/search as origin_id or destination_id.
+    Served from the in-memory trie; no query.
+    """
+    return Response(content=dumps(location_index.complete(q, limit)), media_type="application/json")
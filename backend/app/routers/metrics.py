@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import archive, lifecycle, read_model
+from app.locations import location_index
+from app.auth.cache import principal_cache
+from app.auth.dependencies import get_admin_user
+from app.db import get_db
+from app.pool_metrics import pool_metrics
+from app.response_cache import response_cache
+from app.ride_events import ride_events
+
+# Internal state, and read-model?check=true scans every scheduled ride: admins only
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/auth-cache")
+def get_auth_cache_metrics():
+    """Hit/miss counters for the principal cache used by get_current_user."""
+    return principal_cache.stats()
+
+
+@router.get("/pool")
+def get_pool_metrics():
+    """Checkout wait, in-use, overflow and connection lifetime stats per pool."""
+    return pool_metrics()
+
+
+@router.get("/response-cache")
+def get_response_cache_metrics():
+    """Hit/miss and invalidation counters for the ride search/read response cache."""
+    return response_cache.stats()
+
+
+@router.get("/ride-events")
+def get_ride_events_metrics():
+    """Open subscriptions and fan-out counters for the /rides/events stream."""
+    return ride_events.stats()
+
+
+@router.get("/locations")
+def get_location_metrics():
+    """Canonical locations held in memory, trie size and lookup/autocomplete counters."""
+    return location_index.stats()
+
+
+@router.get("/archive")
+def get_archive_metrics():
+    """Rides and bookings moved to the history tables since startup, with the last run's timings."""
+    return archive.stats
+
+
+@router.get("/lifecycle")
+def get_lifecycle_metrics():
+    """Rides completed by the lifecycle job since startup, with the last run's batch timings."""
+    return lifecycle.stats
+
+
+@router.get("/read-model")
+async def get_read_model_metrics(
+    check: bool = Query(False, description="Also diff the model against SQL"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Size and update counters of the bookable-rides read model, optionally with a consistency check."""
+    stats = read_model.bookable_rides.stats()
+    if check:
+        stats["consistency"] = await read_model.diff(db)
+    return stats
@@ -1,26 +1,73 @@
-from datetime import date, datetime, timezone
+import heapq
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import holds
 from app.auth.dependencies import get_current_user
+from app.config import settings
 from app.db import get_db
-from app.models import Ride, User, Vehicle
-from app.schemas.ride import RideCreate, RideRead, RideUpdate
+from app.geo import bounding_box, haversine_km
+from app.locations import location_index
+from app.models import Booking, Ride, RideHistory, SeatHold, User, Vehicle
+from app.pagination import NEXT_CURSOR_HEADER, PageParams, decode_cursor, encode_cursor, paginate
+from app.read_model import bookable_rides
+from app.response_cache import normalize_location, response_cache
+from app.ride_events import ride_events
+from app.search import filter_locations
+from app.schemas.ride import (
+    RideCreate,
+    RideNearby,
+    RideRead,
+    RideSeriesCreate,
+    RideSeriesRead,
+    RideSeriesUpdate,
+    RideUpdate,
+)
+from app.serialization import dumps, json_list_response, ride_rows
+from app.time_window import TimeWindow
+from app.waitlist import cancel_waitlist, promote
 
 router = APIRouter(prefix="/rides", tags=["rides"])
 
+_RIDE_COLUMNS = ride_rows.columns(Ride)
 
-@router.post("", response_model=RideRead, status_code=status.HTTP_201_CREATED)
-def create_ride(
-    ride_data: RideCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Create a new ride. The current user becomes the driver."""
-    # Validate that user owns the vehicle
-    vehicle = db.query(Vehicle).filter(Vehicle.vehicle_id == ride_data.vehicle_id).first()
+# Fields that decide whether a ride appears in a search
+_SEARCHED_FIELDS = {"origin_location", "destination_location", "departure_time", "status"}
+# Fields /rides/events subscription filters match on
+_FILTERED_FIELDS = ("origin_location", "destination_location", "departure_time")
+_COORDINATE_PAIRS = (("origin_lat", "origin_lon"), ("destination_lat", "destination_lon"))
+
+
+def _check_coordinates(ride):
+    """Coordinates are optional, but a latitude needs its longitude and vice versa."""
+    for lat, lon in _COORDINATE_PAIRS:
+        if (getattr(ride, lat) is None) != (getattr(ride, lon) is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{lat} and {lon} must be given together",
+            )
+
+
+def _check_not_null(update_data: dict, fields: tuple[str, ...]):
+    """An explicit null for a required column is a 400 rather than a failed write."""
+    for field in fields:
+        if field in update_data and update_data[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{field} cannot be null",
+            )
+
+
+async def _check_vehicle(db: AsyncSession, ride_data: RideCreate, current_user: User):
+    """The driver must own the vehicle, and the ride cannot offer more seats than it has."""
+    vehicle = await db.scalar(select(Vehicle).where(Vehicle.vehicle_id == ride_data.vehicle_id))
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,102 +87,357 @@ def create_ride(
             detail=f"seats_available cannot exceed vehicle capacity ({vehicle.seats_total})",
         )
 
-    new_ride = Ride(
-        driver_id=current_user.user_id,
-        vehicle_id=ride_data.vehicle_id,
-        origin_location=ride_data.origin_location,
-        destination_location=ride_data.destination_location,
-        departure_time=ride_data.departure_time,
-        arrival_time=ride_data.arrival_time,
-        seats_available=ride_data.seats_available,
-        price_per_seat=ride_data.price_per_seat,
-        status="scheduled",
-    )
 
-    db.add(new_ride)
-    db.commit()
-    db.refresh(new_ride)
+@router.post("", response_model=RideRead, status_code=status.HTTP_201_CREATED)
+async def create_ride(
+    ride_data: RideCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create a new ride. The current user becomes the driver."""
+    _check_coordinates(ride_data)
+    await _check_vehicle(db, ride_data, current_user)
+
+    places = [ride_data.origin_location, ride_data.destination_location]
+    origin_id, destination_id = await location_index.resolve(db, *places)
+    new_ride = await db.scalar(
+        insert(Ride)
+        .values(
+            driver_id=current_user.user_id,
+            vehicle_id=ride_data.vehicle_id,
+            origin_location=ride_data.origin_location,
+            destination_location=ride_data.destination_location,
+            origin_location_id=origin_id,
+            destination_location_id=destination_id,
+            departure_time=ride_data.departure_time,
+            arrival_time=ride_data.arrival_time,
+            seats_available=ride_data.seats_available,
+            price_per_seat=ride_data.price_per_seat,
+            status="scheduled",
+            origin_lat=ride_data.origin_lat,
+            origin_lon=ride_data.origin_lon,
+            destination_lat=ride_data.destination_lat,
+            destination_lon=ride_data.destination_lon,
+        )
+        .returning(Ride)
+    )
+    await db.commit()
+    location_index.learn([origin_id, destination_id], places)
+    location_index.record(origin_id, destination_id)
+    response_cache.invalidate_departures(new_ride.departure_time)
+    bookable_rides.upsert(new_ride)
+    ride_events.publish(ride_rows.to_dict(new_ride))
 
     return new_ride
 
 
 @router.get("/search", response_model=list[RideRead])
-def search_rides(
+async def search_rides(
+    request: Request,
+    response: Response,
     origin: str | None = Query(None),
     destination: str | None = Query(None),
+    origin_id: int | None = Query(None, description="location_id from /locations/autocomplete"),
+    destination_id: int | None = Query(None, description="location_id from /locations/autocomplete"),
     date: date | None = Query(None),
-    db: Session = Depends(get_db),
+    sort: Literal["departure", "relevance"] = Query("departure"),
+    window: TimeWindow = Depends(),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Search for available rides.
-    Filters: origin, destination, date (optional).
+    Filters: origin, destination (text), origin_id, destination_id (canonical
+    places), date and a departure/arrival time window (depart_after,
+    depart_before, arrive_after, arrive_before), all optional.
     Only returns scheduled rides with departure >= now.
+    Paginated by (departure_time, ride_id); see X-Next-Cursor.
+    sort=relevance returns the best location matches first, as a single page.
+    flex_minutes widens the window by that much and returns the rides closest
+    to it first, as a single page.
+    Results are served from the response cache, with an ETag, else from the
+    in-memory read model when it is loaded, else from SQL.
     """
-    query = db.query(Ride).filter(
+    if sort == "relevance" and window.flexible:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort=relevance cannot be combined with flex_minutes",
+        )
+    key = (
+        "search", normalize_location(origin), normalize_location(destination),
+        origin_id, destination_id, date, sort, window.key(), page.cursor, page.limit,
+    )
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.to_response(request)
+    version = response_cache.version
+
+    if bookable_rides.ready and not (sort == "relevance" and (origin or destination)):
+        columns = [Ride.departure_time, Ride.ride_id]
+        after = decode_cursor(page.cursor, columns) if page.cursor else None
+        rides = bookable_rides.search(
+            origin, destination, date, after, page.limit + 1,
+            window=window, place_ids=(origin_id, destination_id),
+        )
+        if window.flexible:
+            rides = rides[: page.limit]
+        elif len(rides) > page.limit:
+            rides = rides[: page.limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                (rides[-1].departure_time, rides[-1].ride_id)
+            )
+    else:
+        rides = await _search_sql(
+            response, origin, destination, (origin_id, destination_id), date, sort, window, page, db
+        )
+
+    cached = response_cache.put(
+        key,
+        ride_rows.encode(rides),
+        version,
+        ride_ids=[ride.ride_id for ride in rides],
+        search_day=date,
+        headers={NEXT_CURSOR_HEADER: response.headers.get(NEXT_CURSOR_HEADER)},
+    )
+    return cached.to_response(request)
+
+
+async def _search_sql(
+    response: Response,
+    origin: str | None,
+    destination: str | None,
+    place_ids: tuple[int | None, int | None],
+    date: date | None,
+    sort: str,
+    window: TimeWindow,
+    page: PageParams,
+    db: AsyncSession,
+) -> list:
+    """The SQL path of search_rides, for relevance ranking or when the read model is off."""
+    stmt = select(*_RIDE_COLUMNS).where(
         Ride.status == "scheduled",
         Ride.departure_time >= datetime.now(timezone.utc),
     )
 
-    if origin:
-        query = query.filter(Ride.origin_location.ilike(f"%{origin}%"))
-
-    if destination:
-        query = query.filter(Ride.destination_location.ilike(f"%{destination}%"))
+    stmt, rank = filter_locations(stmt, origin, destination)
+    origin_id, destination_id = place_ids
+    if origin_id is not None:
+        stmt = stmt.where(Ride.origin_location_id == origin_id)
+    if destination_id is not None:
+        stmt = stmt.where(Ride.destination_location_id == destination_id)
 
     if date:
         # Filter rides on the specified date
         start_of_day = datetime.combine(date, datetime.min.time()).replace(tzinfo=timezone.utc)
         end_of_day = datetime.combine(date, datetime.max.time()).replace(tzinfo=timezone.utc)
-        query = query.filter(
+        stmt = stmt.where(
             Ride.departure_time >= start_of_day,
             Ride.departure_time <= end_of_day,
         )
+    stmt = window.filter(stmt)
+
+    if window.flexible:
+        rows = (await db.execute(stmt)).all()
+        return heapq.nsmallest(page.limit, rows, key=lambda row: (
+            window.distance(row.departure_time, row.arrival_time), row.departure_time, row.ride_id,
+        ))
+
+    if sort == "relevance" and rank is not None:
+        stmt = stmt.order_by(rank, Ride.departure_time, Ride.ride_id).limit(page.limit)
+        return (await db.execute(stmt)).all()
+
+    return await paginate(db, stmt, [Ride.departure_time, Ride.ride_id], page, response, rows=True)
+
+
+@router.get("/nearby", response_model=list[RideNearby])
+async def nearby_rides(
+    origin_lat: float | None = Query(None, ge=-90, le=90),
+    origin_lon: float | None = Query(None, ge=-180, le=180),
+    origin_radius_km: float = Query(5, gt=0, le=settings.NEARBY_RADIUS_MAX_KM),
+    destination_lat: float | None = Query(None, ge=-90, le=90),
+    destination_lon: float | None = Query(None, ge=-180, le=180),
+    destination_radius_km: float = Query(5, gt=0, le=settings.NEARBY_RADIUS_MAX_KM),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Bookable rides whose origin lies within origin_radius_km of
+    (origin_lat, origin_lon) and/or whose destination lies within
+    destination_radius_km of (destination_lat, destination_lon), closest
+    first by the sum of both distances. Rides without coordinates never match.
+    Served from the read model's spatial index when it is loaded, else from SQL.
+    """
+    query = {
+        "origin_lat": origin_lat, "origin_lon": origin_lon,
+        "destination_lat": destination_lat, "destination_lon": destination_lon,
+    }
+    for lat, lon in _COORDINATE_PAIRS:
+        if (query[lat] is None) != (query[lon] is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{lat} and {lon} must be given together",
+            )
+    origin = (origin_lat, origin_lon, origin_radius_km) if origin_lat is not None else None
+    destination = (
+        (destination_lat, destination_lon, destination_radius_km) if destination_lat is not None else None
+    )
+    if origin is None and destination is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give an origin and/or a destination point",
+        )
 
-    rides = query.order_by(Ride.departure_time).all()
-    return rides
+    if bookable_rides.ready:
+        matches = bookable_rides.nearby(origin, destination, limit)
+    else:
+        matches = await _nearby_sql(origin, destination, limit, db)
+    body = [
+        ride_rows.to_dict(ride) | {
+            "origin_distance_km": None if origin_distance is None else round(origin_distance, 3),
+            "destination_distance_km": (
+                None if destination_distance is None else round(destination_distance, 3)
+            ),
+        }
+        for ride, origin_distance, destination_distance in matches
+    ]
+    return Response(content=dumps(body), media_type="application/json")
+
+
+async def _nearby_sql(
+    origin: tuple[float, float, float] | None,
+    destination: tuple[float, float, float] | None,
+    limit: int,
+    db: AsyncSession,
+) -> list:
+    """The SQL path of nearby_rides: a bounding box on the coordinate indexes, refined here."""
+    stmt = select(*_RIDE_COLUMNS).where(
+        Ride.status == "scheduled",
+        Ride.departure_time >= datetime.now(timezone.utc),
+    )
+    for circle, lat, lon in (
+        (origin, Ride.origin_lat, Ride.origin_lon),
+        (destination, Ride.destination_lat, Ride.destination_lon),
+    ):
+        if circle is None:
+            continue
+        min_lat, max_lat, min_lon, max_lon = bounding_box(*circle)
+        stmt = stmt.where(lat.between(min_lat, max_lat), lon.between(min_lon, max_lon))
+
+    def distance(circle, lat, lon):
+        return None if circle is None else haversine_km(circle[0], circle[1], lat, lon)
+
+    matches = []
+    for ride in (await db.execute(stmt)).all():
+        origin_distance = distance(origin, ride.origin_lat, ride.origin_lon)
+        destination_distance = distance(destination, ride.destination_lat, ride.destination_lon)
+        if origin is not None and origin_distance > origin[2]:
+            continue
+        if destination is not None and destination_distance > destination[2]:
+            continue
+        matches.append((ride, origin_distance, destination_distance))
+    matches.sort(key=lambda match: (
+        (match[1] or 0) + (match[2] or 0), match[0].departure_time, match[0].ride_id
+    ))
+    return matches[:limit]
 
 
 @router.get("/mine", response_model=list[RideRead])
-def get_my_rides(
-    db: Session = Depends(get_db),
+async def get_my_rides(
+    response: Response,
+    page: PageParams = Depends(),
+    include_history: bool = Query(False, description="Also list rides moved to rides_history"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List all rides where current user is the driver."""
-    rides = (
-        db.query(Ride)
-        .filter(Ride.driver_id == current_user.user_id)
-        .order_by(Ride.departure_time.desc())
-        .all()
+    """List rides where current user is the driver, newest departure first."""
+    stmt = select(*_RIDE_COLUMNS).where(Ride.driver_id == current_user.user_id)
+    union = []
+    if include_history:
+        union.append((
+            select(*ride_rows.columns(RideHistory)).where(RideHistory.driver_id == current_user.user_id),
+            [RideHistory.departure_time, RideHistory.ride_id],
+        ))
+    rides = await paginate(
+        db, stmt, [Ride.departure_time, Ride.ride_id], page, response,
+        descending=True, rows=True, union=union,
+    )
+    return json_list_response(ride_rows, rides, response)
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_ride_events(
+    ride_id: list[UUID] = Query([], description="Rides to watch; repeat for several"),
+    origin: str | None = Query(None),
+    destination: str | None = Query(None),
+    date: date | None = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-sent events with the latest RideRead of watched rides, instead of
+    polling. Watch rides by ID and/or every ride matching search filters (same
+    matching as /rides/search). Each change arrives as an "event: ride" whose
+    data is the ride; rapid changes to one ride are coalesced into the latest.
+    "event: resync" means updates were dropped and the client should re-fetch.
+    """
+    if not (ride_id or origin or destination or date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subscribe to at least one ride_id or search filter",
+        )
+    if len(ride_id) > settings.RIDE_EVENTS_MAX_RIDE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.RIDE_EVENTS_MAX_RIDE_IDS} ride_id values per subscription",
+        )
+    return StreamingResponse(
+        ride_events.stream(ride_id, origin, destination, date),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return rides
 
 
 @router.get("/{ride_id}", response_model=RideRead)
-def get_ride(
+async def get_ride(
     ride_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get details of a specific ride."""
-    ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
+    """Get details of a specific ride. Served from the response cache, with an ETag."""
+    key = ("ride", ride_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.to_response(request)
+    version = response_cache.version
+
+    ride = await db.scalar(select(Ride).where(Ride.ride_id == ride_id))
     if not ride:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ride not found",
         )
-    return ride
+    body = RideRead.model_validate(ride).model_dump_json().encode()
+    return response_cache.put(key, body, version, ride_ids=[ride_id]).to_response(request)
 
 
 @router.patch("/{ride_id}", response_model=RideRead)
-def update_ride(
+async def update_ride(
     ride_id: UUID,
     ride_update: RideUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Update a ride. Only the driver can update."""
-    ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
+    """
+    Update a ride. Only the driver can update.
+    add_seats raises seats_available (up to the vehicle's capacity) and
+    promotes waitlisted bookings into the new seats in the same transaction.
+    Closing a scheduled ride (status cancelled or completed) drops its seat
+    holds and cancels its waitlist, as DELETE does; it cannot be combined
+    with add_seats.
+    """
+    ride = await db.scalar(select(Ride).where(Ride.ride_id == ride_id))
     if not ride:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,23 +460,85 @@ def update_ride(
 
     # Apply updates
     update_data = ride_update.model_dump(exclude_unset=True)
+    _check_not_null(
+        update_data, ("origin_location", "destination_location", "departure_time", "price_per_seat", "status"),
+    )
+    add_seats = update_data.pop("add_seats", None)
+    closing = update_data.get("status") in ("cancelled", "completed")
+    if add_seats and closing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot add seats to a ride that is being cancelled or completed",
+        )
+    old_departure = ride.departure_time
+    previous = {field: getattr(ride, field) for field in _FILTERED_FIELDS}
+    if ride.status == "scheduled" and closing:
+        await cancel_waitlist(db, [ride_id])
+        held = await holds.discard(db, SeatHold.ride_id == ride_id)
+        if held:
+            # Refreshed after the commit below
+            ride.seats_available = Ride.seats_available + held[ride_id]
     for field, value in update_data.items():
         setattr(ride, field, value)
-
-    db.commit()
-    db.refresh(ride)
+    _check_coordinates(ride)
+    moved = [field for field in ("origin_location", "destination_location") if field in update_data]
+    places = [update_data[field] for field in moved]
+    place_ids = await location_index.resolve(db, *places)
+    for field, location_id in zip(moved, place_ids):
+        setattr(ride, f"{field}_id", location_id)
+
+    promoted = []
+    if add_seats:
+        # Atomic increment, capped so confirmed + available seats fit the vehicle
+        confirmed = (
+            select(func.count())
+            .where(Booking.ride_id == Ride.ride_id, Booking.status == "confirmed")
+            .scalar_subquery()
+        )
+        capacity = select(Vehicle.seats_total).where(Vehicle.vehicle_id == Ride.vehicle_id).scalar_subquery()
+        freed = (await db.execute(
+            update(Ride)
+            .where(Ride.ride_id == ride_id, Ride.seats_available + add_seats + confirmed <= capacity)
+            .values(seats_available=Ride.seats_available + add_seats)
+            .returning(*_RIDE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if freed is None:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Adding {add_seats} seats would exceed the vehicle's capacity",
+            )
+        _, promoted = await promote(db, freed)
+
+    await db.commit()
+    await db.refresh(ride)
+    location_index.learn(place_ids, places)
+    location_index.record(*place_ids)
+    response_cache.invalidate_ride(ride_id)
+    if _SEARCHED_FIELDS.intersection(update_data):
+        response_cache.invalidate_departures(old_departure, ride.departure_time)
+    # Seats only change by deltas; keep the model's count so booking deltas stay exact
+    bookable_rides.upsert(ride, keep_seats=True)
+    if add_seats:
+        bookable_rides.adjust_seats(ride_id, add_seats - len(promoted))
+    ride_events.publish(ride_rows.to_dict(ride), previous)
 
     return ride
 
 
 @router.delete("/{ride_id}", status_code=status.HTTP_204_NO_CONTENT)
-def cancel_ride(
+async def cancel_ride(
     ride_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Cancel a ride. Only the driver can cancel. Sets status to 'cancelled'."""
-    ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
+    """
+    Cancel a ride. Only the driver can cancel. Sets status to 'cancelled',
+    drops the ride's seat holds, giving their seats back, and cancels its
+    waitlisted bookings.
+    """
+    ride = await db.scalar(select(Ride).where(Ride.ride_id == ride_id))
     if not ride:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -187,7 +551,241 @@ def cancel_ride(
             detail="Only the driver can cancel this ride",
         )
 
-    ride.status = "cancelled"
-    db.commit()
+    await cancel_waitlist(db, [ride_id])
+    held = await holds.discard(db, SeatHold.ride_id == ride_id)
+    ride = (await db.execute(
+        update(Ride)
+        .where(Ride.ride_id == ride_id)
+        .values(status="cancelled", seats_available=Ride.seats_available + held[ride_id])
+        .returning(*_RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).first()
+    await db.commit()
+    response_cache.invalidate_ride(ride_id)
+    bookable_rides.remove(ride_id)
+    ride_events.publish(ride_rows.to_dict(ride))
+
+    return None
+
+
+def _series_departures(series: RideSeriesCreate) -> list[datetime]:
+    """
+    Departure of every occurrence: the first departure moved by whole days to
+    each matching date. Stops one past the occurrence limit, for the caller
+    to reject.
+    """
+    first = series.departure_time
+    weekdays, skipped = set(series.weekdays), set(series.exceptions)
+    departures = []
+    for offset in range((series.until - first.date()).days + 1):
+        day = first.date() + timedelta(days=offset)
+        if day.weekday() in weekdays and day not in skipped:
+            departures.append(first + timedelta(days=offset))
+            if len(departures) > settings.RIDE_SERIES_MAX_OCCURRENCES:
+                break
+    return departures
+
+
+def _upcoming(series_id: UUID, now: datetime):
+    """Filter for the rides of a series that have not departed and are still scheduled."""
+    return and_(Ride.series_id == series_id, Ride.status == "scheduled", Ride.departure_time > now)
+
+
+async def _check_series_driver(db: AsyncSession, series_id: UUID, current_user: User, action: str):
+    # Every ride of a series is created together, so they share one driver
+    driver_id = await db.scalar(select(Ride.driver_id).where(Ride.series_id == series_id).limit(1))
+    if driver_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ride series not found",
+        )
+    if driver_id != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Only the driver can {action} this series",
+        )
+
+
+@router.post("/series", response_model=RideSeriesRead, status_code=status.HTTP_201_CREATED)
+async def create_ride_series(
+    series: RideSeriesCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create a recurring ride, e.g. a semester of weekday commutes, in one
+    request. The vehicle is checked once and every occurrence is inserted by
+    a single statement in one transaction. The rides share a series_id for
+    PATCH/DELETE /rides/series/{series_id}, and each stays an ordinary ride.
+    Occurrences keep departure_time's UTC offset.
+    """
+    _check_coordinates(series)
+    if series.until < series.departure_time.date():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="until must not be before the first departure",
+        )
+    departures = _series_departures(series)
+    if not departures:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The recurrence rule matches no dates",
+        )
+    if len(departures) > settings.RIDE_SERIES_MAX_OCCURRENCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A series can have at most {settings.RIDE_SERIES_MAX_OCCURRENCES} rides",
+        )
+    await _check_vehicle(db, series, current_user)
+
+    places = [series.origin_location, series.destination_location]
+    origin_id, destination_id = await location_index.resolve(db, *places)
+    series_id = uuid.uuid4()
+    duration = None if series.arrival_time is None else series.arrival_time - series.departure_time
+    common = {
+        "driver_id": current_user.user_id,
+        "vehicle_id": series.vehicle_id,
+        "origin_location": series.origin_location,
+        "destination_location": series.destination_location,
+        "origin_location_id": origin_id,
+        "destination_location_id": destination_id,
+        "seats_available": series.seats_available,
+        "price_per_seat": series.price_per_seat,
+        "status": "scheduled",
+        "origin_lat": series.origin_lat,
+        "origin_lon": series.origin_lon,
+        "destination_lat": series.destination_lat,
+        "destination_lon": series.destination_lon,
+        "series_id": series_id,
+    }
+    rides = (await db.execute(
+        insert(Ride)
+        .values([
+            {
+                **common,
+                "ride_id": uuid.uuid4(),
+                "departure_time": departure,
+                "arrival_time": None if duration is None else departure + duration,
+            }
+            for departure in departures
+        ])
+        .returning(*_RIDE_COLUMNS)
+    )).all()
+    await db.commit()
+    location_index.learn([origin_id, destination_id], places)
+    location_index.record(*[origin_id, destination_id] * len(rides))
+    response_cache.invalidate_departures(*departures)
+    # RETURNING does not promise insertion order
+    rides.sort(key=lambda ride: (ride.departure_time, ride.ride_id))
+    for ride in rides:
+        bookable_rides.upsert(ride)
+        ride_events.publish(ride_rows.to_dict(ride))
+
+    return Response(
+        content=dumps({"series_id": series_id, "rides": ride_rows.items(rides)}),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+    )
+
+
+@router.patch("/series/{series_id}", response_model=list[RideRead])
+async def update_ride_series(
+    series_id: UUID,
+    series_update: RideSeriesUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply the same changes to every upcoming ride of a series with one
+    UPDATE; rides that already departed are left alone. Coordinates are
+    replaced in pairs. Seats and times are changed per ride with PATCH
+    /rides/{ride_id}. Returns the updated rides.
+    """
+    await _check_series_driver(db, series_id, current_user, "update")
+    update_data = series_update.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No changes given",
+        )
+    _check_not_null(update_data, ("origin_location", "destination_location", "price_per_seat"))
+    for lat, lon in _COORDINATE_PAIRS:
+        if (lat in update_data) != (lon in update_data):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{lat} and {lon} must be given together",
+            )
+    _check_coordinates(series_update)
+
+    now = datetime.now(timezone.utc)
+    moved = [field for field in ("origin_location", "destination_location") if field in update_data]
+    places = [update_data[field] for field in moved]
+    place_ids = await location_index.resolve(db, *places)
+    for field, location_id in zip(moved, place_ids):
+        update_data[f"{field}_id"] = location_id
+    previous = {}
+    if moved:
+        # Old locations, so /rides/events subscribers of the old search hear about the move
+        previous = {
+            row.ride_id: {field: getattr(row, field) for field in _FILTERED_FIELDS}
+            for row in (await db.execute(
+                select(Ride.ride_id, *(getattr(Ride, field) for field in _FILTERED_FIELDS))
+                .where(_upcoming(series_id, now))
+            )).all()
+        }
+
+    rides = (await db.execute(
+        update(Ride)
+        .where(_upcoming(series_id, now))
+        .values(**update_data)
+        .returning(*_RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await db.commit()
+    location_index.learn(place_ids, places)
+    location_index.record(*place_ids * len(rides))
+    rides.sort(key=lambda ride: (ride.departure_time, ride.ride_id))
+    if moved:
+        response_cache.invalidate_departures(*(ride.departure_time for ride in rides))
+    for ride in rides:
+        response_cache.invalidate_ride(ride.ride_id)
+        # Seats only change by deltas; keep the model's count
+        bookable_rides.upsert(ride, keep_seats=True)
+        ride_events.publish(ride_rows.to_dict(ride), previous.get(ride.ride_id))
+
+    return json_list_response(ride_rows, rides)
+
+
+@router.delete("/series/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_ride_series(
+    series_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cancel every upcoming ride of a series with one UPDATE, dropping their
+    seat holds and waitlists first. Rides that already departed keep their
+    status.
+    """
+    await _check_series_driver(db, series_id, current_user, "cancel")
+    now = datetime.now(timezone.utc)
+    ride_ids = (await db.scalars(select(Ride.ride_id).where(_upcoming(series_id, now)))).all()
+    await cancel_waitlist(db, ride_ids)
+    held = await holds.discard(db, SeatHold.ride_id.in_(ride_ids))
+    values = {"status": "cancelled"}
+    if held:
+        values["seats_available"] = Ride.seats_available + case(held, value=Ride.ride_id, else_=0)
+    rides = (await db.execute(
+        update(Ride)
+        .where(_upcoming(series_id, now))
+        .values(**values)
+        .returning(*_RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await db.commit()
+    for ride in rides:
+        response_cache.invalidate_ride(ride.ride_id)
+        bookable_rides.remove(ride.ride_id)
+        ride_events.publish(ride_rows.to_dict(ride))
 
     return None
@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.ride import RideRead
 
@@ -23,3 +24,35 @@ class BookingRead(BaseModel):
 class BookingWithRide(BookingRead):
     """Booking with nested ride data for the /mine endpoint."""
     ride: RideRead | None = None
+
+
+# all_or_nothing applies every item or none; best_effort applies the ones that pass
+BatchMode = Literal["all_or_nothing", "best_effort"]
+
+
+class BookingBatchCreate(BaseModel):
+    ride_ids: list[UUID] = Field(min_length=1)
+    mode: BatchMode = "all_or_nothing"
+
+
+class BookingBatchCancel(BaseModel):
+    booking_ids: list[UUID] = Field(min_length=1)
+    mode: BatchMode = "all_or_nothing"
+
+
+class BookingBatchItem(BaseModel):
+    """
+    Outcome of one item, with the status code the single-item endpoint would
+    have returned; 424 marks items not applied because another one failed.
+    """
+    ride_id: UUID | None = None
+    booking_id: UUID | None = None
+    status_code: int
+    detail: str | None = None
+    booking: BookingRead | None = None
+
+
+class BookingBatchRead(BaseModel):
+    mode: BatchMode
+    applied: int
+    results: list[BookingBatchItem]
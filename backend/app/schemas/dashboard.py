@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+from app.schemas.booking import BookingWithRide
+from app.schemas.ride import RideRead
+from app.schemas.user import UserRead
+from app.schemas.vehicle import VehicleRead
+
+
+class Dashboard(BaseModel):
+    """Everything the dashboard page shows, newest first, one page per section."""
+    user: UserRead
+    rides: list[RideRead]
+    rides_next_cursor: str | None
+    bookings: list[BookingWithRide]
+    bookings_next_cursor: str | None
+    vehicles: list[VehicleRead]
+    vehicles_next_cursor: str | None
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class LocationSuggestion(BaseModel):
+    """A /locations/autocomplete match; rides is how many rides use the place."""
+    location_id: int
+    name: str
+    rides: int
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
+from typing import Annotated
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -11,6 +12,11 @@ class RideBase(BaseModel):
     departure_time: datetime
     arrival_time: datetime | None = None
     price_per_seat: Decimal = Field(default=Decimal("0"), ge=0)
+    # Optional coordinates, in pairs, so the ride shows up in /rides/nearby
+    origin_lat: float | None = Field(default=None, ge=-90, le=90)
+    origin_lon: float | None = Field(default=None, ge=-180, le=180)
+    destination_lat: float | None = Field(default=None, ge=-90, le=90)
+    destination_lon: float | None = Field(default=None, ge=-180, le=180)
 
 
 class RideCreate(RideBase):
@@ -25,6 +31,12 @@ class RideUpdate(BaseModel):
     arrival_time: datetime | None = None
     price_per_seat: Decimal | None = None
     status: str | None = None
+    origin_lat: float | None = Field(default=None, ge=-90, le=90)
+    origin_lon: float | None = Field(default=None, ge=-180, le=180)
+    destination_lat: float | None = Field(default=None, ge=-90, le=90)
+    destination_lon: float | None = Field(default=None, ge=-180, le=180)
+    # Seats to add, e.g. after switching to a bigger car; waitlisted passengers get them first
+    add_seats: int | None = Field(default=None, gt=0)
 
 
 class RideRead(BaseModel):
@@ -38,5 +50,45 @@ class RideRead(BaseModel):
     price_per_seat: Decimal
     seats_available: int
     status: str
+    origin_location_id: int | None = None
+    destination_location_id: int | None = None
+    origin_lat: float | None = None
+    origin_lon: float | None = None
+    destination_lat: float | None = None
+    destination_lon: float | None = None
+    series_id: UUID | None = None
 
     model_config = {"from_attributes": True}
+
+
+class RideNearby(RideRead):
+    """A /rides/nearby match with its distances from the requested points."""
+    origin_distance_km: float | None
+    destination_distance_km: float | None
+
+
+class RideSeriesCreate(RideCreate):
+    """
+    A recurring ride. departure_time (and arrival_time) give the first day and
+    the time of day; the ride repeats on `weekdays` (0 = Monday) up to and
+    including `until`, skipping the dates in `exceptions`.
+    """
+    weekdays: list[Annotated[int, Field(ge=0, le=6)]] = Field(default=[0, 1, 2, 3, 4], min_length=1)
+    until: date
+    exceptions: list[date] = Field(default_factory=list)
+
+
+class RideSeriesUpdate(BaseModel):
+    """Changes applied to every upcoming ride of a series."""
+    origin_location: str | None = None
+    destination_location: str | None = None
+    price_per_seat: Decimal | None = Field(default=None, ge=0)
+    origin_lat: float | None = Field(default=None, ge=-90, le=90)
+    origin_lon: float | None = Field(default=None, ge=-180, le=180)
+    destination_lat: float | None = Field(default=None, ge=-90, le=90)
+    destination_lon: float | None = Field(default=None, ge=-180, le=180)
+
+
+class RideSeriesRead(BaseModel):
+    series_id: UUID
+    rides: list[RideRead]
@@ -0,0 +1,14 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SeatHoldRead(BaseModel):
+    hold_id: UUID
+    ride_id: UUID
+    passenger_id: UUID
+    created_at: datetime
+    expires_at: datetime
+
+    model_config = {"from_attributes": True}
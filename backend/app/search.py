@@ -0,0 +1,107 @@
+"""
+Location text search for rides.
+
+Matching is substring-style like the old `ILIKE '%x%'`, but served by an index:
+- SQLite: the `rides_fts` FTS5 table with the trigram tokenizer, kept in sync
+  with `rides` by triggers and ranked with bm25().
+- PostgreSQL: pg_trgm GIN indexes, which ILIKE uses directly, ranked with
+  word_similarity().
+When the index is missing (e.g. a database built with create_all before the
+migration) or a term is shorter than a trigram, the plain ILIKE filter is used.
+
+The FTS table is keyed on the implicit rowid of `rides`; after a VACUUM run
+`INSERT INTO rides_fts(rides_fts) VALUES ('rebuild')` to resync it.
+"""
+
+from sqlalchemy import Float, Integer, func, literal_column, text
+
+from app.db import engine
+from app.models import Ride
+
+# Trigram indexes cannot match terms shorter than this
+MIN_INDEXED_TERM = 3
+
+_backend: str | None = None
+
+
+def search_backend() -> str:
+    """
+    Detect which text-search index the database has. Checked once on the sync
+    engine and cached; the app warms this at startup so async requests never
+    block on it.
+    """
+    global _backend
+    if _backend is None:
+        backend = "ilike"
+        with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                found = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rides_fts'")
+                ).first()
+                if found:
+                    backend = "fts5"
+            elif engine.dialect.name == "postgresql":
+                found = conn.execute(
+                    text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                ).first()
+                if found:
+                    backend = "trigram"
+        _backend = backend
+    return _backend
+
+
+def _fts_phrase(column: str, term: str) -> str:
+    """Build an FTS5 column-filtered phrase query, quoting the term."""
+    return f'{column} : "{term.replace(chr(34), chr(34) * 2)}"'
+
+
+def filter_locations(query, origin: str | None, destination: str | None):
+    """
+    Restrict a Ride query (ORM Query or select()) to rides whose
+    origin/destination contain the terms.
+    Returns the filtered query and a rank expression (lower is a better match),
+    or None when the active backend cannot rank.
+    """
+    terms = {"origin_location": origin, "destination_location": destination}
+    terms = {column: term.strip() for column, term in terms.items() if term and term.strip()}
+    if not terms:
+        return query, None
+
+    backend = search_backend()
+    indexed = {c: t for c, t in terms.items() if len(t) >= MIN_INDEXED_TERM}
+    short = {c: t for c, t in terms.items() if len(t) < MIN_INDEXED_TERM}
+
+    # Terms too short for the index (or no index at all) keep the substring scan
+    if backend == "ilike":
+        short, indexed = terms, {}
+    for column, term in short.items():
+        query = query.filter(getattr(Ride, column).ilike(f"%{term}%"))
+
+    if not indexed:
+        return query, None
+
+    if backend == "fts5":
+        match = " AND ".join(_fts_phrase(c, t) for c, t in indexed.items())
+        matches = (
+            text(
+                "SELECT rowid AS fts_rowid, bm25(rides_fts) AS rank "
+                "FROM rides_fts WHERE rides_fts MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(fts_rowid=Integer, rank=Float)
+            # Run the MATCH once: as a plain subquery SQLite re-runs it for every
+            # ride the departure index yields, which for a rare term is all of them
+            .cte("fts")
+            .prefix_with("MATERIALIZED")
+        )
+        query = query.join(matches, matches.c.fts_rowid == literal_column("rides.rowid"))
+        return query, matches.c.rank
+
+    # PostgreSQL: ILIKE is answered by the gin_trgm_ops indexes
+    rank = None
+    for column, term in indexed.items():
+        field = getattr(Ride, column)
+        query = query.filter(field.ilike(f"%{term}%"))
+        similarity = -func.word_similarity(term, field)
+        rank = similarity if rank is None else rank + similarity
+    return query, rank
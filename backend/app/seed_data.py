@@ -4,17 +4,33 @@ Seed data script for the Carpool database.
 Creates sample users, vehicles, rides, and bookings for testing/demo purposes.
 Safe to run multiple times (idempotent - checks for existing data before inserting).
 
+With --synthetic it instead generates a large, correlated load-test dataset
+from scale parameters and a seed, written with batched bulk INSERTs (COPY on
+PostgreSQL). Synthetic data is not idempotent; use a fresh database or a new seed.
+
 Usage:
     cd backend
     python -m app.seed_data
+    python -m app.seed_data --synthetic --users 100000 --rides 500000 --seed 7
 """
 
+import argparse
+import csv
+import io
+import random
+import re
+import time
+import uuid
+from array import array
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+from sqlalchemy import insert
+
 from app.auth.hashing import hash_password
 from app.db import SessionLocal
-from app.models import Booking, Ride, User, Vehicle
+from app.locations import location_key, location_name
+from app.models import Booking, Location, Ride, User, Vehicle
 
 
 def get_or_create_user(db, email: str, name: str, password: str, role: str = "student") -> User:
@@ -60,6 +76,19 @@ def get_or_create_vehicle(
     return vehicle
 
 
+def get_or_create_location(db, name: str) -> Location:
+    """Get the canonical location for a place name or create it."""
+    key = location_key(name)
+    location = db.query(Location).filter(Location.key == key).first()
+    if location:
+        return location
+
+    location = Location(name=location_name(name), key=key)
+    db.add(location)
+    db.flush()
+    return location
+
+
 def create_ride_if_not_exists(
     db,
     driver: User,
@@ -91,6 +120,8 @@ def create_ride_if_not_exists(
         vehicle_id=vehicle.vehicle_id,
         origin_location=origin,
         destination_location=destination,
+        origin_location_id=get_or_create_location(db, origin).location_id,
+        destination_location_id=get_or_create_location(db, destination).location_id,
         departure_time=departure_time,
         seats_available=seats_available,
         price_per_seat=price_per_seat,
@@ -236,5 +267,211 @@ def seed_database():
         db.close()
 
 
+SYNTHETIC_PASSWORD = "synthetic123"
+SYNTHETIC_PLACES = [
+    "Campus Library", "Student Center", "Dormitory A", "Dormitory B", "Gym",
+    "Downtown Mall", "Airport", "Train Station", "Beach", "Concert Hall", "Shopping Center",
+]
+
+
+_NUMERIC_HEX = re.compile(r"[0-9]+(e[0-9]+)?")
+# A hex letter that can never be part of a number
+_HEX_LETTER = re.compile(r"[a-df]")
+
+
+def random_id(rng) -> uuid.UUID:
+    """A reproducible UUID4 from `rng`, safe to store in SQLite."""
+    while True:
+        value = uuid.UUID(int=rng.getrandbits(128), version=4)
+        # SQLite stores a hex string that reads as a number ("123e45...") as a
+        # REAL, which breaks reading it back; redraw the rare ID that would
+        if not _NUMERIC_HEX.fullmatch(value.hex):
+            return value
+
+
+def synthetic_ids(seed: int):
+    """
+    The IDs generate_synthetic(seed=seed) gives its rows, as a function of
+    (kind, index) for kind in user, vehicle, ride and booking, so callers
+    can address generated rows without querying for them.
+    """
+    rng = random.Random(seed)
+    namespaces = {}
+    for kind in ("user", "vehicle", "ride", "booking"):
+        # random_id's guard, made to hold for every index: a letter in the
+        # namespace's half of the hex keeps any ID from reading as a number
+        while True:
+            namespace = random_id(rng).int >> 64 << 64
+            if _HEX_LETTER.search(uuid.UUID(int=namespace).hex[:16]):
+                break
+        namespaces[kind] = namespace
+
+    def make_id(kind: str, index: int) -> uuid.UUID:
+        return uuid.UUID(int=namespaces[kind] | index, version=4)
+
+    return make_id
+
+
+class BulkWriter:
+    """Buffers rows per table and writes them in batches, counting rows written."""
+
+    def __init__(self, db, batch: int):
+        self.db = db
+        self.batch = batch
+        self.counts: dict[str, int] = {}
+        bind = db.get_bind()
+        self.use_copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+    def write(self, table, rows: list[dict]):
+        for i in range(0, len(rows), self.batch):
+            chunk = rows[i : i + self.batch]
+            if self.use_copy:
+                self._copy(table, chunk)
+            else:
+                self.db.execute(insert(table), chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table, rows: list[dict]):
+        """Stream rows through COPY ... FROM STDIN; None becomes an unquoted empty field (NULL)."""
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+
+def generate_synthetic(
+    db,
+    users: int,
+    rides: int,
+    driver_ratio: float = 0.2,
+    occupancy: float = 0.6,
+    seed: int = 341,
+    batch: int = 10_000,
+) -> dict[str, int]:
+    """
+    Generate a synthetic dataset and return the number of rows written per table.
+
+    The first `driver_ratio` of users are drivers with one vehicle each. Rides
+    depart between six months ago and two months ahead; each takes confirmed
+    bookings from distinct non-driver passengers up to its vehicle capacity
+    (less the driver), and seats_available is what remains. IDs are derived
+    from the seed and the row index (see synthetic_ids), so nothing but
+    per-driver seat counts is kept in memory. Every user shares one password
+    hash.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    hashed = hash_password(SYNTHETIC_PASSWORD)
+    writer = BulkWriter(db, batch)
+    drivers = max(1, int(users * driver_ratio))
+    if users < 9:
+        raise ValueError("Need at least 9 users so every ride can fill up")
+
+    make_id = synthetic_ids(seed)
+
+    for start in range(0, users, batch):
+        writer.write(User.__table__, [
+            {"user_id": make_id("user", i), "name": f"Synthetic User {i}",
+             "email": f"s{seed}u{i}@synthetic.edu", "hashed_password": hashed,
+             "phone": None, "role": "student", "created_at": now}
+            for i in range(start, min(start + batch, users))
+        ])
+
+    place_ids = {place: get_or_create_location(db, place).location_id for place in SYNTHETIC_PLACES}
+
+    seats_total = array("B", (rng.randint(2, 7) for _ in range(drivers)))
+    for start in range(0, drivers, batch):
+        writer.write(Vehicle.__table__, [
+            {"vehicle_id": make_id("vehicle", i), "owner_id": make_id("user", i),
+             "make": "Synthetic", "model": "Model", "color": None,
+             "license_plate": f"S{seed}-{i:07d}", "seats_total": seats_total[i],
+             "year": None, "notes": None}
+            for i in range(start, min(start + batch, drivers))
+        ])
+
+    booking_index = 0
+    for start in range(0, rides, batch):
+        ride_rows, booking_rows = [], []
+        for i in range(start, min(start + batch, rides)):
+            driver = rng.randrange(drivers)
+            departure = now + timedelta(minutes=rng.randint(-180 * 24 * 60, 60 * 24 * 60))
+            if departure < now:
+                status = "completed" if rng.random() < 0.9 else "cancelled"
+            else:
+                status = "scheduled" if rng.random() < 0.95 else "cancelled"
+            capacity = seats_total[driver] - 1
+            booked = sum(rng.random() < occupancy for _ in range(capacity))
+            passengers = [p for p in rng.sample(range(users), booked + 1) if p != driver][:booked]
+            ride_id = make_id("ride", i)
+            for passenger in passengers:
+                booking_rows.append({
+                    "booking_id": make_id("booking", booking_index), "ride_id": ride_id,
+                    "passenger_id": make_id("user", passenger),
+                    "booking_time": min(now, departure - timedelta(minutes=rng.randint(10, 14 * 24 * 60))),
+                    "status": "cancelled" if status == "cancelled" else "confirmed",
+                })
+                booking_index += 1
+            origin, destination = rng.choice(SYNTHETIC_PLACES), rng.choice(SYNTHETIC_PLACES)
+            ride_rows.append({
+                "ride_id": ride_id, "driver_id": make_id("user", driver),
+                "vehicle_id": make_id("vehicle", driver),
+                "origin_location": origin,
+                "destination_location": destination,
+                "origin_location_id": place_ids[origin],
+                "destination_location_id": place_ids[destination],
+                "departure_time": departure, "arrival_time": departure + timedelta(minutes=rng.randint(15, 90)),
+                "seats_available": capacity if status == "cancelled" else capacity - len(passengers),
+                "price_per_seat": Decimal(rng.randint(200, 2500)) / 100,
+                "status": status,
+            })
+        writer.write(Ride.__table__, ride_rows)
+        writer.write(Booking.__table__, booking_rows)
+
+    db.commit()
+    return writer.counts
+
+
+def seed_synthetic(users: int, rides: int, driver_ratio: float, occupancy: float, seed: int, batch: int):
+    """Run generate_synthetic and report throughput."""
+    print(f"Generating synthetic data (users={users}, rides={rides}, seed={seed})...")
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        counts = generate_synthetic(db, users, rides, driver_ratio, occupancy, seed, batch)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"  {table:<10} {count:>12,}")
+    print(f"Wrote {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/sec)")
+    print(f"All synthetic users log in with password '{SYNTHETIC_PASSWORD}'.")
+
+
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Seed the Carpool database")
+    parser.add_argument("--synthetic", action="store_true", help="generate a large load-test dataset")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--rides", type=int, default=50_000)
+    parser.add_argument("--driver-ratio", type=float, default=0.2)
+    parser.add_argument("--occupancy", type=float, default=0.6, help="chance each seat is booked")
+    parser.add_argument("--seed", type=int, default=341)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        seed_synthetic(args.users, args.rides, args.driver_ratio, args.occupancy, args.seed, args.batch)
+    else:
+        seed_database()
@@ -0,0 +1,137 @@
+"""
+Departure/arrival time windows for ride search.
+
+TimeWindow collects the optional depart_after/depart_before and
+arrive_after/arrive_before bounds of /rides/search. Together they express
+the usual questions:
+- "leaving between 7:30 and 8:15": depart_after=7:30, depart_before=8:15
+- "arriving before 9:00": arrive_before=9:00
+- a ride contained in [a, b]: depart_after=a, arrive_before=b
+- a ride on the road at some point in [a, b]: depart_before=b, arrive_after=a
+Arrival bounds only match rides that have an arrival_time.
+
+With flex_minutes every bound is widened by that tolerance and matches are
+ranked by how far they fall outside the exact window (0 inside it).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select
+
+from app.config import settings
+from app.models import Ride
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _gap(value: datetime, lower: datetime | None, upper: datetime | None) -> float:
+    """Seconds `value` lies outside [lower, upper]."""
+    if lower is not None and value < lower:
+        return (lower - value).total_seconds()
+    if upper is not None and value > upper:
+        return (value - upper).total_seconds()
+    return 0.0
+
+
+class TimeWindow:
+    """Dependency collecting the time-window query parameters of /rides/search."""
+
+    def __init__(
+        self,
+        depart_after: datetime | None = Query(None, description="Earliest departure"),
+        depart_before: datetime | None = Query(None, description="Latest departure"),
+        arrive_after: datetime | None = Query(None, description="Earliest arrival"),
+        arrive_before: datetime | None = Query(None, description="Latest arrival"),
+        flex_minutes: int | None = Query(
+            None,
+            ge=0,
+            le=settings.TIME_WINDOW_FLEX_MAX_MINUTES,
+            description="Also match rides this far outside the window, ranked by how far (single page)",
+        ),
+    ):
+        self.depart_after = _utc(depart_after)
+        self.depart_before = _utc(depart_before)
+        self.arrive_after = _utc(arrive_after)
+        self.arrive_before = _utc(arrive_before)
+        self.flex_minutes = flex_minutes
+        for lower, upper, name in (
+            (self.depart_after, self.depart_before, "depart"),
+            (self.arrive_after, self.arrive_before, "arrive"),
+        ):
+            if lower is not None and upper is not None and lower > upper:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{name}_after must not be later than {name}_before",
+                )
+        if flex_minutes is not None and not self.active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="flex_minutes needs a departure or arrival bound",
+            )
+
+        # The exact bounds widened by flex_minutes: what a ride must fall within to match
+        tolerance = timedelta(minutes=flex_minutes or 0)
+        self.bounds = tuple(
+            bound and bound + sign * tolerance for bound, sign in zip(self.exact, (-1, 1, -1, 1))
+        )
+
+    @property
+    def active(self) -> bool:
+        return any(bound is not None for bound in self.exact)
+
+    @property
+    def flexible(self) -> bool:
+        return self.flex_minutes is not None
+
+    @property
+    def exact(self) -> tuple:
+        """(depart_after, depart_before, arrive_after, arrive_before) as requested."""
+        return self.depart_after, self.depart_before, self.arrive_after, self.arrive_before
+
+    def key(self) -> tuple:
+        """Hashable form for response cache keys."""
+        return (*self.exact, self.flex_minutes)
+
+    def admits(self, departure: datetime, arrival: datetime | None) -> bool:
+        """Whether a ride with these (UTC) times falls within `bounds`."""
+        depart_after, depart_before, arrive_after, arrive_before = self.bounds
+        if depart_after is not None and departure < depart_after:
+            return False
+        if depart_before is not None and departure > depart_before:
+            return False
+        if arrive_after is None and arrive_before is None:
+            return True
+        if arrival is None:
+            return False
+        if arrive_after is not None and arrival < arrive_after:
+            return False
+        return arrive_before is None or arrival <= arrive_before
+
+    def distance(self, departure: datetime, arrival: datetime | None) -> float:
+        """Seconds a matching ride lies outside the exact window, departure and arrival summed."""
+        depart_after, depart_before, arrive_after, arrive_before = self.exact
+        gap = _gap(_utc(departure), depart_after, depart_before)
+        if arrival is not None:
+            gap += _gap(_utc(arrival), arrive_after, arrive_before)
+        return gap
+
+    def filter(self, stmt: Select) -> Select:
+        """Restrict a Ride select() to rides within `bounds`."""
+        depart_after, depart_before, arrive_after, arrive_before = self.bounds
+        if depart_after is not None:
+            stmt = stmt.where(Ride.departure_time >= depart_after)
+        if depart_before is not None:
+            stmt = stmt.where(Ride.departure_time <= depart_before)
+        # NULL arrival_time compares as unknown, so those rides drop out here
+        if arrive_after is not None:
+            stmt = stmt.where(Ride.arrival_time >= arrive_after)
+        if arrive_before is not None:
+            stmt = stmt.where(Ride.arrival_time <= arrive_before)
+        return stmt
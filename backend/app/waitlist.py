@@ -0,0 +1,129 @@
+"""
+Waitlist for full rides, kept as 'pending' bookings.
+
+book_ride queues a pending booking when a ride has no seats left. Whenever a
+write frees seats on a ride (a confirmed booking cancelled, the driver adding
+seats), it calls promote() in the same transaction, which confirms the oldest
+pending bookings, by (booking_time, booking_id), while seats remain. Closing
+a ride (cancelled by the driver, or completed) cancels its pending bookings
+with cancel_waitlist(), also in the closing transaction.
+
+Joining and promoting both hold the ride row's write lock (an UPDATE of the
+row), so on PostgreSQL a join and a seat release on the same ride serialize:
+either the release sees the new pending booking, or the join sees the free
+seat and books it instead. SQLite serializes all writers anyway.
+"""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Booking, Ride
+from app.serialization import ride_rows
+
+RIDE_COLUMNS = ride_rows.columns(Ride)
+
+
+async def claim_seat(db: AsyncSession, ride_id: UUID, user_id: UUID, now: datetime) -> Row | None:
+    """
+    Take a seat with a single conditional UPDATE so concurrent bookings can
+    never oversell a ride. Returns the updated ride, or None if any booking
+    rule fails.
+    """
+    rides = await claim_seats(db, [ride_id], user_id, now)
+    return rides[0] if rides else None
+
+
+async def claim_seats(db: AsyncSession, ride_ids: list[UUID], user_id: UUID, now: datetime) -> list[Row]:
+    """claim_seat for several rides with one UPDATE; returns the rides that had a seat."""
+    return (await db.execute(
+        update(Ride)
+        .where(
+            Ride.ride_id.in_(ride_ids),
+            Ride.driver_id != user_id,
+            Ride.status == "scheduled",
+            Ride.departure_time > now,
+            Ride.seats_available > 0,
+        )
+        .values(seats_available=Ride.seats_available - 1)
+        .returning(*RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+
+async def lock_full_ride(db: AsyncSession, ride_id: UUID, user_id: UUID, now: datetime) -> Row | None:
+    """
+    Lock a ride that is bookable except for having no seats, with a no-op
+    UPDATE. Returns it, or None if it is not full (or not bookable at all).
+    """
+    return (await db.execute(
+        update(Ride)
+        .where(
+            Ride.ride_id == ride_id,
+            Ride.driver_id != user_id,
+            Ride.status == "scheduled",
+            Ride.departure_time > now,
+            Ride.seats_available == 0,
+        )
+        .values(seats_available=Ride.seats_available)
+        .returning(*RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).first()
+
+
+async def promote(db: AsyncSession, ride: Row) -> tuple[Row, list[UUID]]:
+    """
+    Confirm pending bookings, oldest first, into the free seats of `ride`: the
+    row returned by the UPDATE that freed them, in this transaction. Returns
+    the ride as it stands afterwards and the promoted booking IDs.
+    """
+    promoted: list[UUID] = []
+    while ride.status == "scheduled" and ride.seats_available > 0:
+        candidates = (await db.scalars(
+            select(Booking.booking_id)
+            .where(Booking.ride_id == ride.ride_id, Booking.status == "pending")
+            .order_by(Booking.booking_time, Booking.booking_id)
+            .limit(ride.seats_available)
+        )).all()
+        if not candidates:
+            break
+        # A passenger may withdraw a pending booking meanwhile; only count the
+        # bookings this UPDATE actually confirmed
+        confirmed = (await db.scalars(
+            update(Booking)
+            .where(Booking.booking_id.in_(candidates), Booking.status == "pending")
+            .values(status="confirmed")
+            .returning(Booking.booking_id)
+            .execution_options(synchronize_session=False)
+        )).all()
+        if confirmed:
+            ride = (await db.execute(
+                update(Ride)
+                .where(Ride.ride_id == ride.ride_id)
+                .values(seats_available=Ride.seats_available - len(confirmed))
+                .returning(*RIDE_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).first()
+            promoted += confirmed
+        if len(confirmed) == len(candidates) and ride.seats_available > 0:
+            # The queue was shorter than the free seats
+            break
+    return ride, promoted
+
+
+async def cancel_waitlist(db: AsyncSession, ride_ids: list[UUID]) -> int:
+    """
+    Cancel the pending bookings of rides that will not run (cancelled or
+    completed), in the caller's transaction. Returns how many were cancelled.
+    """
+    if not ride_ids:
+        return 0
+    result = await db.execute(
+        update(Booking)
+        .where(Booking.ride_id.in_(ride_ids), Booking.status == "pending")
+        .values(status="cancelled")
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
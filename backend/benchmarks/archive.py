@@ -0,0 +1,99 @@
+"""
+Throughput of moving old rides and bookings into the history tables.
+
+Seeds the usual synthetic dataset (rides over the past six months, mostly finished),
+then runs archive_old() with a --retention-days cutoff and reports rows moved
+per second (rides + bookings), per-batch timings (how long each chunk holds
+its locks), table sizes before and after, and the latency of a long-time
+user's first /bookings/mine page with and without history.
+
+Usage:
+    cd backend
+    python -m benchmarks.archive --rides 5000000 --occupancy 0.3 --batch 5000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, generate_synthetic
+from app.archive import archive_old
+from app.main import app
+from app.models import Booking, BookingHistory, Ride, RideHistory, User
+
+
+def sizes(db) -> dict:
+    return {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model))
+        for model in (Ride, Booking, RideHistory, BookingHistory)
+    }
+
+
+def mine_latency(client: TestClient, header, include_history: bool, repeat: int = 50) -> float:
+    url = f"/bookings/mine?include_history={str(include_history).lower()}"
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers=header)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--rides", type=int, default=500_000)
+    parser.add_argument("--occupancy", type=float, default=0.3, help="chance each seat is booked")
+    parser.add_argument("--retention-days", type=float, default=90)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        print(f"seeding {args.rides} rides, occupancy {args.occupancy} ...")
+        generate_synthetic(db, args.users, args.rides, occupancy=args.occupancy)
+        busiest = db.execute(
+            select(Booking.passenger_id).group_by(Booking.passenger_id)
+            .order_by(func.count().desc()).limit(1)
+        ).scalar_one()
+        header = auth_header(db.get(User, busiest))
+        print("before:", sizes(db))
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        live_before = mine_latency(client, header, False)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.retention_days)
+        result = client.portal.call(archive_old, cutoff, args.batch)
+        live_after = mine_latency(client, header, False)
+        with_history = mine_latency(client, header, True)
+
+    db = SessionLocal()
+    try:
+        print("after: ", sizes(db))
+        left = db.scalar(
+            select(func.count()).select_from(Ride)
+            .where(Ride.status.in_(("completed", "cancelled")), Ride.departure_time < cutoff)
+        )
+    finally:
+        db.close()
+    if left:
+        raise SystemExit(f"FAIL: {left} rides older than the cutoff were not archived")
+
+    moved = result["rides"] + result["bookings"]
+    print(f"moved {result['rides']} rides + {result['bookings']} bookings = {moved} rows "
+          f"in {result['seconds']}s: {moved / result['seconds']:.0f} rows/s")
+    print(f"{result['batches']} batches of {args.batch} rides: "
+          f"avg {result['batch_ms_avg']} ms, max {result['batch_ms_max']} ms")
+    print(f"/bookings/mine p50: {live_before:.2f} ms before, {live_after:.2f} ms after, "
+          f"{with_history:.2f} ms with include_history")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cost of booking a week of rides: one request per ride versus /bookings/batch.
+
+A driver offers --rides rides; one passenger books each with POST
+/rides/{id}/book and cancels each with DELETE /bookings/{id}, and another
+passenger does the same with one POST and one DELETE /bookings/batch.
+Reports wall time, requests and SQL statements (from the Server-Timing
+header) for each, and checks both ways left the same seat counts.
+
+Usage:
+    cd backend
+    python -m benchmarks.booking_batch --rides 20 --repeat 5
+"""
+
+import argparse
+import re
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, create_users
+from app.main import app
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def call(client: TestClient, method: str, url: str, headers: dict, body=None, expected: int = 200):
+    response = client.request(method, url, json=body, headers=headers)
+    if response.status_code != expected:
+        raise SystemExit(f"FAIL: {method} {url} returned {response.status_code}: {response.text}")
+    match = QUERIES.search(response.headers.get("server-timing", ""))
+    return response, int(match.group(1)) if match else 0
+
+
+def run(client: TestClient, driver: dict, single: dict, batched: dict, vehicle_id: str, first: datetime, rides: int) -> dict:
+    """Both ways once on fresh rides; returns {step: (seconds, requests, statements)}."""
+    ride_ids = [
+        call(client, "POST", "/rides", driver, {
+            "vehicle_id": vehicle_id, "origin_location": "Case Quad", "destination_location": "Tower City",
+            "departure_time": (first + timedelta(hours=i)).isoformat(), "seats_available": 3,
+            "price_per_seat": "4.00",
+        }, 201)[0].json()["ride_id"]
+        for i in range(rides)
+    ]
+    results = {}
+
+    def timed(name, requests):
+        start, statements, responses = time.perf_counter(), 0, []
+        for request in requests:
+            response, count = call(client, *request)
+            responses.append(response)
+            statements += count
+        results[name] = (time.perf_counter() - start, len(responses), statements)
+        return responses
+
+    singles = timed("book one by one", [("POST", f"/rides/{ride_id}/book", single, None, 201) for ride_id in ride_ids])
+    batch = timed("book batch", [("POST", "/bookings/batch", batched, {"ride_ids": ride_ids})])[0].json()
+    if batch["applied"] != rides:
+        raise SystemExit(f"FAIL: the batch booked {batch['applied']} of {rides} rides: {batch['results']}")
+    seats = {ride_id: call(client, "GET", f"/rides/{ride_id}", driver)[0].json()["seats_available"] for ride_id in ride_ids}
+    if set(seats.values()) != {1}:
+        raise SystemExit(f"FAIL: expected 1 seat left on every ride, got {seats}")
+
+    timed("cancel one by one", [
+        ("DELETE", f"/bookings/{response.json()['booking_id']}", single, None, 204) for response in singles
+    ])
+    timed("cancel batch", [
+        ("DELETE", "/bookings/batch", batched, {"booking_ids": [item["booking_id"] for item in batch["results"]]})
+    ])
+    seats = {ride_id: call(client, "GET", f"/rides/{ride_id}", driver)[0].json()["seats_available"] for ride_id in ride_ids}
+    if set(seats.values()) != {3}:
+        raise SystemExit(f"FAIL: expected every seat back after cancelling, got {seats}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rides", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver, single, batched = (auth_header(user) for user in create_users(db, 3, prefix="batch"))
+        db.commit()
+    finally:
+        db.close()
+
+    runs = []
+    with TestClient(app) as client:
+        vehicle_id, _ = call(client, "POST", "/vehicles", driver, {
+            "make": "Bench", "model": "Mark", "license_plate": "BATCH-1", "seats_total": 4,
+        }, 201)
+        vehicle_id = vehicle_id.json()["vehicle_id"]
+        first = datetime(2031, 1, 6, 8, tzinfo=timezone.utc)
+        for i in range(args.repeat):
+            runs.append(run(client, driver, single, batched, vehicle_id, first + timedelta(days=i), args.rides))
+
+    print(f"{args.rides} rides, median of {args.repeat} runs")
+    print(f"{'step':<20}{'ms':>10}{'requests':>10}{'statements':>12}")
+    for name in runs[0]:
+        ms = statistics.median(result[name][0] * 1000 for result in runs)
+        _, requests, statements = runs[0][name]
+        print(f"{name:<20}{ms:>10.1f}{requests:>10}{statements:>12}")
+
+
+if __name__ == "__main__":
+    main()
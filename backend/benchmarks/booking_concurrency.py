@@ -0,0 +1,83 @@
+"""
+Concurrency benchmark for seat reservation.
+
+Fires N parallel bookings (one per passenger) at a single ride with S seats and
+checks that the ride is never oversold: exactly min(N, S) bookings succeed, the
+rest get 409 (the waitlist is turned off), and seats_available + confirmed
+bookings still equals S. See waitlist_stress for the waitlist.
+
+Usage:
+    cd backend
+    python -m benchmarks.booking_concurrency --passengers 200 --seats 20 --workers 32
+"""
+
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_ride, create_schema, create_users
+from app.main import app
+from app.models import Booking, Ride
+
+
+def run(passengers: int, seats: int, workers: int):
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver, *riders = create_users(db, passengers + 1)
+        ride = create_ride(db, driver, seats)
+        ride_id = ride.ride_id
+        headers = [auth_header(rider) for rider in riders]
+        db.commit()
+    finally:
+        db.close()
+
+    # One client context keeps every request on the same event loop, which the
+    # async engine's pooled connections require
+    with TestClient(app) as client:
+
+        def book(header):
+            return client.post(f"/rides/{ride_id}/book", params={"waitlist": False}, headers=header).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            codes = Counter(pool.map(book, headers))
+        elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    try:
+        remaining = db.query(Ride.seats_available).filter(Ride.ride_id == ride_id).scalar()
+        confirmed = (
+            db.query(Booking)
+            .filter(Booking.ride_id == ride_id, Booking.status == "confirmed")
+            .count()
+        )
+    finally:
+        db.close()
+
+    print(f"passengers={passengers} seats={seats} workers={workers}")
+    print(f"status codes: {dict(sorted(codes.items()))}")
+    print(f"confirmed bookings: {confirmed}, seats left: {remaining}")
+    print(f"elapsed: {elapsed:.3f}s, {passengers / elapsed:.1f} attempts/s, "
+          f"{codes[201] / elapsed:.1f} bookings/s")
+
+    oversold = confirmed + remaining != seats or confirmed > seats
+    if oversold or codes[201] != min(passengers, seats):
+        raise SystemExit("FAIL: seat accounting is inconsistent")
+    print("OK: no seat oversold")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passengers", type=int, default=200)
+    parser.add_argument("--seats", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    run(args.passengers, args.seats, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file unless DATABASE_URL is already
+set in the environment, so they never touch the development database.
+Import this module before anything from `app`, since `app.db` builds its engine
+from settings at import time. Large datasets come from the seed script's
+generate_synthetic, re-exported here with its ID helpers.
+"""
+
+import os
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(prefix="carpool-bench-", suffix=".db")
+    os.close(_fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+from datetime import datetime, timedelta, timezone  # noqa: E402
+from decimal import Decimal  # noqa: E402
+
+from app.auth.hashing import hash_password  # noqa: E402
+from app.auth.jwt_utils import create_access_token  # noqa: E402
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.models import Ride, User, Vehicle  # noqa: E402
+from app.seed_data import generate_synthetic, random_id, synthetic_ids  # noqa: E402, F401
+
+
+def create_schema():
+    """Create all tables on the benchmark database."""
+    Base.metadata.create_all(engine)
+
+
+def create_users(db, count: int, prefix: str = "bench") -> list[User]:
+    """Create `count` users sharing a single password hash."""
+    hashed = hash_password("bench")
+    users = [
+        User(name=f"{prefix} {i}", email=f"{prefix}{i}@bench.edu", hashed_password=hashed)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.flush()
+    return users
+
+
+def create_ride(db, driver: User, seats: int, plate: str = "BENCH-1") -> Ride:
+    """Create a vehicle and a future scheduled ride for `driver`."""
+    vehicle = Vehicle(
+        owner_id=driver.user_id,
+        make="Bench",
+        model="Mark",
+        license_plate=plate,
+        seats_total=max(seats, 1),
+    )
+    db.add(vehicle)
+    db.flush()
+
+    ride = Ride(
+        driver_id=driver.user_id,
+        vehicle_id=vehicle.vehicle_id,
+        origin_location="Campus Library",
+        destination_location="Airport",
+        departure_time=datetime.now(timezone.utc) + timedelta(days=1),
+        seats_available=seats,
+        price_per_seat=Decimal("5.00"),
+        status="scheduled",
+    )
+    db.add(ride)
+    db.flush()
+    return ride
+
+
+def auth_header(user: User) -> dict[str, str]:
+    """Build an Authorization header for `user`."""
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': user.user_id})}"}
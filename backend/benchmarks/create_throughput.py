@@ -0,0 +1,96 @@
+"""
+Writes/sec for each create endpoint.
+
+Drives register, create_vehicle, create_ride and book_ride sequentially
+through the app and reports throughput, median latency and the SQL statements
+each request issued (from the Server-Timing header).
+
+Usage:
+    cd backend
+    python -m benchmarks.create_throughput --count 500
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, create_users
+from app.main import app
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def measure(client: TestClient, requests) -> tuple[float, float, float]:
+    """Run (url, json, headers) requests; return (writes/s, median ms, statements/request)."""
+    latencies, statements = [], []
+    start = time.perf_counter()
+    for url, body, headers in requests:
+        began = time.perf_counter()
+        response = client.post(url, json=body, headers=headers)
+        latencies.append((time.perf_counter() - began) * 1000)
+        if response.status_code != 201:
+            raise SystemExit(f"FAIL: {url} returned {response.status_code}: {response.text}")
+        match = QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            statements.append(int(match.group(1)))
+    elapsed = time.perf_counter() - start
+    return (
+        len(latencies) / elapsed,
+        statistics.median(latencies),
+        statistics.mean(statements) if statements else float("nan"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+    count = args.count
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver, *passengers = create_users(db, count + 1, prefix="writer")
+        driver_header = auth_header(driver)
+        passenger_headers = [auth_header(p) for p in passengers]
+        db.commit()
+    finally:
+        db.close()
+
+    results = {}
+    with TestClient(app) as client:
+        results["register"] = measure(client, [
+            ("/auth/register", {"name": f"New {i}", "email": f"new{i}@bench.edu", "password": "bench"}, {})
+            for i in range(count)
+        ])
+
+        results["create_vehicle"] = measure(client, [
+            ("/vehicles", {"make": "Bench", "model": "Mark", "license_plate": f"W-{i:06d}", "seats_total": 4},
+             driver_header)
+            for i in range(count)
+        ])
+        vehicle_id = client.get("/vehicles/mine?limit=1", headers=driver_header).json()[0]["vehicle_id"]
+
+        results["create_ride"] = measure(client, [
+            ("/rides", {"vehicle_id": vehicle_id, "origin_location": "Campus Library",
+                        "destination_location": "Airport", "departure_time": f"2031-01-01T{i % 24:02d}:00:00Z",
+                        "seats_available": 4, "price_per_seat": "5.00"}, driver_header)
+            for i in range(count)
+        ])
+        ride_ids = [r["ride_id"] for r in client.get(f"/rides/mine?limit={min(count, 200)}", headers=driver_header).json()]
+
+        results["book_ride"] = measure(client, [
+            (f"/rides/{ride_ids[i % len(ride_ids)]}/book", None, passenger_headers[i])
+            for i in range(min(count, len(ride_ids) * 4))
+        ])
+
+    print(f"{'endpoint':<16}{'writes/s':>10}{'p50 ms':>10}{'stmts/req':>11}")
+    for name, (rate, median, statements) in results.items():
+        print(f"{name:<16}{rate:>10.0f}{median:>10.2f}{statements:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
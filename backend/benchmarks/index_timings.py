@@ -0,0 +1,133 @@
+"""
+Before/after timings for the secondary indexes from revision 002_query_indexes.
+
+Seeds a large synthetic dataset, drops the indexes declared on the models,
+times each hot query shape, recreates the indexes and times them again.
+
+Usage:
+    cd backend
+    python -m benchmarks.index_timings --rides 2000000 --users 50000 --occupancy 0.3
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic, synthetic_ids
+from app.db import engine
+from app.models import Booking, Ride, Vehicle
+
+INDEXED_TABLES = [Ride.__table__, Booking.__table__, Vehicle.__table__]
+
+
+def hot_queries(db, user_id, page: int = 50):
+    """The query shapes issued by the routers and cli.py, keyed by name."""
+    now = datetime.now(timezone.utc)
+    day = now + timedelta(days=7)
+    return {
+        "search (scheduled, future)": lambda: (
+            db.query(Ride)
+            .filter(Ride.status == "scheduled", Ride.departure_time >= now)
+            .order_by(Ride.departure_time, Ride.ride_id)
+            .limit(page)
+            .all()
+        ),
+        "search by date": lambda: (
+            db.query(Ride)
+            .filter(
+                Ride.status == "scheduled",
+                Ride.departure_time >= day.replace(hour=0, minute=0),
+                Ride.departure_time <= day.replace(hour=23, minute=59),
+            )
+            .order_by(Ride.departure_time, Ride.ride_id)
+            .limit(page)
+            .all()
+        ),
+        "cli available count": lambda: (
+            db.query(Ride).filter(Ride.status == "scheduled", Ride.departure_time >= now).count()
+        ),
+        "rides/mine": lambda: (
+            db.query(Ride)
+            .filter(Ride.driver_id == user_id)
+            .order_by(Ride.departure_time.desc(), Ride.ride_id.desc())
+            .limit(page)
+            .all()
+        ),
+        "bookings/mine": lambda: (
+            db.query(Booking)
+            .filter(Booking.passenger_id == user_id)
+            .order_by(Booking.booking_time.desc(), Booking.booking_id.desc())
+            .limit(page)
+            .all()
+        ),
+        "vehicles/mine": lambda: (
+            db.query(Vehicle)
+            .filter(Vehicle.owner_id == user_id)
+            .order_by(Vehicle.vehicle_id)
+            .limit(page)
+            .all()
+        ),
+    }
+
+
+def time_queries(user_id, repeat: int) -> dict[str, float]:
+    """Median wall time in milliseconds for each hot query."""
+    results = {}
+    db = SessionLocal()
+    try:
+        for name, run in hot_queries(db, user_id).items():
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+                db.expunge_all()
+            results[name] = statistics.median(samples)
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--rides", type=int, default=2_000_000)
+    parser.add_argument("--occupancy", type=float, default=0.3, help="chance each seat is booked")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    indexes = [index for table in INDEXED_TABLES for index in table.indexes]
+    for index in indexes:
+        index.drop(engine)
+
+    print(f"Seeding {args.users} users, {args.rides} rides, occupancy {args.occupancy}...")
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = generate_synthetic(db, args.users, args.rides, occupancy=args.occupancy)
+    finally:
+        db.close()
+    print(f"  seeded {counts['bookings']} bookings in {time.perf_counter() - start:.1f}s")
+
+    # A driver (the first fifth of users own vehicles) who also books rides
+    probe = synthetic_ids(341)("user", 0)
+    before = time_queries(probe, args.repeat)
+
+    start = time.perf_counter()
+    for index in indexes:
+        index.create(engine)
+    print(f"  built {len(indexes)} indexes in {time.perf_counter() - start:.1f}s")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    after = time_queries(probe, args.repeat)
+
+    print(f"\n{'query':<30}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<30}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+HTTP load benchmark comparing the async and sync database paths.
+
+Seeds a dataset, then for each mode starts uvicorn with DB_ASYNC set
+accordingly and drives it with many concurrent clients issuing a read/write
+mix (ride search, ride details, bookings). Reports requests/sec and latency
+percentiles per mode.
+
+Usage:
+    cd backend
+    python -m benchmarks.load --concurrency 200 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, generate_synthetic, synthetic_ids
+from app.models import User
+
+
+async def wait_ready(base_url: str, timeout: float = 30):
+    """Poll the root endpoint until uvicorn answers."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, headers: list, ride_ids: list, concurrency: int, duration: float):
+    """Run `concurrency` client loops for `duration` seconds; return latencies and errors."""
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop_at = time.monotonic() + duration
+
+        async def worker(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            header = headers[seed % len(headers)]
+            while time.monotonic() < stop_at:
+                roll = rng.random()
+                if roll < 0.6:
+                    request = client.get("/rides/search", params={"limit": 20}, headers=header)
+                elif roll < 0.9:
+                    request = client.get(f"/rides/{rng.choice(ride_ids)}", headers=header)
+                else:
+                    request = client.post(f"/rides/{rng.choice(ride_ids)}/book", headers=header)
+                start = time.perf_counter()
+                response = await request
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def run_mode(mode: str, port: int, headers, ride_ids, concurrency: int, duration: float, workers: int):
+    env = dict(os.environ, DB_ASYNC="true" if mode == "async" else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        start = time.perf_counter()
+        latencies, errors = asyncio.run(drive(base_url, headers, ride_ids, concurrency, duration))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": p99 * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--rides", type=int, default=50_000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", default="async,sync")
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        # About one booking per ten rides, so the booking share of the mix mostly finds seats
+        generate_synthetic(db, args.users, args.rides, occupancy=0.03)
+        make_id = synthetic_ids(341)
+        ride_ids = [make_id("ride", i) for i in range(args.rides)]
+        users = db.query(User).filter(User.user_id.in_([make_id("user", i) for i in range(100)])).all()
+        headers = [auth_header(user) for user in users]
+    finally:
+        db.close()
+
+    results = [
+        run_mode(mode, args.port, headers, ride_ids, args.concurrency, args.duration, args.workers)
+        for mode in args.modes.split(",")
+    ]
+
+    print(f"\nconcurrency={args.concurrency} duration={args.duration}s workers={args.workers}")
+    print(f"{'mode':<8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'5xx':>6}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['requests']:>10}{r['rps']:>10.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Latency of location autocomplete and of ride search by location ID.
+
+Inserts --places canonical locations and --rides scheduled future rides
+between them (popularity skewed, as real pickup points are), then times:
+- autocomplete: the LocationIndex trie against the SQL a text-only schema
+  needs, a word-prefix LIKE over the ride text grouped and ranked by uses
+- search: the read model and the SQL path of /rides/search filtering by
+  origin_id against the same search by origin text
+Every ID search is checked against SQL and against the place's name.
+
+Usage:
+    cd backend
+    python -m benchmarks.locations --places 20000 --rides 300000 --queries 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import Response
+from sqlalchemy import func, insert, or_, select
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic, random_id
+from app.db import async_engine, async_writer_engine, get_db
+from app.locations import location_index, location_key
+from app.models import Location, Ride, Vehicle
+from app.pagination import PageParams
+from app.read_model import bookable_rides
+from app.routers.rides import _search_sql
+from app.time_window import TimeWindow
+
+WORDS = (
+    "north south east west upper lower old new lake park hill river station square "
+    "campus library tower city airport market garden bridge harbor village heights "
+    "court field center commons plaza quad hall museum stadium terminal mall"
+).split()
+
+
+def seed(db, places: int, rides: int, rng: random.Random) -> list[tuple[int, str]]:
+    generate_synthetic(db, users=2000, rides=0)
+    vehicles = db.execute(select(Vehicle.vehicle_id, Vehicle.owner_id)).all()
+    names = {}
+    while len(names) < places:
+        name = " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 3))) + f" {rng.randint(1, 999)}"
+        names.setdefault(location_key(name), name)
+    db.execute(insert(Location.__table__), [{"name": name, "key": key} for key, name in names.items()])
+    located = db.execute(select(Location.location_id, Location.name).order_by(Location.location_id)).all()
+    # Zipf-like popularity: a few places get most of the rides
+    weights = [1 / (rank + 1) for rank in range(len(located))]
+
+    now = datetime.now(timezone.utc)
+    for start in range(0, rides, 10_000):
+        rows = []
+        count = min(10_000, rides - start)
+        for origin, destination in zip(rng.choices(located, weights, k=count), rng.choices(located, weights, k=count)):
+            vehicle_id, driver_id = rng.choice(vehicles)
+            rows.append({
+                "ride_id": random_id(rng), "driver_id": driver_id, "vehicle_id": vehicle_id,
+                "origin_location": origin.name, "destination_location": destination.name,
+                "origin_location_id": origin.location_id, "destination_location_id": destination.location_id,
+                "departure_time": now + timedelta(minutes=rng.randint(60, 30 * 24 * 60)), "arrival_time": None,
+                "seats_available": rng.randint(1, 4), "price_per_seat": Decimal("5.00"), "status": "scheduled",
+            })
+        db.execute(insert(Ride.__table__), rows)
+    db.commit()
+    return [tuple(row) for row in located]
+
+
+def autocomplete_sql(prefix: str, limit: int):
+    """Word-prefix completion over ride text, ranked by uses: what it costs without the table."""
+    pattern = prefix.replace("%", "").replace("_", "")
+    return (
+        select(Ride.origin_location, func.count().label("rides"))
+        .where(or_(Ride.origin_location.ilike(f"{pattern}%"), Ride.origin_location.ilike(f"% {pattern}%")))
+        .group_by(Ride.origin_location)
+        .order_by(func.count().desc(), Ride.origin_location)
+        .limit(limit)
+    )
+
+
+def percentiles(timings: list[float]) -> str:
+    ms = sorted(t * 1000 for t in timings)
+    return f"{statistics.median(ms):8.2f}/{ms[int(len(ms) * 0.99) - 1]:8.2f}"
+
+
+async def run(args, prefixes, places):
+    await bookable_rides.reload()
+    await location_index.reload()
+    print(f"read model: {len(bookable_rides)} live rides; {len(location_index)} locations, "
+          f"{location_index.stats()['trie_nodes']} trie nodes")
+    window = TimeWindow(None, None, None, None, None)
+    page = PageParams(cursor=None, limit=args.limit)
+    complete = {"trie": [], "sql": []}
+    search = {"read model id": [], "read model text": [], "sql id": [], "sql text": []}
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        for prefix in prefixes:
+            start = time.perf_counter()
+            location_index.complete(prefix, args.limit)
+            complete["trie"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            (await db.execute(autocomplete_sql(prefix, args.limit))).all()
+            complete["sql"].append(time.perf_counter() - start)
+
+        for location_id, name in places:
+            start = time.perf_counter()
+            by_id = bookable_rides.search(None, None, None, None, args.limit, place_ids=(location_id, None))
+            search["read model id"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            by_text = bookable_rides.search(name, None, None, None, args.limit)
+            search["read model text"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            sql_id = await _search_sql(Response(), None, None, (location_id, None), None, "departure", window, page, db)
+            search["sql id"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            await _search_sql(Response(), name, None, (None, None), None, "departure", window, page, db)
+            search["sql text"].append(time.perf_counter() - start)
+            if [r.ride_id for r in by_id] != [r.ride_id for r in sql_id]:
+                raise SystemExit(f"FAIL: read model and SQL disagree on location {location_id}")
+            # Text search is a substring match, so it may also return longer names
+            if any(r.origin_location != name for r in by_id) or len(by_text) < len(by_id):
+                raise SystemExit(f"FAIL: ID search of {name!r} disagrees with the text search")
+    for async_pool in (async_engine, async_writer_engine):
+        if async_pool is not None:
+            await async_pool.dispose()
+    return complete, search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--places", type=int, default=20_000)
+    parser.add_argument("--rides", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=341)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    create_schema()
+    db = SessionLocal()
+    try:
+        print(f"seeding {args.places} locations and {args.rides} live rides ...")
+        located = seed(db, args.places, args.rides, rng)
+    finally:
+        db.close()
+
+    prefixes = [rng.choice(WORDS)[:rng.randint(1, 4)] for _ in range(args.queries)]
+    places = rng.sample(located[:1000], min(args.queries, len(located), 1000))
+    complete, search = asyncio.run(run(args, prefixes, places))
+    print(f"{'autocomplete':>16}  p50/p99 ms")
+    for name, timings in complete.items():
+        print(f"{name:>16}  {percentiles(timings)}")
+    print(f"{'search':>16}  p50/p99 ms")
+    for name, timings in search.items():
+        print(f"{name:>16}  {percentiles(timings)}")
+    print("OK: ID search matches between read model and SQL")
+
+
+if __name__ == "__main__":
+    main()
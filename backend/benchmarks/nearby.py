@@ -0,0 +1,157 @@
+"""
+Latency of /rides/nearby matching over a large live ride set.
+
+Inserts --rides scheduled future rides with origin and destination points
+clustered around hotspots of one metro area, then times random radius
+queries three ways: the read model's grid index, a brute-force haversine scan
+over every live ride (what the grid saves), and the SQL bounding-box path.
+Every grid result is checked against the brute-force one.
+
+Usage:
+    cd backend
+    python -m benchmarks.nearby --rides 300000 --queries 200 --radius 2 5 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import heapq
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic, random_id
+from app.db import async_engine, async_writer_engine, get_db
+from app.geo import haversine_km
+from app.models import Ride, Vehicle
+from app.read_model import bookable_rides
+from app.routers.rides import _nearby_sql
+
+CENTER = (41.5045, -81.6086)
+
+
+def seed(db, rides: int, rng: random.Random):
+    generate_synthetic(db, users=2000, rides=0)
+    vehicles = db.execute(select(Vehicle.vehicle_id, Vehicle.owner_id)).all()
+    hotspots = [
+        (CENTER[0] + rng.uniform(-0.3, 0.3), CENTER[1] + rng.uniform(-0.4, 0.4)) for _ in range(25)
+    ]
+
+    def point():
+        if rng.random() < 0.2:
+            # Background scatter over the whole area
+            return CENTER[0] + rng.uniform(-0.5, 0.5), CENTER[1] + rng.uniform(-0.7, 0.7)
+        lat, lon = rng.choice(hotspots)
+        return lat + rng.gauss(0, 0.02), lon + rng.gauss(0, 0.03)
+
+    now = datetime.now(timezone.utc)
+    for start in range(0, rides, 10_000):
+        rows = []
+        for _ in range(min(10_000, rides - start)):
+            vehicle_id, driver_id = rng.choice(vehicles)
+            departure = now + timedelta(minutes=rng.randint(60, 30 * 24 * 60))
+            (origin_lat, origin_lon), (destination_lat, destination_lon) = point(), point()
+            rows.append({
+                "ride_id": random_id(rng), "driver_id": driver_id,
+                "vehicle_id": vehicle_id, "origin_location": "Somewhere", "destination_location": "Elsewhere",
+                "departure_time": departure, "arrival_time": None, "seats_available": rng.randint(1, 4),
+                "price_per_seat": Decimal("5.00"), "status": "scheduled",
+                "origin_lat": origin_lat, "origin_lon": origin_lon,
+                "destination_lat": destination_lat, "destination_lon": destination_lon,
+            })
+        db.execute(insert(Ride.__table__), rows)
+    db.commit()
+    return hotspots
+
+
+def brute_force(origin, destination, limit):
+    matches = []
+    for record in bookable_rides.records():
+        origin_distance = haversine_km(origin[0], origin[1], record.origin_lat, record.origin_lon)
+        if origin_distance > origin[2]:
+            continue
+        destination_distance = None
+        if destination is not None:
+            destination_distance = haversine_km(
+                destination[0], destination[1], record.destination_lat, record.destination_lon
+            )
+            if destination_distance > destination[2]:
+                continue
+        matches.append((record, origin_distance, destination_distance))
+    return heapq.nsmallest(limit, matches, key=lambda m: (m[1] + (m[2] or 0), m[0].sort_key))
+
+
+async def run(args, queries):
+    await bookable_rides.reload()
+    print(f"read model: {len(bookable_rides)} live rides")
+    results = {}
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        for radius in args.radius:
+            timings = {"grid": [], "scan": [], "sql": []}
+            found = []
+            for origin, destination in queries:
+                origin = (*origin, radius)
+                destination = destination and (*destination, radius)
+                start = time.perf_counter()
+                grid = bookable_rides.nearby(origin, destination, args.limit)
+                timings["grid"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                scan = brute_force(origin, destination, args.limit)
+                timings["scan"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                await _nearby_sql(origin, destination, args.limit, db)
+                timings["sql"].append(time.perf_counter() - start)
+                if [m[0].ride_id for m in grid] != [m[0].ride_id for m in scan]:
+                    raise SystemExit(f"FAIL: grid and scan disagree for {origin} {destination}")
+                found.append(len(grid))
+            results[radius] = (timings, statistics.mean(found))
+    for async_pool in (async_engine, async_writer_engine):
+        if async_pool is not None:
+            await async_pool.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rides", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=341)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    create_schema()
+    db = SessionLocal()
+    try:
+        print(f"seeding {args.rides} live rides ...")
+        hotspots = seed(db, args.rides, rng)
+    finally:
+        db.close()
+
+    def near(spot):
+        return spot[0] + rng.gauss(0, 0.01), spot[1] + rng.gauss(0, 0.015)
+
+    # Half origin-only queries, half origin + destination
+    queries = [
+        (near(rng.choice(hotspots)), near(rng.choice(hotspots)) if i % 2 else None)
+        for i in range(args.queries)
+    ]
+    results = asyncio.run(run(args, queries))
+    print(f"{'radius km':>9} {'matches':>8}  {'grid p50/p99 ms':>17}  {'scan p50/p99 ms':>17}  {'sql p50/p99 ms':>17}")
+    for radius, (timings, found) in results.items():
+        cells = []
+        for name in ("grid", "scan", "sql"):
+            ms = sorted(t * 1000 for t in timings[name])
+            cells.append(f"{statistics.median(ms):8.2f}/{ms[int(len(ms) * 0.99) - 1]:8.2f}")
+        print(f"{radius:>9} {found:>8.1f}  " + "  ".join(cells))
+    print("OK: grid results match the brute-force scan")
+
+
+if __name__ == "__main__":
+    main()
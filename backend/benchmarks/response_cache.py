@@ -0,0 +1,128 @@
+"""
+Hit ratio and latency of the ride response cache.
+
+Seeds a synthetic dataset, then replays the same skewed read-heavy workload
+(popular searches and ride pages, a share of clients revalidating with
+If-None-Match, and a trickle of bookings) with the cache disabled and enabled.
+
+Usage:
+    cd backend
+    python -m benchmarks.response_cache --requests 5000 --write-ratio 0.02
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, generate_synthetic, synthetic_ids
+from app.main import app
+from app.models import Ride
+from app.response_cache import response_cache
+
+PLACES = ["Campus Library", "Student Center", "Airport", "Downtown Mall", "Train Station", "Gym"]
+
+
+def build_workload(rng: random.Random, ride_ids, readers, writers, count: int, write_ratio: float):
+    """
+    A list of (method, url, headers, revalidate) with Zipf-like popularity.
+    Bookings are made by `writers`, so separate runs can use fresh passengers.
+    """
+    today = datetime.now(timezone.utc).date()
+    searches = [f"/rides/search?origin={o}" for o in PLACES]
+    searches += [f"/rides/search?date={today + timedelta(days=d)}" for d in range(1, 8)]
+    searches += ["/rides/search", "/rides/search?sort=relevance&destination=Airport"]
+    weights = [1 / (rank + 1) for rank in range(len(searches))]
+    ride_weights = [1 / (rank + 1) for rank in range(len(ride_ids))]
+
+    workload = []
+    for _ in range(count):
+        headers = rng.choice(readers)
+        roll = rng.random()
+        if roll < write_ratio:
+            ride_id = rng.choices(ride_ids, ride_weights)[0]
+            workload.append(("POST", f"/rides/{ride_id}/book", rng.choice(writers), False))
+        elif roll < 0.6:
+            workload.append(("GET", rng.choices(searches, weights)[0], headers, rng.random() < 0.3))
+        else:
+            ride_id = rng.choices(ride_ids, ride_weights)[0]
+            workload.append(("GET", f"/rides/{ride_id}", headers, rng.random() < 0.3))
+    return workload
+
+
+def replay(client: TestClient, workload) -> tuple[list[float], Counter]:
+    etags: dict[str, str] = {}
+    latencies, codes = [], Counter()
+    for method, url, headers, revalidate in workload:
+        if revalidate and url in etags:
+            headers = {**headers, "If-None-Match": etags[url]}
+        start = time.perf_counter()
+        response = client.request(method, url, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        codes[response.status_code] += 1
+        if method == "GET":
+            latencies.append(elapsed)
+            if "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+    return latencies, codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--rides", type=int, default=50_000)
+    parser.add_argument("--occupancy", type=float, default=0.3, help="chance each seat is booked")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--write-ratio", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=341)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        generate_synthetic(db, args.users, args.rides, occupancy=args.occupancy, seed=args.seed)
+        ride_ids = db.scalars(
+            Ride.__table__.select()
+            .with_only_columns(Ride.ride_id)
+            .where(Ride.status == "scheduled", Ride.departure_time >= datetime.now(timezone.utc))
+            .order_by(Ride.ride_id)
+            .limit(2_000)
+        ).all()
+    finally:
+        db.close()
+    user_id = synthetic_ids(args.seed)
+    user_headers = [auth_header(SimpleNamespace(user_id=user_id("user", i))) for i in range(1_000)]
+    writer_pools = {"no cache": user_headers[:500], "cache": user_headers[500:]}
+
+    maxsize = response_cache.maxsize
+    results = {}
+    with TestClient(app) as client:
+        for label, size in (("no cache", 0), ("cache", maxsize)):
+            workload = build_workload(
+                random.Random(args.seed), ride_ids, user_headers, writer_pools[label],
+                args.requests, args.write_ratio,
+            )
+            response_cache.clear()
+            response_cache.maxsize = size
+            response_cache.hits = response_cache.misses = 0
+            start = time.perf_counter()
+            latencies, codes = replay(client, workload)
+            elapsed = time.perf_counter() - start
+            results[label] = (len(workload), latencies, codes, elapsed, response_cache.stats())
+
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'hit ratio':>11}  status codes")
+    for label, (total, latencies, codes, elapsed, stats) in results.items():
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(
+            f"{label:<10}{total / elapsed:>10.0f}{statistics.median(latencies):>10.2f}"
+            f"{p99:>10.2f}{stats['hit_ratio']:>11.1%}  {dict(sorted(codes.items()))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cost of idle /rides/events subscribers and of fanning out updates.
+
+Opens N subscriptions through RideEventHub.stream (the generator the endpoint
+serves, minus the HTTP connection), spread over --rides watched rides with a
+share subscribing by search filter, and reports memory per idle subscriber,
+publish latency and end-to-end delivery time for a burst of updates (which
+includes the RIDE_EVENTS_COALESCE_SECONDS pause).
+
+Usage:
+    cd backend
+    python -m benchmarks.ride_events --subscribers 1000 10000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.ride_events import RideEventHub
+
+
+def ride(ride_id: uuid.UUID, origin: str, seats: int) -> dict:
+    return {
+        "ride_id": ride_id, "driver_id": ride_id, "vehicle_id": ride_id,
+        "origin_location": origin, "destination_location": "Airport",
+        "departure_time": datetime(2031, 1, 1, 9, tzinfo=timezone.utc), "arrival_time": None,
+        "price_per_seat": "5.00", "seats_available": seats, "status": "scheduled",
+    }
+
+
+async def consume(stream, received: list):
+    async for chunk in stream:
+        if chunk.startswith(b"event: ride"):
+            received[0] += 1
+
+
+async def run(subscribers: int, rides: int, filtered: float, burst: int) -> dict:
+    hub = RideEventHub()
+    ride_ids = [uuid.uuid4() for _ in range(rides)]
+    # One ride in ten matches the filter subscriptions
+    origins = ["Campus Library" if i % 10 == 0 else "Downtown" for i in range(rides)]
+    received = [0]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tasks = []
+    for i in range(subscribers):
+        if i < subscribers * filtered:
+            stream = hub.stream(origin="campus", day=datetime(2031, 1, 1).date())
+        else:
+            stream = hub.stream(ride_ids=[ride_ids[i % rides]])
+        tasks.append(asyncio.create_task(consume(stream, received)))
+    await asyncio.sleep(0.1)  # let every stream park on its wakeup event
+    idle, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # A burst of bookings on every watched ride; each subscriber should see one event per ride
+    start = time.perf_counter()
+    for seats in range(burst, 0, -1):
+        for ride_id, origin in zip(ride_ids, origins):
+            hub.publish(ride(ride_id, origin, seats))
+    publish_s = time.perf_counter() - start
+    by_filter = sum(1 for i in range(subscribers) if i < subscribers * filtered)
+    expected = subscribers - by_filter + by_filter * origins.count("Campus Library")
+    while received[0] < expected:
+        await asyncio.sleep(0.01)
+    delivered_s = time.perf_counter() - start
+
+    hub.close()
+    await asyncio.gather(*tasks)
+    return {
+        "kib_per_subscriber": (idle - before) / subscribers / 1024,
+        "publish_us": publish_s / (burst * rides) * 1e6,
+        "fanned_out": hub.fanned_out,
+        "events_sent": received[0],
+        "delivered_ms": delivered_s * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--rides", type=int, default=100, help="distinct rides watched by ID")
+    parser.add_argument("--filtered", type=float, default=0.1, help="share of subscribers using a search filter")
+    parser.add_argument("--burst", type=int, default=5, help="updates per ride in the burst")
+    args = parser.parse_args()
+    settings.RIDE_EVENTS_HEARTBEAT_SECONDS = 3600
+
+    print(f"{'subs':>8}{'KiB/sub':>9}{'publish us':>12}{'fanned out':>12}{'events sent':>13}{'delivered ms':>14}")
+    for subscribers in args.subscribers:
+        result = asyncio.run(run(subscribers, args.rides, args.filtered, args.burst))
+        print(
+            f"{subscribers:>8}{result['kib_per_subscriber']:>9.2f}{result['publish_us']:>12.1f}"
+            f"{result['fanned_out']:>12}{result['events_sent']:>13}{result['delivered_ms']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
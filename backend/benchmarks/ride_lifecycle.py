@@ -0,0 +1,104 @@
+"""
+Throughput of the ride lifecycle job on a backlog of finished rides.
+
+Seeds the usual synthetic dataset, then turns every past ride back to
+'scheduled' (and some of their bookings to 'pending'), as if the job had
+never run. Runs complete_departed() once per --batch size on a fresh copy of
+that backlog and reports rows/s, per-batch timings, and the size of the
+scheduled working set before and after.
+
+Usage:
+    cd backend
+    python -m benchmarks.ride_lifecycle --rides 200000 --occupancy 0.3 --batch 500 1000 5000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic
+from app.db import async_engine, async_writer_engine
+from app.lifecycle import complete_departed, finished
+from app.models import Booking, Ride
+
+
+def reset_backlog(db, now: datetime) -> tuple[int, int]:
+    """Put every past non-cancelled ride back to 'scheduled'; returns (scheduled, finished)."""
+    db.execute(
+        update(Ride)
+        .where(Ride.departure_time < now, Ride.status == "completed")
+        .values(status="scheduled")
+        .execution_options(synchronize_session=False)
+    )
+    past = select(Ride.ride_id).where(Ride.departure_time < now, Ride.status == "scheduled")
+    # Every tenth booking on those rides is waiting for a seat that never comes
+    db.execute(
+        update(Booking)
+        .where(Booking.ride_id.in_(past), Booking.status == "cancelled")
+        .values(status="pending")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return scheduled_counts(db, now)
+
+
+def scheduled_counts(db, now: datetime) -> tuple[int, int]:
+    total = db.scalar(select(func.count()).select_from(Ride).where(Ride.status == "scheduled"))
+    over = db.scalar(select(func.count()).select_from(Ride).where(finished(now)))
+    return total, over
+
+
+async def run(batch: int, now: datetime) -> dict:
+    try:
+        return await complete_departed(now=now, batch=batch)
+    finally:
+        for async_pool in (async_engine, async_writer_engine):
+            if async_pool is not None:
+                await async_pool.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--rides", type=int, default=200_000)
+    parser.add_argument("--occupancy", type=float, default=0.3, help="chance each seat is booked")
+    parser.add_argument("--batch", type=int, nargs="+", default=[500, 1000, 5000])
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        print(f"seeding {args.rides} rides, occupancy {args.occupancy} ...")
+        generate_synthetic(db, args.users, args.rides, occupancy=args.occupancy)
+        # A tenth of the bookings start out cancelled, to become pending below
+        booking_ids = db.scalars(select(Booking.booking_id).order_by(Booking.booking_id)).all()
+        for i in range(0, len(booking_ids), 100_000):
+            db.execute(
+                update(Booking)
+                .where(Booking.booking_id.in_(booking_ids[i : i + 100_000 : 10]))
+                .values(status="cancelled")
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        print(f"{'batch':>6} {'rows':>8} {'waitlist':>8} {'batches':>7} {'rows/s':>9} "
+              f"{'avg ms':>8} {'max ms':>8}  scheduled before -> after")
+        for batch in args.batch:
+            now = datetime.now(timezone.utc)
+            before, past = reset_backlog(db, now)
+            result = asyncio.run(run(batch, now))
+            after, left = scheduled_counts(db, now)
+            if left:
+                raise SystemExit(f"FAIL: {left} finished rides still scheduled")
+            rate = result["completed"] / result["seconds"] if result["seconds"] else 0
+            print(f"{batch:>6} {result['completed']:>8} {result['waitlist_cancelled']:>8} "
+                  f"{result['batches']:>7} {rate:>9.0f} {result['batch_ms_avg']:>8.2f} "
+                  f"{result['batch_ms_max']:>8.2f}  {before} -> {after} ({past} finished)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Cost of a semester of commutes: one ride at a time versus /rides/series.
+
+Creates --weeks of weekday rides for one driver, first with a POST /rides
+per occurrence, then with a single POST /rides/series, and changes and
+cancels them per ride (PATCH/DELETE /rides/{id}) and per series. Reports
+wall time, requests and SQL statements (from the Server-Timing header) for
+each, and checks both ways produced the same rides.
+
+Usage:
+    cd backend
+    python -m benchmarks.ride_series --weeks 15 --repeat 5
+"""
+
+import argparse
+import re
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_schema, create_users
+from app.main import app
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def call(client: TestClient, method: str, url: str, headers: dict, body=None, expected: int = 200):
+    response = client.request(method, url, json=body, headers=headers)
+    if response.status_code != expected:
+        raise SystemExit(f"FAIL: {method} {url} returned {response.status_code}: {response.text}")
+    match = QUERIES.search(response.headers.get("server-timing", ""))
+    return response, int(match.group(1)) if match else 0
+
+
+def run(client: TestClient, header: dict, vehicle_id: str, first: date, weeks: int) -> dict:
+    """Both ways once; returns {step: (seconds, requests, statements)}."""
+    until = first + timedelta(weeks=weeks) - timedelta(days=1)
+    departure = datetime.combine(first, datetime.min.time(), tzinfo=timezone.utc).replace(hour=8)
+    ride = {
+        "vehicle_id": vehicle_id, "origin_location": "Case Quad", "destination_location": "Tower City",
+        "seats_available": 3, "price_per_seat": "4.00",
+    }
+    days = [
+        first + timedelta(days=offset)
+        for offset in range((until - first).days + 1)
+        if (first + timedelta(days=offset)).weekday() < 5
+    ]
+    results = {}
+
+    def timed(name, requests):
+        start, statements, responses = time.perf_counter(), 0, []
+        for request in requests:
+            response, count = call(client, *request)
+            responses.append(response)
+            statements += count
+        results[name] = (time.perf_counter() - start, len(responses), statements)
+        return responses
+
+    singles = timed("create one by one", [
+        ("POST", "/rides", header, {
+            **ride, "departure_time": (departure + timedelta(days=(day - first).days)).isoformat(),
+        }, 201)
+        for day in days
+    ])
+    ride_ids = [response.json()["ride_id"] for response in singles]
+    series = timed("create series", [
+        ("POST", "/rides/series", header, {
+            **ride, "departure_time": departure.isoformat(), "until": until.isoformat(),
+        }, 201)
+    ])[0].json()
+    if [r["departure_time"] for r in series["rides"]] != [r.json()["departure_time"] for r in singles]:
+        raise SystemExit("FAIL: the series and the single rides depart at different times")
+
+    change = {"destination_location": "Cleveland Hopkins Airport", "price_per_seat": "4.50"}
+    timed("update one by one", [("PATCH", f"/rides/{ride_id}", header, change) for ride_id in ride_ids])
+    timed("update series", [("PATCH", f"/rides/series/{series['series_id']}", header, change)])
+    timed("cancel one by one", [("DELETE", f"/rides/{ride_id}", header, None, 204) for ride_id in ride_ids])
+    timed("cancel series", [("DELETE", f"/rides/series/{series['series_id']}", header, None, 204)])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--weeks", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver = create_users(db, 1, prefix="series")[0]
+        header = auth_header(driver)
+        db.commit()
+    finally:
+        db.close()
+
+    runs = []
+    with TestClient(app) as client:
+        vehicle_id, _ = call(client, "POST", "/vehicles", header, {
+            "make": "Bench", "model": "Mark", "license_plate": "SERIES-1", "seats_total": 4,
+        }, 201)
+        vehicle_id = vehicle_id.json()["vehicle_id"]
+        for i in range(args.repeat):
+            # A fresh Monday each run, so every run creates new rides
+            first = date(2031, 1, 6) + timedelta(weeks=(args.weeks + 1) * i)
+            runs.append(run(client, header, vehicle_id, first, args.weeks))
+
+    rides = runs[0]["create one by one"][1]
+    print(f"{rides} weekday rides over {args.weeks} weeks, median of {args.repeat} runs")
+    print(f"{'step':<20}{'ms':>10}{'requests':>10}{'statements':>12}")
+    for name in runs[0]:
+        ms = statistics.median(result[name][0] * 1000 for result in runs)
+        _, requests, statements = runs[0][name]
+        print(f"{name:<20}{ms:>10.1f}{requests:>10}{statements:>12}")
+
+
+if __name__ == "__main__":
+    main()
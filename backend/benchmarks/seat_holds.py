@@ -0,0 +1,115 @@
+"""
+Flash demand on one ride: direct booking vs. two-phase hold + confirm.
+
+N passengers hit a ride with S seats at once. The "book" flow is a plain
+POST /rides/{id}/book (waitlist off). The "hold" flow takes a hold, then the
+winners confirm it, except an --abandon share that walks away and whose holds
+the sweeper releases. Reports latency of the contended call and of the
+confirms (which never touch the ride row), and checks that
+seats offered == confirmed + unreleased holds + seats_available throughout.
+
+Usage:
+    cd backend
+    python -m benchmarks.seat_holds --passengers 300 --seats 20 --abandon 0.25
+"""
+
+import argparse
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_ride, create_schema, create_users
+from app import holds
+from app.config import settings
+from app.main import app
+from app.models import Booking, Ride, SeatHold
+
+
+def accounting(ride_id) -> tuple[int, int, int]:
+    """(confirmed bookings, unreleased holds, seats_available) for the ride."""
+    db = SessionLocal()
+    try:
+        confirmed = db.query(Booking).filter(Booking.ride_id == ride_id, Booking.status == "confirmed").count()
+        held = db.query(SeatHold).filter(SeatHold.ride_id == ride_id).count()
+        free = db.query(Ride.seats_available).filter(Ride.ride_id == ride_id).scalar()
+    finally:
+        db.close()
+    return confirmed, held, free
+
+
+def check(label: str, ride_id, seats: int):
+    confirmed, held, free = accounting(ride_id)
+    print(f"  {label}: confirmed={confirmed} held={held} free={free}")
+    if confirmed + held + free != seats:
+        raise SystemExit(f"FAIL: {confirmed} + {held} + {free} != {seats} seats")
+
+
+def timed(client: TestClient, method: str, url: str, header) -> tuple[float, int, dict]:
+    start = time.perf_counter()
+    response = client.request(method, url, headers=header)
+    return (time.perf_counter() - start) * 1000, response.status_code, response.json()
+
+
+def summary(name: str, results) -> None:
+    latencies = sorted(ms for ms, _, _ in results)
+    codes = Counter(code for _, code, _ in results)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:<8} n={len(latencies):<5} p50={statistics.median(latencies):7.2f} ms  "
+          f"p99={p99:7.2f} ms  codes={dict(sorted(codes.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passengers", type=int, default=300)
+    parser.add_argument("--seats", type=int, default=20)
+    parser.add_argument("--abandon", type=float, default=0.25, help="share of hold winners that never confirm")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver, *riders = create_users(db, args.passengers + 1)
+        book_ride = create_ride(db, driver, args.seats, plate="BOOK-1")
+        hold_ride = create_ride(db, driver, args.seats, plate="HOLD-1")
+        book_id, hold_id = book_ride.ride_id, hold_ride.ride_id
+        headers = [auth_header(rider) for rider in riders]
+        db.commit()
+    finally:
+        db.close()
+
+    with TestClient(app) as client, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        print("book flow")
+        results = list(pool.map(
+            lambda header: timed(client, "POST", f"/rides/{book_id}/book?waitlist=false", header), headers
+        ))
+        summary("book", results)
+        check("after booking", book_id, args.seats)
+
+        print("hold flow")
+        results = list(pool.map(lambda header: timed(client, "POST", f"/rides/{hold_id}/hold", header), headers))
+        summary("hold", results)
+        check("after holds", hold_id, args.seats)
+
+        winners = [(header, body["hold_id"]) for header, (_, code, body) in zip(headers, results) if code == 201]
+        keep = winners[: round(len(winners) * (1 - args.abandon))]
+        results = list(pool.map(
+            lambda winner: timed(client, "POST", f"/holds/{winner[1]}/confirm", winner[0]), keep
+        ))
+        summary("confirm", results)
+        check("after confirms", hold_id, args.seats)
+
+        later = datetime.now(timezone.utc) + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS + 1)
+        swept = client.portal.call(holds.sweep_expired, later)
+        print(f"  sweep: {swept}")
+        check("after sweep", hold_id, args.seats)
+
+    print("OK: seats conserved across holds, confirms and the sweep")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Serialization time and peak memory for large ride lists.
+
+Compares the default FastAPI path (ORM objects validated into RideRead with
+from_attributes, then encoded) with the fast path (Core rows of just the
+schema's columns, encoded by RowEncoder), checking the bytes are identical.
+
+Usage:
+    cd backend
+    python -m benchmarks.serialization --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic
+from app.models import Ride
+from app.schemas.ride import RideRead
+from app.serialization import RowEncoder
+
+ride_list = TypeAdapter(list[RideRead])
+encoder = RowEncoder(RideRead)
+
+
+def orm_path(db, limit: int) -> bytes:
+    """What FastAPI does with a response_model and ORM objects."""
+    rides = db.scalars(select(Ride).order_by(Ride.departure_time, Ride.ride_id).limit(limit)).all()
+    content = ride_list.dump_python(ride_list.validate_python(rides, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast_path(db, limit: int) -> bytes:
+    rows = db.execute(
+        select(*encoder.columns(Ride)).order_by(Ride.departure_time, Ride.ride_id).limit(limit)
+    ).all()
+    return encoder.encode(rows)
+
+
+def measure(path, limit: int, repeat: int) -> tuple[float, float, bytes]:
+    """Best wall time (ms) and peak traced memory (MiB) of one query + encode."""
+    best = float("inf")
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            body = path(db, limit)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        path(db, limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return best, peak / 2**20, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        generate_synthetic(db, users=1_000, rides=max(args.sizes), occupancy=0)
+    finally:
+        db.close()
+
+    print(f"{'rides':>8}{'orm ms':>10}{'fast ms':>10}{'speedup':>9}{'orm MiB':>10}{'fast MiB':>10}  identical")
+    for size in args.sizes:
+        orm_ms, orm_mib, orm_body = measure(orm_path, size, args.repeat)
+        fast_ms, fast_mib, fast_body = measure(fast_path, size, args.repeat)
+        print(
+            f"{size:>8}{orm_ms:>10.1f}{fast_ms:>10.1f}{orm_ms / fast_ms:>8.1f}x"
+            f"{orm_mib:>10.1f}{fast_mib:>10.1f}  {orm_body == fast_body}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Latency of /rides/search time windows over a large live ride set.
+
+Inserts --rides scheduled future rides spread over 30 days, most with an
+arrival_time 15 minutes to 3 hours after departure, then times random
+windows of each kind against the read model's interval index and the SQL
+range filters of the same search (what search_rides runs with
+READ_MODEL=false). Every read-model page is checked against the SQL one.
+
+Usage:
+    cd backend
+    python -m benchmarks.time_windows --rides 300000 --queries 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import Response
+from sqlalchemy import insert, select
+
+from benchmarks.common import SessionLocal, create_schema, generate_synthetic, random_id
+from app.db import async_engine, async_writer_engine, get_db
+from app.models import Ride, Vehicle
+from app.pagination import PageParams
+from app.read_model import bookable_rides
+from app.routers.rides import _search_sql
+from app.time_window import TimeWindow
+
+DAYS = 30
+
+
+def seed(db, rides: int, rng: random.Random, start: datetime):
+    generate_synthetic(db, users=2000, rides=0)
+    vehicles = db.execute(select(Vehicle.vehicle_id, Vehicle.owner_id)).all()
+    for offset in range(0, rides, 10_000):
+        rows = []
+        for _ in range(min(10_000, rides - offset)):
+            vehicle_id, driver_id = rng.choice(vehicles)
+            departure = start + timedelta(minutes=rng.randint(0, DAYS * 24 * 60))
+            arrival = None
+            if rng.random() < 0.8:
+                arrival = departure + timedelta(minutes=rng.randint(15, 180))
+            rows.append({
+                "ride_id": random_id(rng), "driver_id": driver_id,
+                "vehicle_id": vehicle_id, "origin_location": "Somewhere", "destination_location": "Elsewhere",
+                "departure_time": departure, "arrival_time": arrival, "seats_available": rng.randint(1, 4),
+                "price_per_seat": Decimal("5.00"), "status": "scheduled",
+            })
+        db.execute(insert(Ride.__table__), rows)
+    db.commit()
+
+
+def windows(rng: random.Random, start: datetime, count: int) -> dict[str, list[TimeWindow]]:
+    """`count` random windows of each kind; TimeWindow takes the four bounds, then flex_minutes."""
+    def at():
+        return start + timedelta(days=1, minutes=rng.randint(0, (DAYS - 2) * 24 * 60))
+
+    kinds = {
+        "departure 45 min": lambda t: TimeWindow(t, t + timedelta(minutes=45), None, None, None),
+        "arrive before": lambda t: TimeWindow(None, None, None, t, None),
+        "arrival 15 min": lambda t: TimeWindow(None, None, t, t + timedelta(minutes=15), None),
+        "contained 2 h": lambda t: TimeWindow(t, None, None, t + timedelta(hours=2), None),
+        "overlap 30 min": lambda t: TimeWindow(None, t + timedelta(minutes=30), t, None, None),
+        "flexible 30 min": lambda t: TimeWindow(t, t + timedelta(minutes=15), None, None, 30),
+    }
+    return {name: [make(at()) for _ in range(count)] for name, make in kinds.items()}
+
+
+async def run(args, queries):
+    await bookable_rides.reload()
+    print(f"read model: {len(bookable_rides)} live rides, longest {bookable_rides.stats()['longest_ride']:.0f} s")
+    page = PageParams(cursor=None, limit=args.limit)
+    results = {}
+    async with contextlib.aclosing(get_db()) as sessions:
+        db = await anext(sessions)
+        for name, kind in queries.items():
+            timings = {"read model": [], "sql": []}
+            for window in kind:
+                start = time.perf_counter()
+                fast = bookable_rides.search(None, None, None, None, args.limit, window=window)
+                timings["read model"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                slow = await _search_sql(Response(), None, None, (None, None), None, "departure", window, page, db)
+                timings["sql"].append(time.perf_counter() - start)
+                if [r.ride_id for r in fast] != [r.ride_id for r in slow]:
+                    raise SystemExit(f"FAIL: read model and SQL disagree on {name} {window.key()}")
+            results[name] = timings
+    for async_pool in (async_engine, async_writer_engine):
+        if async_pool is not None:
+            await async_pool.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rides", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=341)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) + timedelta(hours=1)
+    create_schema()
+    db = SessionLocal()
+    try:
+        print(f"seeding {args.rides} live rides ...")
+        seed(db, args.rides, rng, start)
+    finally:
+        db.close()
+
+    results = asyncio.run(run(args, windows(rng, start, args.queries)))
+    print(f"{'window':>16}  {'read model p50/p99 ms':>21}  {'sql p50/p99 ms':>17}")
+    for name, timings in results.items():
+        cells = []
+        for kind in ("read model", "sql"):
+            ms = sorted(t * 1000 for t in timings[kind])
+            cells.append(f"{statistics.median(ms):10.2f}/{ms[int(len(ms) * 0.99) - 1]:10.2f}")
+        print(f"{name:>16}  " + "  ".join(cells))
+    print("OK: read model results match SQL")
+
+
+if __name__ == "__main__":
+    main()
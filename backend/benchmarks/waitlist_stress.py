@@ -0,0 +1,139 @@
+"""
+Stress test for the booking waitlist.
+
+Fills a ride with S seats, then runs rounds that interleave, in parallel,
+waitlist joins from new passengers with cancellations of random existing
+bookings (confirmed and pending), and finally has the driver add seats. After
+every round it checks:
+  - seat conservation: confirmed bookings + seats_available == seats offered
+  - no idle seat while anyone waits: seats_available == 0 or no pending booking
+  - FIFO: every confirmed booking is older, by (booking_time, booking_id), than
+    every pending one
+  - each join got 201 (seat) or 202 (waitlisted) and each cancellation 204
+
+Usage:
+    cd backend
+    python -m benchmarks.waitlist_stress --seats 10 --rounds 20 --joins 15 --cancels 10
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import SessionLocal, auth_header, create_ride, create_schema, create_users
+from app.main import app
+from app.models import Booking, Ride
+
+
+def check(ride_id, offered: int) -> dict:
+    """Verify the invariants from the database; return the booking counts."""
+    db = SessionLocal()
+    try:
+        seats_available = db.query(Ride.seats_available).filter(Ride.ride_id == ride_id).scalar()
+        bookings = (
+            db.query(Booking.status, Booking.booking_time, Booking.booking_id)
+            .filter(Booking.ride_id == ride_id)
+            .all()
+        )
+    finally:
+        db.close()
+    confirmed = [(b.booking_time, b.booking_id) for b in bookings if b.status == "confirmed"]
+    pending = [(b.booking_time, b.booking_id) for b in bookings if b.status == "pending"]
+
+    if len(confirmed) + seats_available != offered:
+        raise SystemExit(f"FAIL: {len(confirmed)} confirmed + {seats_available} free != {offered} seats")
+    if seats_available > 0 and pending:
+        raise SystemExit(f"FAIL: {seats_available} seats free while {len(pending)} passengers wait")
+    if confirmed and pending and max(confirmed) > min(pending):
+        raise SystemExit("FAIL: a pending booking is older than a confirmed one")
+    return {"confirmed": len(confirmed), "pending": len(pending), "free": seats_available}
+
+
+def run(seats: int, rounds: int, joins: int, cancels: int, add_seats: int, workers: int, seed: int):
+    rng = random.Random(seed)
+    passengers = seats + rounds * joins
+    create_schema()
+    db = SessionLocal()
+    try:
+        driver, *riders = create_users(db, passengers + 1)
+        ride = create_ride(db, driver, seats)
+        # Room for the driver's extra seats at the end
+        ride.vehicle.seats_total = seats + add_seats
+        ride_id = ride.ride_id
+        driver_header = auth_header(driver)
+        headers = [auth_header(rider) for rider in riders]
+        db.commit()
+    finally:
+        db.close()
+
+    codes = Counter()
+    active: dict = {}  # booking_id -> passenger header
+    offered = seats
+    with TestClient(app) as client:
+
+        def join(header):
+            response = client.post(f"/rides/{ride_id}/book", headers=header)
+            return "join", response.status_code, response.json().get("booking_id"), header
+
+        def cancel(booking_id):
+            response = client.delete(f"/bookings/{booking_id}", headers=active[booking_id])
+            return "cancel", response.status_code, booking_id, None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _, code, booking_id, header in pool.map(join, headers[:seats]):
+                codes["join", code] += 1
+                active[booking_id] = header
+            print("filled:", check(ride_id, offered))
+
+            for round_ in range(rounds):
+                new = headers[seats + round_ * joins: seats + (round_ + 1) * joins]
+                leaving = rng.sample(sorted(active), min(cancels, len(active)))
+                ops = [(join, header) for header in new] + [(cancel, booking_id) for booking_id in leaving]
+                rng.shuffle(ops)
+                for kind, code, booking_id, header in pool.map(lambda op: op[0](op[1]), ops):
+                    codes[kind, code] += 1
+                    if kind == "join" and code in (201, 202):
+                        active[booking_id] = header
+                    elif kind == "cancel" and code == 204:
+                        del active[booking_id]
+                counts = check(ride_id, offered)
+                print(f"round {round_ + 1:>3}: {counts}")
+
+        if add_seats:
+            response = client.patch(f"/rides/{ride_id}", json={"add_seats": add_seats}, headers=driver_header)
+            codes["add_seats", response.status_code] += 1
+            offered += add_seats
+            print("add_seats:", check(ride_id, offered))
+        elapsed = time.perf_counter() - start
+
+    print(f"status codes: {dict(sorted(codes.items()))}")
+    print(f"elapsed: {elapsed:.3f}s, {sum(codes.values()) / elapsed:.1f} requests/s")
+    unexpected = {
+        key: count for key, count in codes.items()
+        if key not in {("join", 201), ("join", 202), ("cancel", 204), ("add_seats", 200)}
+    }
+    if unexpected:
+        raise SystemExit(f"FAIL: unexpected responses {unexpected}")
+    print("OK: seats conserved, waitlist promoted in FIFO order")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seats", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--joins", type=int, default=15, help="new passengers joining per round")
+    parser.add_argument("--cancels", type=int, default=10, help="existing bookings cancelled per round")
+    parser.add_argument("--add-seats", type=int, default=3, help="seats the driver adds at the end")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=341)
+    args = parser.parse_args()
+    run(args.seats, args.rounds, args.joins, args.cancels, args.add_seats, args.workers, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from datetime import datetime, timezone
 
 from app.db import SessionLocal
 from app.models import Booking, Ride, User, Vehicle
+from app.search import filter_locations
 
 
 def get_db():
@@ -86,11 +87,11 @@ def search_rides(db):
     now = datetime.now(timezone.utc)
     query = db.query(Ride).filter(Ride.status == "scheduled", Ride.departure_time >= now)
 
-    if origin:
-        query = query.filter(Ride.origin_location.ilike(f"%{origin}%"))
-    if destination:
-        query = query.filter(Ride.destination_location.ilike(f"%{destination}%"))
+    query, rank = filter_locations(query, origin, destination)
 
+    # Best matches first when the database has a text-search index
+    if rank is not None:
+        query = query.order_by(rank)
     rides = query.order_by(Ride.departure_time).all()
 
     if not rides:
@@ -1,4 +1,6 @@
 const API_BASE = "/api";
+// Page size used when following a list endpoint to its end (the API's PAGE_SIZE_MAX)
+const LIST_PAGE_SIZE = 200;
 
 export interface User {
   user_id: string;
@@ -32,6 +34,29 @@ export interface Ride {
   price_per_seat: string;
   seats_available: number;
   status: string;
+  origin_location_id?: number | null;
+  destination_location_id?: number | null;
+  origin_lat?: number | null;
+  origin_lon?: number | null;
+  destination_lat?: number | null;
+  destination_lon?: number | null;
+  series_id?: string | null;
+}
+
+export interface RideSeries {
+  series_id: string;
+  rides: Ride[];
+}
+
+export interface LocationSuggestion {
+  location_id: number;
+  name: string;
+  rides: number;
+}
+
+export interface NearbyRide extends Ride {
+  origin_distance_km: number | null;
+  destination_distance_km: number | null;
 }
 
 export interface Booking {
@@ -43,6 +68,32 @@ export interface Booking {
   ride?: Ride;
 }
 
+export type BatchMode = "all_or_nothing" | "best_effort";
+
+export interface BookingBatchItem {
+  ride_id: string | null;
+  booking_id: string | null;
+  status_code: number;
+  detail: string | null;
+  booking: Booking | null;
+}
+
+export interface BookingBatch {
+  mode: BatchMode;
+  applied: number;
+  results: BookingBatchItem[];
+}
+
+export interface Dashboard {
+  user: User;
+  rides: Ride[];
+  rides_next_cursor: string | null;
+  bookings: Booking[];
+  bookings_next_cursor: string | null;
+  vehicles: Vehicle[];
+  vehicles_next_cursor: string | null;
+}
+
 export interface LoginResponse {
   access_token: string;
   token_type: string;
@@ -82,10 +133,10 @@ export function setStoredUser(user: User): void {
   localStorage.setItem("user", JSON.stringify(user));
 }
 
-async function apiFetch<T>(
+async function apiResponse(
   endpoint: string,
   options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
   const token = getToken();
   const headers: HeadersInit = {
     "Content-Type": "application/json",
@@ -106,6 +157,15 @@ async function apiFetch<T>(
     throw new Error(errorData.detail || `HTTP ${response.status}`);
   }
 
+  return response;
+}
+
+async function apiFetch<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const response = await apiResponse(endpoint, options);
+
   // Handle 204 No Content
   if (response.status === 204) {
     return undefined as T;
@@ -114,6 +174,41 @@ async function apiFetch<T>(
   return response.json();
 }
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+/**
+ * One page of a cursor-paginated list endpoint. nextCursor comes from the
+ * X-Next-Cursor header and is null on the last page.
+ */
+async function fetchPage<T>(
+  endpoint: string,
+  cursor?: string | null,
+  limit?: number
+): Promise<Page<T>> {
+  const searchParams = new URLSearchParams();
+  if (cursor) searchParams.set("cursor", cursor);
+  if (limit) searchParams.set("limit", String(limit));
+  const queryString = searchParams.toString();
+  const separator = endpoint.includes("?") ? "&" : "?";
+  const response = await apiResponse(queryString ? `${endpoint}${separator}${queryString}` : endpoint);
+  return { items: await response.json(), nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
+/** Every item of a cursor-paginated list endpoint, following X-Next-Cursor to the end. */
+async function fetchAllPages<T>(endpoint: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: Page<T> = await fetchPage<T>(endpoint, cursor, LIST_PAGE_SIZE);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+}
+
 // Auth endpoints
 export async function login(email: string, password: string): Promise<LoginResponse> {
   const data = await apiFetch<LoginResponse>("/auth/login", {
@@ -145,16 +240,55 @@ export async function getCurrentUser(): Promise<User> {
 export async function searchRides(params: {
   origin?: string;
   destination?: string;
+  originId?: number;
+  destinationId?: number;
   date?: string;
+  departAfter?: string;
+  departBefore?: string;
+  arriveAfter?: string;
+  arriveBefore?: string;
+  flexMinutes?: number;
 }): Promise<Ride[]> {
   const searchParams = new URLSearchParams();
   if (params.origin) searchParams.set("origin", params.origin);
   if (params.destination) searchParams.set("destination", params.destination);
+  if (params.originId !== undefined) searchParams.set("origin_id", String(params.originId));
+  if (params.destinationId !== undefined) searchParams.set("destination_id", String(params.destinationId));
   if (params.date) searchParams.set("date", params.date);
+  if (params.departAfter) searchParams.set("depart_after", params.departAfter);
+  if (params.departBefore) searchParams.set("depart_before", params.departBefore);
+  if (params.arriveAfter) searchParams.set("arrive_after", params.arriveAfter);
+  if (params.arriveBefore) searchParams.set("arrive_before", params.arriveBefore);
+  if (params.flexMinutes !== undefined) searchParams.set("flex_minutes", String(params.flexMinutes));
 
   const queryString = searchParams.toString();
   const endpoint = `/rides/search${queryString ? `?${queryString}` : ""}`;
-  return apiFetch<Ride[]>(endpoint);
+  return fetchAllPages<Ride>(endpoint);
+}
+
+export async function autocompleteLocations(q: string, limit?: number): Promise<LocationSuggestion[]> {
+  const searchParams = new URLSearchParams({ q });
+  if (limit) searchParams.set("limit", String(limit));
+  return apiFetch<LocationSuggestion[]>(`/locations/autocomplete?${searchParams}`);
+}
+
+export async function getNearbyRides(params: {
+  origin?: { lat: number; lon: number; radiusKm?: number };
+  destination?: { lat: number; lon: number; radiusKm?: number };
+  limit?: number;
+}): Promise<NearbyRide[]> {
+  const searchParams = new URLSearchParams();
+  for (const [side, point] of [
+    ["origin", params.origin],
+    ["destination", params.destination],
+  ] as const) {
+    if (!point) continue;
+    searchParams.set(`${side}_lat`, String(point.lat));
+    searchParams.set(`${side}_lon`, String(point.lon));
+    if (point.radiusKm) searchParams.set(`${side}_radius_km`, String(point.radiusKm));
+  }
+  if (params.limit) searchParams.set("limit", String(params.limit));
+  return apiFetch<NearbyRide[]>(`/rides/nearby?${searchParams}`);
 }
 
 export async function getRide(rideId: string): Promise<Ride> {
@@ -169,6 +303,10 @@ export async function createRide(payload: {
   arrival_time?: string;
   price_per_seat: number;
   seats_available: number;
+  origin_lat?: number;
+  origin_lon?: number;
+  destination_lat?: number;
+  destination_lon?: number;
 }): Promise<Ride> {
   return apiFetch<Ride>("/rides", {
     method: "POST",
@@ -176,8 +314,102 @@ export async function createRide(payload: {
   });
 }
 
+/**
+ * Create a recurring ride: departure_time is the first occurrence, repeated
+ * on weekdays (0 = Monday, default Monday-Friday) through until, skipping
+ * exceptions (YYYY-MM-DD dates).
+ */
+export async function createRideSeries(payload: {
+  vehicle_id: string;
+  origin_location: string;
+  destination_location: string;
+  departure_time: string;
+  arrival_time?: string;
+  price_per_seat: number;
+  seats_available: number;
+  until: string;
+  weekdays?: number[];
+  exceptions?: string[];
+}): Promise<RideSeries> {
+  return apiFetch<RideSeries>("/rides/series", {
+    method: "POST",
+    body: JSON.stringify(payload),
+  });
+}
+
+export async function updateRideSeries(
+  seriesId: string,
+  payload: { origin_location?: string; destination_location?: string; price_per_seat?: number }
+): Promise<Ride[]> {
+  return apiFetch<Ride[]>(`/rides/series/${seriesId}`, {
+    method: "PATCH",
+    body: JSON.stringify(payload),
+  });
+}
+
+export async function cancelRideSeries(seriesId: string): Promise<void> {
+  return apiFetch<void>(`/rides/series/${seriesId}`, {
+    method: "DELETE",
+  });
+}
+
+/**
+ * Stream live updates from /rides/events for the given rides and/or search
+ * filters. Uses fetch rather than EventSource so the bearer token can be sent.
+ * onResync is called when updates were dropped and data should be re-fetched.
+ * Returns a function that closes the stream.
+ */
+export function subscribeToRides(
+  params: { rideIds?: string[]; origin?: string; destination?: string; date?: string },
+  onRide: (ride: Ride) => void,
+  onResync: () => void = () => {}
+): () => void {
+  const searchParams = new URLSearchParams();
+  params.rideIds?.forEach((id) => searchParams.append("ride_id", id));
+  if (params.origin) searchParams.set("origin", params.origin);
+  if (params.destination) searchParams.set("destination", params.destination);
+  if (params.date) searchParams.set("date", params.date);
+
+  const controller = new AbortController();
+  const token = getToken();
+  (async () => {
+    const response = await fetch(`${API_BASE}/rides/events?${searchParams}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal: controller.signal,
+    });
+    if (!response.ok || !response.body) return;
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      // Events are separated by a blank line; comment lines (":") are heartbeats
+      let end;
+      while ((end = buffer.indexOf("\n\n")) >= 0) {
+        const lines = buffer.slice(0, end).split("\n");
+        buffer = buffer.slice(end + 2);
+        const event = lines.find((line) => line.startsWith("event: "))?.slice(7);
+        const data = lines.find((line) => line.startsWith("data: "))?.slice(6);
+        if (event === "ride" && data) onRide(JSON.parse(data));
+        else if (event === "resync") onResync();
+      }
+    }
+  })().catch(() => {
+    // Aborted or disconnected; callers fall back to their last fetched data
+  });
+
+  return () => controller.abort();
+}
+
 export async function getMyRides(): Promise<Ride[]> {
-  return apiFetch<Ride[]>("/rides/mine");
+  return fetchAllPages<Ride>("/rides/mine");
+}
+
+/** The page of /rides/mine after cursor, e.g. Dashboard.rides_next_cursor. */
+export async function getMyRidesPage(cursor: string): Promise<Page<Ride>> {
+  return fetchPage<Ride>("/rides/mine", cursor);
 }
 
 // Bookings endpoints
@@ -187,8 +419,23 @@ export async function bookRide(rideId: string): Promise<Booking> {
   });
 }
 
+export async function bookRides(
+  rideIds: string[],
+  mode: BatchMode = "all_or_nothing"
+): Promise<BookingBatch> {
+  return apiFetch<BookingBatch>("/bookings/batch", {
+    method: "POST",
+    body: JSON.stringify({ ride_ids: rideIds, mode }),
+  });
+}
+
 export async function getMyBookings(): Promise<Booking[]> {
-  return apiFetch<Booking[]>("/bookings/mine");
+  return fetchAllPages<Booking>("/bookings/mine");
+}
+
+/** The page of /bookings/mine after cursor, e.g. Dashboard.bookings_next_cursor. */
+export async function getMyBookingsPage(cursor: string): Promise<Page<Booking>> {
+  return fetchPage<Booking>("/bookings/mine", cursor);
 }
 
 export async function cancelBooking(bookingId: string): Promise<void> {
@@ -197,9 +444,19 @@ export async function cancelBooking(bookingId: string): Promise<void> {
   });
 }
 
+export async function cancelBookings(
+  bookingIds: string[],
+  mode: BatchMode = "all_or_nothing"
+): Promise<BookingBatch> {
+  return apiFetch<BookingBatch>("/bookings/batch", {
+    method: "DELETE",
+    body: JSON.stringify({ booking_ids: bookingIds, mode }),
+  });
+}
+
 // Vehicles endpoints
 export async function getMyVehicles(): Promise<Vehicle[]> {
-  return apiFetch<Vehicle[]>("/vehicles/mine");
+  return fetchAllPages<Vehicle>("/vehicles/mine");
 }
 
 export async function createVehicle(payload: {
@@ -216,3 +473,8 @@ export async function createVehicle(payload: {
     body: JSON.stringify(payload),
   });
 }
+
+// Dashboard endpoint
+export async function getDashboard(): Promise<Dashboard> {
+  return apiFetch<Dashboard>("/dashboard");
+}
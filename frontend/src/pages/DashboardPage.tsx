@@ -18,46 +18,70 @@ import {
   CardHeader,
   CardTitle,
 } from "@/components/ui/card";
-import { getMyRides, getMyBookings, Ride, Booking } from "@/lib/api";
+import {
+  getDashboard,
+  getMyBookingsPage,
+  getMyRidesPage,
+  Ride,
+  Booking,
+} from "@/lib/api";
 import { useAuth } from "@/lib/AuthContext";
 
 export default function DashboardPage() {
   const { user } = useAuth();
   const [myRides, setMyRides] = useState<Ride[]>([]);
   const [myBookings, setMyBookings] = useState<Booking[]>([]);
-  const [isLoadingRides, setIsLoadingRides] = useState(true);
-  const [isLoadingBookings, setIsLoadingBookings] = useState(true);
-  const [ridesError, setRidesError] = useState("");
-  const [bookingsError, setBookingsError] = useState("");
+  const [ridesCursor, setRidesCursor] = useState<string | null>(null);
+  const [bookingsCursor, setBookingsCursor] = useState<string | null>(null);
+  const [isLoading, setIsLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState<"rides" | "bookings" | null>(null);
+  const [error, setError] = useState("");
 
   useEffect(() => {
-    loadMyRides();
-    loadMyBookings();
+    loadDashboard();
   }, []);
 
-  const loadMyRides = async () => {
-    setIsLoadingRides(true);
-    setRidesError("");
+  const loadDashboard = async () => {
+    setIsLoading(true);
+    setError("");
+    try {
+      const dashboard = await getDashboard();
+      setMyRides(dashboard.rides);
+      setMyBookings(dashboard.bookings);
+      setRidesCursor(dashboard.rides_next_cursor);
+      setBookingsCursor(dashboard.bookings_next_cursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to load dashboard");
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const loadMoreRides = async () => {
+    if (!ridesCursor) return;
+    setLoadingMore("rides");
     try {
-      const rides = await getMyRides();
-      setMyRides(rides);
+      const page = await getMyRidesPage(ridesCursor);
+      setMyRides((rides) => [...rides, ...page.items]);
+      setRidesCursor(page.nextCursor);
     } catch (err) {
-      setRidesError(err instanceof Error ? err.message : "Failed to load rides");
+      setError(err instanceof Error ? err.message : "Failed to load rides");
     } finally {
-      setIsLoadingRides(false);
+      setLoadingMore(null);
     }
   };
 
-  const loadMyBookings = async () => {
-    setIsLoadingBookings(true);
-    setBookingsError("");
+  const loadMoreBookings = async () => {
+    if (!bookingsCursor) return;
+    setLoadingMore("bookings");
     try {
-      const bookings = await getMyBookings();
-      setMyBookings(bookings);
+      const page = await getMyBookingsPage(bookingsCursor);
+      setMyBookings((bookings) => [...bookings, ...page.items]);
+      setBookingsCursor(page.nextCursor);
     } catch (err) {
-      setBookingsError(err instanceof Error ? err.message : "Failed to load bookings");
+      setError(err instanceof Error ? err.message : "Failed to load bookings");
     } finally {
-      setIsLoadingBookings(false);
+      setLoadingMore(null);
     }
   };
 
@@ -98,14 +122,14 @@ export default function DashboardPage() {
             <CardDescription>Rides you're offering to others</CardDescription>
           </CardHeader>
           <CardContent>
-            {isLoadingRides ? (
+            {isLoading ? (
               <div className="flex justify-center py-8">
                 <Loader2 className="h-8 w-8 animate-spin text-muted-foreground" />
               </div>
-            ) : ridesError ? (
+            ) : error ? (
               <div className="text-center py-8 text-destructive">
-                <p>{ridesError}</p>
-                <Button variant="link" onClick={loadMyRides} className="mt-2">
+                <p>{error}</p>
+                <Button variant="link" onClick={loadDashboard} className="mt-2">
                   Try again
                 </Button>
               </div>
@@ -160,6 +184,17 @@ export default function DashboardPage() {
                     </Link>
                   );
                 })}
+                {ridesCursor && (
+                  <Button
+                    variant="outline"
+                    className="w-full"
+                    onClick={loadMoreRides}
+                    disabled={loadingMore === "rides"}
+                  >
+                    {loadingMore === "rides" && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                    Load more rides
+                  </Button>
+                )}
               </div>
             )}
           </CardContent>
@@ -175,14 +210,14 @@ export default function DashboardPage() {
             <CardDescription>Rides you've booked as a passenger</CardDescription>
           </CardHeader>
           <CardContent>
-            {isLoadingBookings ? (
+            {isLoading ? (
               <div className="flex justify-center py-8">
                 <Loader2 className="h-8 w-8 animate-spin text-muted-foreground" />
               </div>
-            ) : bookingsError ? (
+            ) : error ? (
               <div className="text-center py-8 text-destructive">
-                <p>{bookingsError}</p>
-                <Button variant="link" onClick={loadMyBookings} className="mt-2">
+                <p>{error}</p>
+                <Button variant="link" onClick={loadDashboard} className="mt-2">
                   Try again
                 </Button>
               </div>
@@ -245,6 +280,17 @@ export default function DashboardPage() {
                     </Link>
                   );
                 })}
+                {bookingsCursor && (
+                  <Button
+                    variant="outline"
+                    className="w-full"
+                    onClick={loadMoreBookings}
+                    disabled={loadingMore === "bookings"}
+                  >
+                    {loadingMore === "bookings" && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                    Load more bookings
+                  </Button>
+                )}
               </div>
             )}
           </CardContent>
@@ -19,7 +19,7 @@ import {
   CardTitle,
 } from "@/components/ui/card";
 import { Separator } from "@/components/ui/separator";
-import { getRide, bookRide, Ride } from "@/lib/api";
+import { getRide, bookRide, subscribeToRides, Ride } from "@/lib/api";
 import { useAuth } from "@/lib/AuthContext";
 
 export default function RideDetailsPage() {
@@ -32,6 +32,7 @@ export default function RideDetailsPage() {
   const [error, setError] = useState("");
   const [isBooking, setIsBooking] = useState(false);
   const [bookingSuccess, setBookingSuccess] = useState(false);
+  const [isWaitlisted, setIsWaitlisted] = useState(false);
   const [bookingError, setBookingError] = useState("");
 
   useEffect(() => {
@@ -40,6 +41,12 @@ export default function RideDetailsPage() {
     }
   }, [rideId]);
 
+  // Keep seats and status live instead of polling
+  useEffect(() => {
+    if (!rideId || !isAuthenticated) return;
+    return subscribeToRides({ rideIds: [rideId] }, setRide, loadRide);
+  }, [rideId, isAuthenticated]);
+
   const loadRide = async () => {
     setIsLoading(true);
     setError("");
@@ -62,7 +69,8 @@ export default function RideDetailsPage() {
     setIsBooking(true);
     setBookingError("");
     try {
-      await bookRide(rideId!);
+      const booking = await bookRide(rideId!);
+      setIsWaitlisted(booking.status === "pending");
       setBookingSuccess(true);
       // Refresh ride data to get updated seats
       await loadRide();
@@ -111,7 +119,8 @@ export default function RideDetailsPage() {
 
   const { date: rideDate, time: rideTime } = formatDateTime(ride.departure_time);
   const isOwnRide = user && ride.driver_id === user.user_id;
-  const canBook = isAuthenticated && !isOwnRide && ride.seats_available > 0 && ride.status === "scheduled";
+  // Full rides can still be booked: the booking joins the waitlist
+  const canBook = isAuthenticated && !isOwnRide && ride.status === "scheduled";
 
   return (
     <div className="container py-8 max-w-3xl">
@@ -127,7 +136,11 @@ export default function RideDetailsPage() {
       {bookingSuccess && (
         <div className="bg-green-100 text-green-800 p-4 rounded-md mb-6 flex items-center gap-2">
           <CheckCircle className="h-5 w-5" />
-          <span>Ride booked successfully! Check your dashboard for details.</span>
+          <span>
+            {isWaitlisted
+              ? "You're on the waitlist. Your booking is confirmed automatically when a seat frees up."
+              : "Ride booked successfully! Check your dashboard for details."}
+          </span>
         </div>
       )}
 
@@ -233,10 +246,10 @@ export default function RideDetailsPage() {
                     disabled={!canBook || isBooking}
                   >
                     {isBooking && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
-                    {ride.seats_available === 0
-                      ? "No Seats Available"
-                      : ride.status !== "scheduled"
+                    {ride.status !== "scheduled"
                       ? `Ride ${ride.status}`
+                      : ride.seats_available === 0
+                      ? "Join Waitlist"
                       : "Book This Ride"}
                   </Button>
                   {!isAuthenticated && (